@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Optional
 
-from nats.js.api import ConsumerConfig, StreamConfig
+from nats.js.api import ConsumerConfig, KeyValueConfig, StreamConfig
 
 from aiogram_nats.common.settings.models.security import SecretStr
 
@@ -15,6 +15,14 @@ class TasksBrokerType(Enum):
     PULL = "pull"
 
 
+class ScheduleSourceType(Enum):
+
+    """An enumeration representing the storage of the task schedules."""
+
+    REDIS = "redis"
+    NATS = "nats"
+
+
 @dataclass
 class TasksNatsSettings:
 
@@ -26,6 +34,9 @@ class TasksNatsSettings:
     pull_consume_batch: int = 1
     pull_consume_timeout: Optional[float] = None
     queue: Optional[str] = None
+    schedule_kv: KeyValueConfig = field(default_factory=lambda: KeyValueConfig("tasks_schedules"))
+    schedule_lookahead: float = 60.0
+    schedule_clock_skew: float = 60.0
 
 
 @dataclass
@@ -63,12 +74,32 @@ class NatsSettings:
     servers: list[NatsServerSettings] = field(default_factory=lambda: [NatsServerSettings()])
 
 
+@dataclass
+class SchedulerSettings:
+
+    """
+    A dataclass representing the settings of the task scheduler.
+
+    With the timing wheel enabled, entities due within `horizon` seconds are kept in memory and executed in-process,
+    the rest is scheduled through the schedule source, which is stored in Redis or in a NATS KV bucket.
+    The in-memory schedules are lost if the process crashes, so the wheel is disabled by default.
+    """
+
+    source_type: ScheduleSourceType = ScheduleSourceType.REDIS
+    wheel_enabled: bool = False
+    horizon: float = 60.0
+    tick: float = 0.05
+    slots: int = 64
+    levels: int = 3
+
+
 @dataclass
 class BrokerSettings:
 
     """A class representing broker settings."""
 
     nats: NatsSettings
+    scheduler: SchedulerSettings = field(default_factory=SchedulerSettings)
 
 
 def get_broker_settings() -> list[Any]:
@@ -78,6 +109,7 @@ def get_broker_settings() -> list[Any]:
         NatsSettings,
         NatsServerSettings,
         TasksNatsSettings,
+        SchedulerSettings,
     ]
 
 
@@ -13,6 +13,8 @@ class TasksScheduleSource:
     db: int = 4
     prefix: str = "schedule"
     buffer_size: int = 50
+    pipeline_size: int = 1000
+    lookahead: float = 60.0
     max_connection_pool_size: int | None = None
     connection_kwargs: dict[str, Any] = field(default_factory=dict)
 
@@ -1,6 +1,75 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import Any
 
+from nats.js.api import KeyValueConfig, ObjectStoreConfig
+
+
+class PayloadCodec(Enum):
+
+    """An enumeration of codecs used to encode mailing service payloads."""
+
+    JSON = "json"
+    ORJSON = "orjson"
+    MSGPACK = "msgpack"
+
+
+class PayloadCompression(Enum):
+
+    """An enumeration of compressions applied to mailing service payloads."""
+
+    NONE = "none"
+    ZSTD = "zstd"
+
+
+@dataclass
+class DeliverySettings:
+
+    """
+    Represents the settings for delivering mailing messages to Telegram.
+
+    Attributes :
+        global_rate (float): The maximum number of messages sent per second.
+        per_chat_interval (float): The minimal number of seconds between two messages sent to one chat.
+        max_concurrency (int): The maximum number of concurrent sends.
+        resolve_chunk_size (int): The number of recipients resolved from the audience at once.
+        stats_window (int): The number of seconds for which per-second delivery counters are kept.
+        checkpoint_interval (float): The number of seconds between two saves of the mailing progress, the sends of which are repeated after a crash.
+        partitions (int): The number of partition tasks a mailing is split into by the recipient chat IDs.
+        partition_stall_timeout (float): The number of seconds without a checkpoint after which a partition task is considered gone and started again.
+        coordination_timeout (float | None): The number of seconds after which an unfinished partitioned mailing is paused, unlimited if None.
+        global_flood_window (float): The number of seconds within which flood-waits of different chats are counted.
+        global_flood_threshold (int): The number of different chats throttled within the window which pauses all sends.
+        max_attempts (int): The maximum number of delivery attempts per recipient.
+        retry_base_delay (float): The delay before the first retry of a failed delivery, doubled for every next attempt.
+        max_retry_delay (float): The maximum retry delay, unless Telegram requests a longer flood-wait.
+        unreachable_flush_size (int): The number of unreachable recipients marked in the database at once.
+        progress_kv (KeyValueConfig): The config of the KV bucket storing the mailing progress.
+        media_kv (KeyValueConfig): The config of the KV bucket caching the Telegram file IDs of uploaded media.
+        media_object_store (ObjectStoreConfig): The config of the Object Store bucket storing mailing media.
+        media_chunk_size (int): The size of the chunks media are stored and streamed in.
+    """
+
+    global_rate: float = 30.0
+    per_chat_interval: float = 1.0
+    max_concurrency: int = 30
+    resolve_chunk_size: int = 1000
+    stats_window: int = 60
+    checkpoint_interval: float = 5.0
+    partitions: int = 4
+    partition_stall_timeout: float = 60.0
+    coordination_timeout: float | None = 24 * 60 * 60.0
+    global_flood_window: float = 1.0
+    global_flood_threshold: int = 3
+    max_attempts: int = 5
+    retry_base_delay: float = 1.0
+    max_retry_delay: float = 300.0
+    unreachable_flush_size: int = 500
+    progress_kv: KeyValueConfig = field(default_factory=lambda: KeyValueConfig("mailing_progress"))
+    media_kv: KeyValueConfig = field(default_factory=lambda: KeyValueConfig("mailing_media", ttl=30 * 24 * 60 * 60))
+    media_object_store: ObjectStoreConfig = field(default_factory=lambda: ObjectStoreConfig("mailing_media_files"))
+    media_chunk_size: int = 128 * 1024
+
 
 @dataclass
 class MailingServiceSettings:
@@ -10,12 +79,32 @@ class MailingServiceSettings:
     main_subject: str = "service.mailing"
     service: str = "tgbot"
     stream_name: str = "mailing_stream"
+    messages_subject: str = "messages"
+    consumer_inactive_threshold: float = 300.0
+    submission_subject: str = "submission"
+    submission_stream_name: str = "mailing_submission_stream"
+    max_frame_size: int | None = None
+    max_pending_frames: int = 64
+    codec: PayloadCodec = PayloadCodec.JSON
+    compression: PayloadCompression = PayloadCompression.NONE
+    compression_threshold: int = 4096
+    ack_flush_size: int = 100
+    heartbeat_interval: float = 10.0
+    max_redelivery_delay: float = 300.0
+    max_deliveries: int = 5
+    dead_letter_subject: str = "dead_letter"
+    dead_letter_stream_name: str = "mailing_dead_letter_stream"
+    jobs_subject: str = "jobs"
+    jobs_stream_name: str = "mailing_jobs_stream"
+    jobs_kv: KeyValueConfig = field(default_factory=lambda: KeyValueConfig("mailing_jobs", ttl=24 * 60 * 60))
+    delivery: DeliverySettings = field(default_factory=DeliverySettings)
 
 
 def get_mailing_service_settings() -> list[Any]:
     """Returns a list of mailing service settings classes."""
     return [
         MailingServiceSettings,
+        DeliverySettings,
     ]
 
 
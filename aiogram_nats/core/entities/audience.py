@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from aiogram_nats.core.entities.recipients import RecipientSet
+
+
+@dataclass(frozen=True)
+class AllUsers:
+
+    """Represents an audience of all users of the bot."""
+
+
+@dataclass(frozen=True)
+class JoinedBetween:
+
+    """
+    Represents an audience of the users who joined within a time range.
+
+    Attributes :
+        since (Optional[datetime]): The inclusive lower bound of the join time, unbounded if None.
+        until (Optional[datetime]): The exclusive upper bound of the join time, unbounded if None.
+    """
+
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class ExplicitRecipients:
+
+    """
+    Represents an audience given by an explicit set of chat IDs.
+
+    Attributes :
+        recipients (RecipientSet): The chat IDs of the recipients.
+    """
+
+    recipients: RecipientSet
+
+
+Audience = AllUsers | JoinedBetween | ExplicitRecipients
+
+
+@dataclass(frozen=True)
+class Partition:
+
+    """
+    Represents one of the disjoint parts an audience is split into by the chat IDs of the recipients.
+
+    A chat ID belongs to the partition if the remainder of its division by the number of partitions equals the partition index.
+
+    Attributes :
+        index (int): The index of the partition, from 0 to `count - 1`.
+        count (int): The total number of partitions.
+    """
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        """Validates the partition index."""
+        if not 0 <= self.index < self.count:
+            raise ValueError(f"Partition index must be in range [0, {self.count}), got {self.index}")
+
+    def __contains__(self, chat_id: object) -> bool:
+        """Checks if the chat ID belongs to the partition."""
+        return isinstance(chat_id, int) and chat_id % self.count == self.index
+
+    @classmethod
+    def split(cls, count: int) -> list["Partition"]:
+        """
+        Returns all partitions of an audience split into the given number of parts.
+
+        Args :
+            count (int): The number of partitions.
+
+        Returns :
+            list[Partition]: The partitions.
+        """
+        return [cls(index, count) for index in range(count)]
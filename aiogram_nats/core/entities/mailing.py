@@ -1,8 +1,8 @@
 from dataclasses import dataclass
 from uuid import UUID
 
+from aiogram_nats.core.entities.audience import Audience
 from aiogram_nats.core.entities.scheduled import ScheduledEntity
-from aiogram_nats.core.entities.user import User
 
 
 @dataclass
@@ -28,12 +28,12 @@ class Mailing:
 
     Attributes :
         id (UUID): The ID of the mailing.
-        users (list[User]): The list of users associated with the mailing.
+        audience (Audience): The audience of the mailing, resolved into recipients at delivery time.
         message (MailingMessage): The message of the mailing.
     """
 
     id: UUID
-    users: list[User]
+    audience: Audience
     message: MailingMessage
 
 
@@ -45,9 +45,29 @@ class ScheduledMailing(Mailing, ScheduledEntity):
 
     Attributes :
         id (UUID): The unique identifier of the scheduled mailing.
-        users (list[User]): The list of users associated with the mailing.
+        audience (Audience): The audience of the mailing, resolved into recipients at delivery time.
         message (MailingMessage): The message of the mailing.
         scheduled_time (datetime.datetime): The time at which the entity is scheduled.
     """
 
-    pass
+    def schedule_keys(self) -> list[str]:
+        """
+        Returns the keys the schedules of the entity are indexed by.
+
+        Returns :
+            list[str]: The key of the schedules of the mailing.
+        """
+        return [mailing_key(self.id)]
+
+
+def mailing_key(mailing_id: UUID) -> str:
+    """
+    Returns the key the schedules of a mailing are indexed by.
+
+    Args :
+        mailing_id (UUID): The ID of the mailing.
+
+    Returns :
+        str: The schedule key.
+    """
+    return f"mailing.{mailing_id}"
@@ -31,6 +31,38 @@ class MessageDeletionScheduled(Message, ScheduledEntity):
 
     id: int
 
+    def schedule_keys(self) -> list[str]:
+        """
+        Returns the keys the schedules of the entity are indexed by.
+
+        Returns :
+            list[str]: The key of the scheduled deletions of the chat.
+        """
+        return [chat_deletions_key(self.user.id)]
+
+
+@dataclass
+class MessageBatchDeletionScheduled(Message, ScheduledEntity):
+
+    """
+    Represents a scheduled deletion of several messages of one chat at once.
+
+    Attributes :
+        ids (list[int]): The unique identifiers of the messages, at most 100 of them.
+
+    """
+
+    ids: list[int]
+
+    def schedule_keys(self) -> list[str]:
+        """
+        Returns the keys the schedules of the entity are indexed by.
+
+        Returns :
+            list[str]: The key of the scheduled deletions of the chat.
+        """
+        return [chat_deletions_key(self.user.id)]
+
 
 @dataclass
 class MessageSendScheduled(Message, ScheduledEntity):
@@ -45,3 +77,38 @@ class MessageSendScheduled(Message, ScheduledEntity):
 
     media_address: str
     text: str
+
+    def schedule_keys(self) -> list[str]:
+        """
+        Returns the keys the schedules of the entity are indexed by.
+
+        Returns :
+            list[str]: The key of the scheduled sends to the chat.
+        """
+        return [chat_sends_key(self.user.id)]
+
+
+def chat_deletions_key(chat_id: int) -> str:
+    """
+    Returns the key the scheduled message deletions of a chat are indexed by.
+
+    Args :
+        chat_id (int): The ID of the chat.
+
+    Returns :
+        str: The schedule key.
+    """
+    return f"chat.{chat_id}.deletion"
+
+
+def chat_sends_key(chat_id: int) -> str:
+    """
+    Returns the key the scheduled message sends to a chat are indexed by.
+
+    Args :
+        chat_id (int): The ID of the chat.
+
+    Returns :
+        str: The schedule key.
+    """
+    return f"chat.{chat_id}.send"
@@ -0,0 +1,67 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from aiogram_nats.core.entities.audience import Partition
+
+
+class MailingState(Enum):
+
+    """An enumeration of the execution states of a mailing."""
+
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+
+@dataclass
+class MailingProgress:
+
+    """
+    Represents the execution progress of a mailing.
+
+    Attributes :
+        mailing_id (UUID): The ID of the mailing.
+        cursor (Optional[int]): The chat ID up to which all recipients of the mailing have been processed, None if none were.
+        completed (frozenset[int]): The chat IDs of recipients after the cursor that have already been processed.
+        state (MailingState): The execution state of the mailing.
+    """
+
+    mailing_id: UUID
+    cursor: Optional[int] = None
+    completed: frozenset[int] = field(default_factory=frozenset)
+    state: MailingState = MailingState.RUNNING
+
+    def is_finished(self) -> bool:
+        """
+        Checks if the mailing must not be executed anymore.
+
+        Returns :
+            bool: True if the mailing is cancelled or completed, False otherwise.
+        """
+        return self.state in {MailingState.CANCELLED, MailingState.COMPLETED}
+
+
+@dataclass
+class PartitionReport:
+
+    """
+    Represents the delivery results of one partition of a mailing.
+
+    Attributes :
+        partition (Partition): The partition of the mailing audience.
+        sent (int): The number of delivered messages.
+        failed (int): The number of messages that could not be delivered.
+        finished (bool): True if every recipient of the partition has been processed.
+        heartbeat (int): The number of checkpoints saved by the tasks of the partition, it advances while a task is alive.
+        owner (Optional[str]): The ID of the task delivering the partition, a task stops once another one has taken the partition over.
+    """
+
+    partition: Partition
+    sent: int = 0
+    failed: int = 0
+    finished: bool = False
+    heartbeat: int = 0
+    owner: Optional[str] = None
@@ -0,0 +1,172 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Final, Optional, Self
+
+from aiogram_nats.core.entities.user import User
+
+_TYPECODE: Final[str] = "q"
+
+
+class RecipientSet:
+
+    """
+    Represents an immutable set of recipient chat IDs.
+
+    The IDs are kept sorted in a compact signed 64-bit array, which takes 8 bytes per recipient,
+    gives O(1) length and indexing and O(log n) membership checks.
+    """
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: Iterable[int] = ()) -> None:
+        self._ids = array(_TYPECODE, ids)
+        if any(self._ids[i] >= self._ids[i + 1] for i in range(len(self._ids) - 1)):
+            self._ids = array(_TYPECODE, sorted(set(self._ids)))
+
+    @classmethod
+    def from_users(cls, users: Iterable[User]) -> Self:
+        """
+        Creates a RecipientSet from users.
+
+        Args :
+            users (Iterable[User]): The users to be included.
+
+        Returns :
+            RecipientSet: The set of the user IDs.
+        """
+        return cls(user.id for user in users)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """
+        Creates a RecipientSet from its binary representation.
+
+        Args :
+            data (bytes): The bytes produced by `to_bytes`.
+
+        Returns :
+            RecipientSet: The decoded set.
+        """
+        ids = array(_TYPECODE)
+        ids.frombytes(data)
+        if sys.byteorder != "little":
+            ids.byteswap()
+        return cls._from_sorted(ids)
+
+    @classmethod
+    def _from_sorted(cls, ids: array) -> Self:
+        recipients = cls.__new__(cls)
+        recipients._ids = ids  # noqa: SLF001
+        return recipients
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the binary representation of the set: the sorted IDs as little-endian signed 64-bit integers.
+
+        Returns :
+            bytes: The encoded set.
+        """
+        if sys.byteorder == "little":
+            return self._ids.tobytes()
+        ids = array(_TYPECODE, self._ids)
+        ids.byteswap()
+        return ids.tobytes()
+
+    def view(self) -> memoryview:
+        """
+        Returns a read-only view of the sorted IDs without copying them.
+
+        Returns :
+            memoryview: The view of the IDs.
+        """
+        return memoryview(self._ids).toreadonly()
+
+    def chunks(self, size: int, after: Optional[int] = None) -> Iterator[array]:
+        """
+        Iterates over the IDs in sorted chunks.
+
+        Args :
+            size (int): The maximum number of IDs in a chunk.
+            after (Optional[int]): Only the IDs greater than this one are returned. Defaults to None.
+
+        Returns :
+            Iterator[array]: The chunks of IDs.
+        """
+        if size < 1:
+            raise ValueError("size must be greater than 0")
+        begin = 0 if after is None else bisect_right(self._ids, after)
+        for start in range(begin, len(self._ids), size):
+            yield self._ids[start:start + size]
+
+    def union(self, other: "RecipientSet") -> "RecipientSet":
+        """Returns the recipients present in either set."""
+        return self._from_sorted(array(_TYPECODE, _merge(self.view(), other.view(), keep_left=True, keep_both=True, keep_right=True)))
+
+    def intersection(self, other: "RecipientSet") -> "RecipientSet":
+        """Returns the recipients present in both sets."""
+        return self._from_sorted(array(_TYPECODE, _merge(self.view(), other.view(), keep_left=False, keep_both=True, keep_right=False)))
+
+    def difference(self, other: "RecipientSet") -> "RecipientSet":
+        """Returns the recipients present in this set but not in the other one."""
+        return self._from_sorted(array(_TYPECODE, _merge(self.view(), other.view(), keep_left=True, keep_both=False, keep_right=False)))
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def __len__(self) -> int:
+        """Returns the number of recipients."""
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the recipient IDs in ascending order."""
+        return iter(self._ids)
+
+    def __getitem__(self, index: int) -> int:
+        """Returns the recipient ID at the given position in ascending order."""
+        return self._ids[index]
+
+    def __contains__(self, chat_id: object) -> bool:
+        """Checks if the given ID is in the set."""
+        if not isinstance(chat_id, int):
+            return False
+        index = bisect_left(self._ids, chat_id)
+        return index < len(self._ids) and self._ids[index] == chat_id
+
+    def __eq__(self, other: object) -> bool:
+        """Checks if both sets contain the same recipients."""
+        if not isinstance(other, RecipientSet):
+            return NotImplemented
+        return self._ids == other._ids
+
+    def __hash__(self) -> int:
+        """Returns the hash of the recipients."""
+        return hash(self._ids.tobytes())
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the set."""
+        return f"{self.__class__.__name__}(<{len(self._ids)} recipients>)"
+
+
+def _merge(left: memoryview, right: memoryview, *, keep_left: bool, keep_both: bool, keep_right: bool) -> Iterator[int]:
+    i, j = 0, 0
+    while i < len(left) and j < len(right):
+        if left[i] < right[j]:
+            if keep_left:
+                yield left[i]
+            i += 1
+        elif left[i] > right[j]:
+            if keep_right:
+                yield right[j]
+            j += 1
+        else:
+            if keep_both:
+                yield left[i]
+            i += 1
+            j += 1
+    if keep_left:
+        yield from left[i:]
+    if keep_right:
+        yield from right[j:]
@@ -34,3 +34,12 @@ class ScheduledEntity:
         now = datetime.datetime.now(datetime.UTC)
         diff = self.scheduled_time - now
         return diff if diff.total_seconds() > 0 else datetime.timedelta()
+
+    def schedule_keys(self) -> list[str]:
+        """
+        Returns the keys the schedules of the entity are indexed by, so that they can be cancelled together.
+
+        Returns :
+            list[str]: The keys, none by default.
+        """
+        return []
@@ -15,6 +15,8 @@ class User:
         joined_us (datetime): The datetime when the user joined.
         first_name (Optional[str]): The first name of the user.
         last_name (Optional[str]): The last name of the user.
+        is_reachable (bool): False if the user blocked the bot or deleted their account.
+        last_failed_at (Optional[datetime]): The datetime when a message to the user failed because the user is unreachable.
     """
 
     id: int
@@ -22,6 +24,8 @@ class User:
     joined_us: datetime
     username: Optional[str] = None
     last_name: Optional[str] = None
+    is_reachable: bool = True
+    last_failed_at: Optional[datetime] = None
 
     @property
     def name(self) -> str:
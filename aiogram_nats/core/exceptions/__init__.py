@@ -0,0 +1,8 @@
+from .delivery import DeliveryError, RecipientUnreachableError, RetryAfterError, TransientDeliveryError
+
+__all__ = [
+    "DeliveryError",
+    "RecipientUnreachableError",
+    "RetryAfterError",
+    "TransientDeliveryError",
+]
@@ -0,0 +1,27 @@
+class DeliveryError(Exception):
+
+    """Raised when a message could not be delivered to a recipient."""
+
+
+class TransientDeliveryError(DeliveryError):
+
+    """Raised when a message could not be delivered because of a temporary failure and may be retried."""
+
+
+class RetryAfterError(TransientDeliveryError):
+
+    """
+    Raised when the delivery is rate limited and may be retried later.
+
+    Attributes :
+        retry_after (float): The number of seconds to wait before the next attempt.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Delivery is rate limited, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class RecipientUnreachableError(DeliveryError):
+
+    """Raised when the recipient blocked the bot or the chat no longer exists."""
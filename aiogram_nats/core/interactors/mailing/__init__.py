@@ -1,3 +1,4 @@
+from .control_mailing import CancelMailing, PauseMailing, ResumeMailing
 from .create_mailing import CreateMailing
 from .delete_mailing import RemoveMailing
 from .start_mailing import ScheduleMailing, StartMailing
@@ -7,4 +8,7 @@ __all__ = [
     "RemoveMailing",
     "StartMailing",
     "ScheduleMailing",
+    "PauseMailing",
+    "ResumeMailing",
+    "CancelMailing",
 ]
@@ -0,0 +1,70 @@
+from aiogram_nats.core.entities.mailing import Mailing
+from aiogram_nats.core.entities.progress import MailingState
+from aiogram_nats.core.interfaces.interfaces.mailing import MailingStarter
+from aiogram_nats.core.interfaces.interfaces.progress import MailingProgressStore
+
+
+class PauseMailing:
+
+    """Class is responsible for pausing a running mailing."""
+
+    def __init__(self, progress_store: MailingProgressStore) -> None:
+        self.progress_store = progress_store
+
+    async def __call__(self, mailing: Mailing) -> None:
+        """
+        Asynchronously pauses a mailing, it stops after the sends in flight and can be resumed later.
+
+        Args :
+            mailing (Mailing): The mailing to be paused.
+
+        Returns :
+            None: This function does not return anything.
+        """
+        await self.progress_store.set_state(mailing.id, MailingState.PAUSED)
+
+
+class ResumeMailing:
+
+    """Class is responsible for resuming a paused or interrupted mailing."""
+
+    def __init__(self, progress_store: MailingProgressStore, mailing_starter: MailingStarter) -> None:
+        self.progress_store = progress_store
+        self.mailing_starter = mailing_starter
+
+    async def __call__(self, mailing: Mailing) -> None:
+        """
+        Asynchronously resumes a mailing from its last saved progress.
+
+        Cancelled and completed mailings are not resumed.
+
+        Args :
+            mailing (Mailing): The mailing to be resumed.
+
+        Returns :
+            None: This function does not return anything.
+        """
+        progress = await self.progress_store.get(mailing.id)
+        if progress is not None and progress.is_finished():
+            return
+        await self.mailing_starter.start(mailing)
+
+
+class CancelMailing:
+
+    """Class is responsible for cancelling a mailing."""
+
+    def __init__(self, progress_store: MailingProgressStore) -> None:
+        self.progress_store = progress_store
+
+    async def __call__(self, mailing: Mailing) -> None:
+        """
+        Asynchronously cancels a mailing, it stops after the sends in flight and cannot be resumed.
+
+        Args :
+            mailing (Mailing): The mailing to be cancelled.
+
+        Returns :
+            None: This function does not return anything.
+        """
+        await self.progress_store.set_state(mailing.id, MailingState.CANCELLED)
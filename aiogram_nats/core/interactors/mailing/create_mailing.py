@@ -1,5 +1,5 @@
+from aiogram_nats.core.entities.audience import Audience
 from aiogram_nats.core.entities.mailing import Mailing, MailingMessage
-from aiogram_nats.core.entities.user import User
 from aiogram_nats.core.interfaces.interfaces.mailing import MailingCreator, MailingSaver
 
 
@@ -11,17 +11,17 @@ class CreateMailing:
         self.mailing_saver = mailing_saver
         self.mailing_creator = mailing_creator
 
-    async def __call__(self, message: MailingMessage, users: list[User]) -> Mailing:
+    async def __call__(self, message: MailingMessage, audience: Audience) -> Mailing:
         """
         Asynchronously creates a new mailing.
 
         Args :
             message (MailingMessage): The message of the mailing.
-            users (list[User]): The list of users associated with the mailing.
+            audience (Audience): The audience of the mailing, resolved into recipients at delivery time.
 
         Returns :
             Mailing: The newly created mailing.
         """
-        mailing = await self.mailing_creator.create(message, users)
+        mailing = await self.mailing_creator.create(message, audience)
         await self.mailing_saver.save(mailing)
         return mailing
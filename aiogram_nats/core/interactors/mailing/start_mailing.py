@@ -1,4 +1,5 @@
 from aiogram_nats.core.entities.mailing import Mailing, ScheduledMailing
+from aiogram_nats.core.interfaces.interfaces.mailing import MailingStarter
 from aiogram_nats.core.interfaces.interfaces.scheduler import Scheduler, Task
 
 
@@ -6,7 +7,7 @@ class StartMailing:
 
     """Class is responsible for starting a mailing."""
 
-    def __init__(self, mailing_starter: Task) -> None:
+    def __init__(self, mailing_starter: MailingStarter) -> None:
         self.mailing_starter = mailing_starter
 
     async def __call__(self, mailing: Mailing) -> None:
@@ -19,7 +20,7 @@ class StartMailing:
         Returns :
             None: This function does not return anything.
         """
-        await self.mailing_starter(mailing)
+        await self.mailing_starter.start(mailing)
 
 
 class ScheduleMailing:
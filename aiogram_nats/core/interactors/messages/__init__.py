@@ -1,6 +1,17 @@
-from .scheduled import ScheduleMessageDeletion, ScheduleMessageSend
+from .scheduled import (
+    CancelScheduledMessageDeletions,
+    ScheduleCoalescedMessageDeletion,
+    ScheduleMessageDeletion,
+    ScheduleMessageDeletionBatch,
+    ScheduleMessageSend,
+    ScheduleMessageSendBatch,
+)
 
 __all__ = [
     "ScheduleMessageSend",
+    "ScheduleMessageSendBatch",
     "ScheduleMessageDeletion",
+    "ScheduleMessageDeletionBatch",
+    "ScheduleCoalescedMessageDeletion",
+    "CancelScheduledMessageDeletions",
 ]
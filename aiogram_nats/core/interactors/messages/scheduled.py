@@ -1,6 +1,17 @@
-from aiogram_nats.core.entities.message import MessageDeletionScheduled, MessageSendScheduled
+import datetime
+from collections.abc import Sequence
+from typing import Final
+
+from aiogram_nats.core.entities.message import (
+    MessageBatchDeletionScheduled,
+    MessageDeletionScheduled,
+    MessageSendScheduled,
+    chat_deletions_key,
+)
 from aiogram_nats.core.interfaces.interfaces.scheduler import Scheduler, Task
 
+MAX_DELETION_BATCH_SIZE: Final[int] = 100
+
 
 class ScheduleMessageSend:
 
@@ -60,3 +71,158 @@ class ScheduleMessageDeletion:
             None.
         """
         return await self.scheduler.schedule(message, self.message_remover)
+
+
+class ScheduleMessageSendBatch:
+
+    """
+    Class responsible for scheduling the sending of many messages at once.
+
+    Args :
+        scheduler (Scheduler): The scheduler instance to use for scheduling.
+        message_sender (Task): The message sender instance to use for sending messages.
+
+    """
+
+    def __init__(self, scheduler: Scheduler, message_sender: Task) -> None:
+        self.scheduler = scheduler
+        self.message_sender = message_sender
+
+    async def __call__(self, messages: Sequence[MessageSendScheduled]) -> list[str]:
+        """
+        Asynchronously schedules tasks to send the scheduled messages.
+
+        Args :
+            messages (Sequence[MessageSendScheduled]): The scheduled messages to send.
+
+        Returns :
+            list[str]: The scheduling IDs of the sending tasks in the order of the messages.
+        """
+        return await self.scheduler.schedule_many(messages, self.message_sender)
+
+
+class ScheduleMessageDeletionBatch:
+
+    """
+    Class is responsible for scheduling the deletion of many messages at once.
+
+    Attributes :
+        scheduler (Scheduler): The scheduler object used to schedule tasks.
+        message_remover (Task): The message remover object used to remove messages.
+
+    """
+
+    def __init__(self, scheduler: Scheduler, remover: Task) -> None:
+        self.scheduler = scheduler
+        self.message_remover = remover
+
+    async def __call__(self, messages: Sequence[MessageDeletionScheduled]) -> list[str]:
+        """
+        Asynchronously schedules the deletion of the messages.
+
+        Args :
+            messages (Sequence[MessageDeletionScheduled]): The messages to be deleted.
+
+        Returns :
+            list[str]: The scheduling IDs of the deletion tasks in the order of the messages.
+        """
+        return await self.scheduler.schedule_many(messages, self.message_remover)
+
+
+class ScheduleCoalescedMessageDeletion:
+
+    """
+    Class is responsible for scheduling the deletion of many messages in coalesced batches.
+
+    The deletions of one chat due within the same time bucket are scheduled as one task which deletes up to `batch_size` messages at once.
+    A batch is scheduled at the latest time of its deletions, so that no message is deleted before its time.
+
+    Attributes :
+        scheduler (Scheduler): The scheduler object used to schedule tasks.
+        message_remover (Task): The message remover object used to remove batches of messages.
+        bucket (datetime.timedelta): The duration of the time buckets.
+        batch_size (int): The maximum number of messages in a batch.
+
+    """
+
+    def __init__(
+            self,
+            scheduler: Scheduler,
+            remover: Task,
+            bucket: datetime.timedelta = datetime.timedelta(seconds=1),
+            batch_size: int = MAX_DELETION_BATCH_SIZE,
+    ) -> None:
+        if not 0 < batch_size <= MAX_DELETION_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_DELETION_BATCH_SIZE}")
+        self.scheduler = scheduler
+        self.message_remover = remover
+        self.bucket = bucket
+        self.batch_size = batch_size
+
+    async def __call__(self, messages: Sequence[MessageDeletionScheduled]) -> list[str]:
+        """
+        Asynchronously schedules the deletion of the messages in batches.
+
+        Args :
+            messages (Sequence[MessageDeletionScheduled]): The messages to be deleted.
+
+        Returns :
+            list[str]: The scheduling IDs of the batch deletion tasks.
+        """
+        batches = self.coalesce(messages)
+        if not batches:
+            return []
+        return await self.scheduler.schedule_many(batches, self.message_remover)
+
+    def coalesce(self, messages: Sequence[MessageDeletionScheduled]) -> list[MessageBatchDeletionScheduled]:
+        """
+        Groups the deletions by chat and time bucket into batches.
+
+        Args :
+            messages (Sequence[MessageDeletionScheduled]): The messages to be deleted.
+
+        Returns :
+            list[MessageBatchDeletionScheduled]: The batches ordered by their scheduled time.
+        """
+        bucket_seconds = self.bucket.total_seconds()
+        groups: dict[tuple[int, int], list[MessageDeletionScheduled]] = {}
+        for message in messages:
+            bucket = int(message.scheduled_time.timestamp() // bucket_seconds) if bucket_seconds > 0 else 0
+            groups.setdefault((message.user.id, bucket), []).append(message)
+        batches = []
+        for group in groups.values():
+            for start in range(0, len(group), self.batch_size):
+                chunk = group[start:start + self.batch_size]
+                batches.append(MessageBatchDeletionScheduled(
+                    scheduled_time=max(message.scheduled_time for message in chunk),
+                    user=chunk[0].user,
+                    ids=[message.id for message in chunk],
+                ))
+        batches.sort(key=lambda batch: batch.scheduled_time)
+        return batches
+
+
+class CancelScheduledMessageDeletions:
+
+    """
+    Class is responsible for cancelling every pending deletion of the messages of a chat.
+
+    Attributes :
+        scheduler (Scheduler): The scheduler object the deletions were scheduled with.
+
+    """
+
+    def __init__(self, scheduler: Scheduler) -> None:
+        self.scheduler = scheduler
+
+    async def __call__(self, chat_id: int) -> int:
+        """
+        Asynchronously cancels the pending deletions of the messages of the chat.
+
+        Args :
+            chat_id (int): The ID of the chat.
+
+        Returns :
+            int: The number of cancelled schedules.
+        """
+        return await self.scheduler.cancel_by_key(chat_deletions_key(chat_id))
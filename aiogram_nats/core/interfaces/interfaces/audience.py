@@ -0,0 +1,30 @@
+from collections.abc import AsyncGenerator
+from typing import Optional, Protocol
+
+from aiogram_nats.core.entities.audience import Audience, Partition
+
+
+class AudienceResolver(Protocol):
+
+    """Protocol for resolving an audience into recipient chat IDs."""
+
+    def iter_recipients(
+            self,
+            audience: Audience,
+            after: Optional[int] = None,
+            chunk_size: int = 1000,
+            partition: Optional[Partition] = None,
+    ) -> AsyncGenerator[list[int], None]:
+        """
+        Asynchronously iterates over the chat IDs of the audience in ascending order, chunk by chunk.
+
+        Args :
+            audience (Audience): The audience to be resolved.
+            after (Optional[int]): Only the chat IDs greater than this one are returned. Defaults to None.
+            chunk_size (int): The maximum number of chat IDs in a chunk. Defaults to 1000.
+            partition (Optional[Partition]): Only the chat IDs of this partition are returned. Defaults to None.
+
+        Returns :
+            AsyncGenerator[list[int], None]: The chunks of chat IDs.
+        """
+        raise NotImplementedError
@@ -1,20 +1,20 @@
 from typing import Protocol
 
+from aiogram_nats.core.entities.audience import Audience
 from aiogram_nats.core.entities.mailing import Mailing, MailingMessage
-from aiogram_nats.core.entities.user import User
 
 
 class MailingCreator(Protocol):
 
     """Protocol for creating a mailing."""
 
-    async def create(self, message: MailingMessage, users: list[User]) -> Mailing:
+    async def create(self, message: MailingMessage, audience: Audience) -> Mailing:
         """
         Asynchronously creates a new mailing.
 
         Args :
             message (MailingMessage): The message of the mailing.
-            users (list[User]): The list of users associated with the mailing.
+            audience (Audience): The audience of the mailing, resolved into recipients at delivery time.
 
         Returns :
             Mailing: The newly created mailing.
@@ -0,0 +1,28 @@
+from typing import Optional, Protocol
+
+
+class FileIdCache(Protocol):
+
+    """Protocol for caching the Telegram file IDs of uploaded media."""
+
+    async def get(self, media_address: str) -> Optional[str]:
+        """
+        Asynchronously retrieves the Telegram file ID of an uploaded media.
+
+        Args :
+            media_address (str): The address of the media.
+
+        Returns :
+            Optional[str]: The file ID, or None if the media was not uploaded yet.
+        """
+        raise NotImplementedError
+
+    async def set(self, media_address: str, file_id: str) -> None:
+        """
+        Asynchronously saves the Telegram file ID of an uploaded media.
+
+        Args :
+            media_address (str): The address of the media.
+            file_id (str): The file ID returned by Telegram.
+        """
+        raise NotImplementedError
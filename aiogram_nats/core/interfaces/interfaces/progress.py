@@ -0,0 +1,83 @@
+from collections.abc import Iterable
+from typing import Optional, Protocol
+from uuid import UUID
+
+from aiogram_nats.core.entities.audience import Partition
+from aiogram_nats.core.entities.progress import MailingProgress, MailingState, PartitionReport
+
+
+class MailingProgressStore(Protocol):
+
+    """Protocol for persisting the execution progress of mailings."""
+
+    async def get(self, mailing_id: UUID, partition: Optional[Partition] = None) -> Optional[MailingProgress]:
+        """
+        Asynchronously retrieves the progress of a mailing.
+
+        Args :
+            mailing_id (UUID): The ID of the mailing.
+            partition (Optional[Partition]): The partition whose cursor is retrieved, the whole mailing if None.
+
+        Returns :
+            Optional[MailingProgress]: The progress of the mailing, or None if the mailing was never started.
+        """
+        raise NotImplementedError
+
+    async def save_cursor(
+            self,
+            mailing_id: UUID,
+            cursor: Optional[int],
+            completed: Iterable[int] = (),
+            partition: Optional[Partition] = None,
+    ) -> None:
+        """
+        Asynchronously saves the progress cursor of a mailing.
+
+        Args :
+            mailing_id (UUID): The ID of the mailing.
+            cursor (Optional[int]): The chat ID up to which all recipients have been processed.
+            completed (Iterable[int]): The chat IDs of recipients after the cursor that have already been processed.
+            partition (Optional[Partition]): The partition whose cursor is saved, the whole mailing if None.
+        """
+        raise NotImplementedError
+
+    async def save_report(self, mailing_id: UUID, report: PartitionReport) -> None:
+        """
+        Asynchronously saves the delivery results of a partition of a mailing.
+
+        Args :
+            mailing_id (UUID): The ID of the mailing.
+            report (PartitionReport): The delivery results of the partition.
+        """
+        raise NotImplementedError
+
+    async def get_reports(self, mailing_id: UUID) -> list[PartitionReport]:
+        """
+        Asynchronously retrieves the delivery results of all reported partitions of a mailing.
+
+        Args :
+            mailing_id (UUID): The ID of the mailing.
+
+        Returns :
+            list[PartitionReport]: The reports ordered by the partition index.
+        """
+        raise NotImplementedError
+
+    async def set_state(self, mailing_id: UUID, state: MailingState) -> None:
+        """
+        Asynchronously sets the execution state of a mailing.
+
+        Args :
+            mailing_id (UUID): The ID of the mailing.
+            state (MailingState): The new state of the mailing.
+        """
+        raise NotImplementedError
+
+    async def delete(self, mailing_id: UUID) -> None:
+        """
+        Asynchronously deletes the progress of a mailing.
+
+        Args :
+            mailing_id (UUID): The ID of the mailing.
+        """
+        raise NotImplementedError
@@ -1,5 +1,6 @@
-from collections.abc import Awaitable, Callable
-from typing import Any, Protocol, TypeVar
+import datetime
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, Optional, Protocol, TypeVar
 
 from aiogram_nats.core.entities.scheduled import ScheduledEntity
 
@@ -32,3 +33,58 @@ class Scheduler(Protocol):
 
         """
         raise NotImplementedError
+
+    async def schedule_many(self, entities: Sequence[SupportScheduled], task: Task) -> list[str]:
+        """
+        Schedules a task to be executed for each of the entities at its scheduled time.
+
+        Args :
+            entities (Sequence[SupportScheduled]): The entities to be scheduled.
+            task (Task): The task to be executed for each entity.
+
+        Returns :
+            list[str]: The scheduling IDs in the order of the entities.
+
+        """
+        raise NotImplementedError
+
+    async def cancel(self, schedule_id: str) -> bool:
+        """
+        Cancels a pending schedule.
+
+        Args :
+            schedule_id (str): The scheduling ID.
+
+        Returns :
+            bool: True if the schedule was pending and is cancelled, False if it was not found
+            or if the schedule source cannot tell whether it was pending.
+
+        """
+        raise NotImplementedError
+
+    async def reschedule(self, schedule_id: str, scheduled_time: datetime.datetime) -> Optional[str]:
+        """
+        Moves a pending schedule to another time.
+
+        Args :
+            schedule_id (str): The scheduling ID.
+            scheduled_time (datetime.datetime): The new time of the schedule.
+
+        Returns :
+            Optional[str]: The scheduling ID after the move, which may differ from the original one, or None if the schedule was not found.
+
+        """
+        raise NotImplementedError
+
+    async def cancel_by_key(self, key: str) -> int:
+        """
+        Cancels every pending schedule of the entities indexed by the key.
+
+        Args :
+            key (str): One of the keys returned by `ScheduledEntity.schedule_keys`.
+
+        Returns :
+            int: The number of cancelled schedules.
+
+        """
+        raise NotImplementedError
@@ -0,0 +1,23 @@
+from typing import Optional, Protocol
+
+from aiogram_nats.core.entities.mailing import MailingMessage
+
+
+class MessageSender(Protocol):
+
+    """Protocol for sending a mailing message to a single recipient."""
+
+    async def send(self, chat_id: int, message: MailingMessage, name: Optional[str] = None) -> None:
+        """
+        Asynchronously sends a message to a chat.
+
+        Args :
+            chat_id (int): The ID of the recipient chat.
+            message (MailingMessage): The message to be sent.
+            name (Optional[str]): The name of the recipient substituted for the `{name}` placeholders. Defaults to None.
+
+        Raises :
+            RetryAfterError: If the delivery is rate limited.
+            DeliveryError: If the message could not be delivered.
+        """
+        raise NotImplementedError
@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
 from typing import Optional, Protocol
 
 from aiogram_nats.core.entities.user import User
@@ -45,3 +45,34 @@ class UserGetter(Protocol):
             Sequence[User]: A sequence of retrieved User objects.
         """
         raise NotImplementedError
+
+
+class UserReachabilityUpdater(Protocol):
+
+    """A protocol for marking users who can no longer receive messages."""
+
+    async def mark_unreachable(self, user_ids: Collection[int]) -> None:
+        """
+        Marks the users as unreachable, so they are skipped by future mailings.
+
+        Args :
+            user_ids (Collection[int]): The IDs of the users.
+        """
+        raise NotImplementedError
+
+
+class UserNameGetter(Protocol):
+
+    """A protocol for getting the names of users, which personalize the mailing messages."""
+
+    async def get_names(self, user_ids: Collection[int]) -> dict[int, str]:
+        """
+        Retrieves the names of the users.
+
+        Args :
+            user_ids (Collection[int]): The IDs of the users.
+
+        Returns :
+            dict[int, str]: The names by user ID, unknown users are omitted.
+        """
+        raise NotImplementedError
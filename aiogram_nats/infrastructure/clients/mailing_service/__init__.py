@@ -1,3 +1,5 @@
 from aiogram_nats.infrastructure.clients.mailing_service.client import MailingServiceClient
+from aiogram_nats.infrastructure.clients.mailing_service.delivery import DeliveryBatch
+from aiogram_nats.infrastructure.clients.mailing_service.jobs import MailingJob, MailingJobState
 
-__all__ = ["MailingServiceClient"]
+__all__ = ["MailingServiceClient", "DeliveryBatch", "MailingJob", "MailingJobState"]
@@ -1,12 +1,35 @@
-import json
-from typing import Any
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator, Sized
+from contextlib import suppress
+from typing import Any, Final, Optional
+from uuid import uuid4
 
 from nats.aio.client import Client
 from nats.aio.msg import Msg
-from nats.errors import TimeoutError
+from nats.errors import MsgAlreadyAckdError, TimeoutError
 from nats.js import JetStreamContext
+from nats.js.api import AckPolicy, ConsumerConfig, Header, PubAck, RetentionPolicy, StreamConfig
+from nats.js.errors import KeyNotFoundError, NotFoundError
+from nats.js.kv import KeyValue
 
 from aiogram_nats.common.settings.models.mailing_service import MailingServiceSettings
+from aiogram_nats.infrastructure.clients.mailing_service.codecs import PayloadSerializer
+from aiogram_nats.infrastructure.clients.mailing_service.delivery import DeliveryBatch
+from aiogram_nats.infrastructure.clients.mailing_service.jobs import MailingJob, MailingJobState
+from aiogram_nats.infrastructure.database.kv.factory import get_or_create_kv
+from aiogram_nats.infrastructure.delivery.rate_limit import TokenBucket
+
+_FRAME_HEADERS_RESERVE: Final[int] = 1024
+_FRAME_ARRAY_RESERVE: Final[int] = 5
+
+MAILING_ID_HEADER: Final[str] = "Mailing-Id"
+FAILURE_REASON_HEADER: Final[str] = "Failure-Reason"
+ORIGINAL_SUBJECT_HEADER: Final[str] = "Original-Subject"
+DELIVERY_COUNT_HEADER: Final[str] = "Delivery-Count"
+JOB_ID_HEADER: Final[str] = "Job-Id"
+_DEAD_LETTER_HEADERS: Final[frozenset[str]] = frozenset({
+    FAILURE_REASON_HEADER, ORIGINAL_SUBJECT_HEADER, DELIVERY_COUNT_HEADER, Header.MSG_ID.value,
+})
 
 
 class MailingServiceClient:
@@ -16,15 +39,18 @@ class MailingServiceClient:
     def __init__(
             self,
             nats_client: Client,
-            messages_psub: JetStreamContext.PullSubscription,
             mailing_service_settings: MailingServiceSettings,
             js: JetStreamContext,
+            serializer: Optional[PayloadSerializer] = None,
     ) -> None:
         self._nc = nats_client
-        self._psub = messages_psub
         self._js = js
         self._subject = f"{mailing_service_settings.main_subject}.{mailing_service_settings.service}"
         self._settings = mailing_service_settings
+        self._serializer = serializer or PayloadSerializer.from_settings(mailing_service_settings)
+        self._psubs: dict[str, JetStreamContext.PullSubscription] = {}
+        self._psubs_lock = asyncio.Lock()
+        self._jobs_kv: Optional[KeyValue] = None
 
     async def get_mailing_messages(self, mailing_id: str, batch: int = 1, timeout: int = 5) -> list[Msg]:
         """
@@ -38,18 +64,137 @@ class MailingServiceClient:
         """
         return await self._get_mailing_messages(mailing_id, batch, timeout)
 
-    async def get_all_mailing_messages(self, mailing_id: str, timeout: int = 5) -> list[Msg]:
+    async def iter_mailing_messages(
+            self, mailing_id: str, max_inflight: int = 100, timeout: int = 5, *, auto_ack: bool = True,
+    ) -> AsyncIterator[Msg]:
         """
-        Asynchronously retrieves all mailing messages for a given mailing ID.
+        Asynchronously iterates over the mailing messages for a given mailing ID.
+
+        Messages are fetched in batches of at most `max_inflight` messages, the next batch is requested
+        only after the previous one has been consumed, so memory usage does not depend on the stream size.
+        The iteration stops when no messages arrive within `timeout`.
 
         :param mailing_id: (str): The ID of the mailing.
-        :param timeout: (int): An integer representing the maximum time to wait for a response from the server. Defaults to 5.
+        :param max_inflight: (int): The maximum number of fetched but not yet acknowledged messages. Defaults to 100.
+        :param timeout: (int): An integer representing the maximum time to wait for a batch from the server. Defaults to 5.
+        :param auto_ack: (bool): Whether to acknowledge each message once the consumer resumes the iteration. Defaults to True.
 
-        :return: (list[Msg]): A list of Msg objects.
+        :return: (AsyncIterator[Msg]): An asynchronous iterator of Msg objects.
+        """
+        if max_inflight < 1:
+            raise ValueError("max_inflight must be greater than 0")
+        while msgs := await self._get_mailing_messages(mailing_id, batch=max_inflight, timeout=timeout):
+            for msg in msgs:
+                yield msg
+                if auto_ack:
+                    with suppress(MsgAlreadyAckdError):
+                        await msg.ack()
+
+    def delivery_batch(self, messages: Iterable[Msg] = (), *, dead_letter: bool = True) -> DeliveryBatch:
+        """
+        Creates a batch collecting the delivery outcomes of fetched mailing messages.
+
+        :param messages: (Iterable[Msg]): The fetched messages. More messages can be added to the batch later.
+        :param dead_letter: (bool): Whether terminated messages are published to the dead-letter stream. Defaults to True.
+
+        :return: (DeliveryBatch): The delivery batch configured from the mailing service settings.
+        """
+        return DeliveryBatch(
+            self._nc,
+            messages,
+            flush_size=self._settings.ack_flush_size,
+            heartbeat_interval=self._settings.heartbeat_interval,
+            max_redelivery_delay=self._settings.max_redelivery_delay,
+            max_deliveries=self._settings.max_deliveries,
+            dead_letter=self.publish_dead_letter if dead_letter else None,
+        )
+
+    async def ensure_dead_letter_stream(self) -> None:
+        """
+        Creates the dead-letter stream if it does not exist.
+
+        The stream has the work queue retention, so replayed dead letters are removed from it.
+
+        :return: (None)
+        """
+        await self._js.add_stream(StreamConfig(
+            name=self._settings.dead_letter_stream_name,
+            subjects=[self.dead_letter_subject(">")],
+            retention=RetentionPolicy.WORK_QUEUE,
+        ))
+
+    async def publish_dead_letter(self, msg: Msg, reason: str) -> PubAck:
+        """
+        Asynchronously publishes a mailing message whose delivery failed for good to the dead-letter stream.
+
+        The dead letter keeps the data and the headers of the message and carries
+        the `Mailing-Id`, `Failure-Reason`, `Original-Subject` and `Delivery-Count` headers.
+
+        :param msg: (Msg): The failed mailing message.
+        :param reason: (str): The reason of the failure.
+
+        :return: (PubAck): The publish acknowledgement of the dead letter.
+        """
+        headers = dict(msg.headers or {})
+        headers.pop(Header.MSG_ID.value, None)
+        mailing_id = headers.get(MAILING_ID_HEADER) or msg.subject.rsplit(".", 1)[-1]
+        headers |= {
+            MAILING_ID_HEADER: mailing_id,
+            FAILURE_REASON_HEADER: reason,
+            ORIGINAL_SUBJECT_HEADER: msg.subject,
+            DELIVERY_COUNT_HEADER: str(msg.metadata.num_delivered),
+        }
+        return await self._js.publish(
+            self.dead_letter_subject(mailing_id), msg.data, stream=self._settings.dead_letter_stream_name, headers=headers,
+        )
+
+    async def replay_dead_letters(
+            self,
+            mailing_id: Optional[str] = None,
+            rate: float = 10.0,
+            limit: Optional[int] = None,
+            batch: int = 100,
+            timeout: float = 1,
+    ) -> int:
         """
-        stream_info = await self._js.stream_info(self._settings.stream_name)
-        batch = stream_info.state.messages
-        return await self._get_mailing_messages(mailing_id, batch=batch, timeout=timeout)
+        Asynchronously re-injects dead letters into the mailing streams at a controlled rate.
+
+        Every dead letter is published back to its original subject without the failure headers
+        and is acknowledged once the mailing stream stores it, which removes it from the dead-letter stream.
+        The replay stops when no dead letters arrive within `timeout` or after `limit` of them.
+
+        :param mailing_id: (Optional[str]): The ID of the mailing whose dead letters are replayed, all mailings if None.
+        :param rate: (float): The maximum number of replayed messages per second. Defaults to 10.
+        :param limit: (Optional[int]): The maximum number of replayed messages, unlimited if None.
+        :param batch: (int): The number of dead letters fetched at once. Defaults to 100.
+        :param timeout: (float): The maximum time to wait for a batch from the server. Defaults to 1.
+
+        :return: (int): The number of replayed messages.
+        """
+        bucket = TokenBucket(rate)
+        psub = await self._js.pull_subscribe(
+            self.dead_letter_subject(mailing_id or "*"),
+            stream=self._settings.dead_letter_stream_name,
+            config=ConsumerConfig(ack_policy=AckPolicy.EXPLICIT, inactive_threshold=self._settings.consumer_inactive_threshold),
+        )
+        replayed = 0
+        try:
+            while limit is None or replayed < limit:
+                fetch = batch if limit is None else min(batch, limit - replayed)
+                try:
+                    msgs = await psub.fetch(batch=fetch, timeout=timeout)
+                except TimeoutError:
+                    break
+                for msg in msgs:
+                    await bucket.acquire()
+                    headers = {key: value for key, value in (msg.headers or {}).items() if key not in _DEAD_LETTER_HEADERS}
+                    subject = (msg.headers or {}).get(ORIGINAL_SUBJECT_HEADER) or self.messages_subject(msg.subject.rsplit(".", 1)[-1])
+                    await self._js.publish(subject, msg.data, stream=self._settings.stream_name, headers=headers)
+                    await msg.ack()
+                    replayed += 1
+        finally:
+            await psub.unsubscribe()
+        return replayed
 
     async def create_mailing(self, payload_array: list[Any], timeout: float = 0.5) -> str:
         """
@@ -60,33 +205,249 @@ class MailingServiceClient:
 
         :return: (str): The response from the NATS server as a decoded string.
         """
-        payload = self._get_payload(payload_array)
-        response = await self._nc.request(self._subject, payload, timeout=timeout)
+        payload, headers = self._serializer.dumps(payload_array)
+        response = await self._nc.request(self._subject, payload, timeout=timeout, headers=headers)
+        return response.data.decode(encoding="utf-8")
+
+    async def create_mailing_chunked(self, payload_array: Iterable[Any], timeout: float = 5) -> str:
+        """
+        Asynchronously creates a new mailing by submitting its payloads in size-bounded frames.
+
+        The payloads are split into frames no larger than `max_frame_size` (the server max payload by default),
+        which are published to JetStream with at most `max_pending_frames` publish acks outstanding.
+        Once every frame is stored, a commit request is sent and the mailing service replies with the mailing ID.
+
+        :param payload_array: (Iterable[Any]): An iterable of payloads to be included in the mailing.
+        :param timeout: (float, optional): The maximum time to wait for the commit response. Defaults to 5.
+
+        :return: (str): The ID of the created mailing.
+        """
+        submission_id = uuid4().hex
+        frames = await self._publish_frames(submission_id, payload_array)
+        payload, headers = self._serializer.dumps({"submission_id": submission_id, "frames": frames})
+        response = await self._nc.request(f"{self._subject}.commit", payload, timeout=timeout, headers=headers)
         return response.data.decode(encoding="utf-8")
 
+    async def submit_mailing(self, payload_array: Iterable[Any]) -> str:
+        """
+        Asynchronously submits a mailing creation job and returns without waiting for the mailing service.
+
+        The payloads are published in frames to the submission stream like in `create_mailing_chunked`,
+        then the job referencing the frames is stored in the jobs stream. Its status is kept in the jobs KV bucket under the job ID,
+        where the mailing service reports the progress and the ID of the created mailing.
+
+        :param payload_array: (Iterable[Any]): An iterable of payloads to be included in the mailing.
+
+        :return: (str): The ID of the job.
+        """
+        job = MailingJob(uuid4().hex, total=len(payload_array) if isinstance(payload_array, Sized) else None)
+        kv = await self._get_jobs_kv()
+        await kv.put(job.job_id, job.to_bytes())
+        try:
+            frames = await self._publish_frames(job.job_id, payload_array)
+            payload, headers = self._serializer.dumps({"submission_id": job.job_id, "frames": frames})
+            headers |= {JOB_ID_HEADER: job.job_id, Header.MSG_ID.value: job.job_id}
+            await self._js.publish(
+                f"{self._subject}.{self._settings.jobs_subject}", payload, stream=self._settings.jobs_stream_name, headers=headers,
+            )
+        except Exception as e:
+            job.state, job.error = MailingJobState.FAILED, f"Job was not submitted: {e}"
+            await kv.put(job.job_id, job.to_bytes())
+            raise
+        return job.job_id
+
+    async def get_mailing_job(self, job_id: str) -> Optional[MailingJob]:
+        """
+        Asynchronously retrieves the status of a mailing creation job.
+
+        :param job_id: (str): The ID of the job.
+
+        :return: (Optional[MailingJob]): The status of the job, or None if the job is unknown or expired.
+        """
+        kv = await self._get_jobs_kv()
+        try:
+            entry = await kv.get(job_id)
+        except KeyNotFoundError:
+            return None
+        return MailingJob.from_bytes(job_id, entry.value) if entry.value else None
+
+    async def watch_mailing_job(self, job_id: str, timeout: Optional[float] = None) -> AsyncIterator[MailingJob]:
+        """
+        Asynchronously iterates over the status updates of a mailing creation job, starting with the current status.
+
+        The iteration stops once the job is finished or its status is deleted.
+
+        :param job_id: (str): The ID of the job.
+        :param timeout: (Optional[float]): The maximum time to wait for the next update, unlimited if None.
+
+        :return: (AsyncIterator[MailingJob]): An asynchronous iterator of the job statuses.
+
+        :raises TimeoutError: If no update arrives within `timeout`.
+        """
+        kv = await self._get_jobs_kv()
+        watcher = await kv.watch(job_id)
+        try:
+            while True:
+                entry = await watcher.updates(timeout=timeout)
+                if entry is None:
+                    continue
+                if not entry.value:
+                    return
+                job = MailingJob.from_bytes(job_id, entry.value)
+                yield job
+                if job.is_finished():
+                    return
+        finally:
+            await watcher.stop()
+
+    async def wait_mailing_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[MailingJob]:
+        """
+        Asynchronously waits until a mailing creation job is finished.
+
+        :param job_id: (str): The ID of the job.
+        :param timeout: (Optional[float]): The maximum time to wait for the next status update, unlimited if None.
+
+        :return: (Optional[MailingJob]): The final status of the job, or None if its status was deleted.
+
+        :raises TimeoutError: If no update arrives within `timeout`.
+        """
+        last = None
+        async for job in self.watch_mailing_job(job_id, timeout):
+            last = job
+        return last if last is not None and last.is_finished() else None
+
     async def delete_mailing(self, mailing_id: str) -> None:
         """
         Deletes a mailing by publishing a message to the delete subject with the given mailing ID.
 
+        The consumer of the mailing messages is removed as well.
+
         :param mailing_id: (str): The ID of the mailing to be deleted.
 
         :return: (None)
         """
-        payload = self._get_payload(mailing_id)
-        await self._nc.publish(f"{self._subject}.delete", payload)
+        payload, headers = self._serializer.dumps(mailing_id)
+        await self._nc.publish(f"{self._subject}.delete", payload, headers=headers)
+        await self.close_mailing_consumer(mailing_id, delete=True)
+
+    async def close_mailing_consumer(self, mailing_id: str, *, delete: bool = False) -> None:
+        """
+        Unsubscribes from the messages of the given mailing.
+
+        :param mailing_id: (str): The ID of the mailing.
+        :param delete: (bool): Whether to delete the consumer on the server. Otherwise, it is removed after the inactive threshold.
+
+        :return: (None)
+        """
+        async with self._psubs_lock:
+            psub = self._psubs.pop(mailing_id, None)
+        if psub is not None:
+            await psub.unsubscribe()
+        if delete:
+            with suppress(NotFoundError):
+                await self._js.delete_consumer(self._settings.stream_name, self._consumer_name(mailing_id))
+
+    def messages_subject(self, mailing_id: str) -> str:
+        """
+        Returns the subject on which the messages of the given mailing are published.
+
+        :param mailing_id: (str): The ID of the mailing.
+
+        :return: (str): The subject of the mailing messages.
+        """
+        return f"{self._subject}.{self._settings.messages_subject}.{mailing_id}"
+
+    def dead_letter_subject(self, mailing_id: str) -> str:
+        """
+        Returns the subject on which the dead letters of the given mailing are published.
+
+        :param mailing_id: (str): The ID of the mailing.
+
+        :return: (str): The subject of the dead letters.
+        """
+        return f"{self._subject}.{self._settings.dead_letter_subject}.{mailing_id}"
+
+    async def _get_jobs_kv(self) -> KeyValue:
+        if self._jobs_kv is None:
+            self._jobs_kv = await get_or_create_kv(self._js, self._settings.jobs_kv)
+        return self._jobs_kv
 
     async def _get_mailing_messages(self, mailing_id: str, batch: int = 1, timeout: int = 5) -> list[Msg]:
+        psub = await self._get_mailing_psub(mailing_id)
         try:
-            msgs = await self._psub.fetch(batch=batch, timeout=timeout)
+            return await psub.fetch(batch=batch, timeout=timeout)
         except TimeoutError:
             return []
-        else:
-            messages: list[Msg] = [
-                msg for msg in msgs if msg.headers and msg.headers.get("Mailing-Id") == mailing_id
-            ]
-            return messages
-
-    @staticmethod
-    def _get_payload(obj: Any) -> bytes:
-        payload = json.dumps(obj)
-        return payload.encode(encoding="utf-8")
+
+    async def _get_mailing_psub(self, mailing_id: str) -> JetStreamContext.PullSubscription:
+        async with self._psubs_lock:
+            if (psub := self._psubs.get(mailing_id)) is None:
+                psub = await self._js.pull_subscribe(
+                    self.messages_subject(mailing_id),
+                    durable=self._consumer_name(mailing_id),
+                    stream=self._settings.stream_name,
+                    config=ConsumerConfig(
+                        ack_policy=AckPolicy.EXPLICIT,
+                        inactive_threshold=self._settings.consumer_inactive_threshold,
+                    ),
+                )
+                self._psubs[mailing_id] = psub
+        return psub
+
+    def decode_message(self, msg: Msg) -> Any:
+        """
+        Decodes the data of a message received from the mailing service.
+
+        The format of the data is taken from the Content-Type and Content-Encoding headers of the message.
+
+        :param msg: (Msg): The received message.
+
+        :return: (Any): The decoded data.
+        """
+        return self._serializer.loads(msg.data, msg.headers)
+
+    async def _publish_frames(self, submission_id: str, payload_array: Iterable[Any]) -> int:
+        subject = f"{self._subject}.{self._settings.submission_subject}.{submission_id}"
+        pending: set[asyncio.Future[PubAck]] = set()
+        frames = 0
+
+        for frame in self._iter_frames(payload_array, self._settings.max_frame_size or self._nc.max_payload - _FRAME_HEADERS_RESERVE):
+            if len(pending) >= self._settings.max_pending_frames:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            frame, headers = self._serializer.finalize(frame)
+            headers |= {
+                "Submission-Id": submission_id,
+                "Frame-Seq": str(frames),
+                Header.MSG_ID.value: f"{submission_id}.{frames}",
+            }
+            pending.add(
+                await self._js.publish_async(subject, frame, stream=self._settings.submission_stream_name, headers=headers),
+            )
+            frames += 1
+
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            for future in done:
+                future.result()
+        return frames
+
+    def _iter_frames(self, payload_array: Iterable[Any], max_frame_size: int) -> Iterator[bytes]:
+        codec = self._serializer.codec
+        items: list[bytes] = []
+        size = _FRAME_ARRAY_RESERVE
+        for obj in payload_array:
+            item = codec.encode(obj)
+            if len(item) + _FRAME_ARRAY_RESERVE > max_frame_size:
+                raise ValueError(f"Payload of {len(item)} bytes does not fit into a frame of {max_frame_size} bytes")
+            if items and size + len(item) + 1 > max_frame_size:
+                yield codec.join(items)
+                items, size = [], _FRAME_ARRAY_RESERVE
+            items.append(item)
+            size += len(item) + 1
+        if items:
+            yield codec.join(items)
+
+    def _consumer_name(self, mailing_id: str) -> str:
+        return f"{self._settings.service}_{mailing_id}"
@@ -0,0 +1,257 @@
+import importlib
+import json
+from collections.abc import Mapping
+from types import ModuleType
+from typing import Any, Final, Optional, Protocol
+
+from aiogram_nats.common.settings.models.mailing_service import MailingServiceSettings, PayloadCodec, PayloadCompression
+
+CONTENT_TYPE_HEADER: Final[str] = "Content-Type"
+CONTENT_ENCODING_HEADER: Final[str] = "Content-Encoding"
+IDENTITY_ENCODING: Final[str] = "identity"
+
+
+def _import_optional(module: str, codec: str) -> ModuleType:
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise RuntimeError(f"The {codec} codec requires the `{module}` package to be installed") from e
+
+
+class Codec(Protocol):
+
+    """Protocol for encoding and decoding mailing service payloads."""
+
+    content_type: str
+
+    def encode(self, obj: Any) -> bytes:
+        """
+        Encodes an object into bytes.
+
+        :param obj: (Any): The object to be encoded.
+
+        :return: (bytes): The encoded object.
+        """
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Decodes bytes into an object.
+
+        :param data: (bytes): The data to be decoded.
+
+        :return: (Any): The decoded object.
+        """
+        raise NotImplementedError
+
+    def join(self, items: list[bytes]) -> bytes:
+        """
+        Joins already encoded objects into an encoded array without re-encoding them.
+
+        :param items: (list[bytes]): The encoded objects.
+
+        :return: (bytes): The encoded array.
+        """
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+
+    """Codec based on the standard library json module."""
+
+    content_type = "application/json"
+
+    def encode(self, obj: Any) -> bytes:
+        """Encodes an object into JSON bytes."""
+        return json.dumps(obj).encode(encoding="utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        """Decodes JSON bytes into an object."""
+        return json.loads(data)
+
+    def join(self, items: list[bytes]) -> bytes:
+        """Joins encoded objects into a JSON array."""
+        return b"[" + b",".join(items) + b"]"
+
+
+class OrjsonCodec(JsonCodec):
+
+    """JSON codec based on orjson, wire compatible with JsonCodec."""
+
+    def __init__(self) -> None:
+        self._orjson = _import_optional("orjson", "orjson")
+
+    def encode(self, obj: Any) -> bytes:
+        """Encodes an object into JSON bytes with orjson."""
+        data: bytes = self._orjson.dumps(obj)
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        """Decodes JSON bytes into an object with orjson."""
+        return self._orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+
+    """Codec based on msgpack."""
+
+    content_type = "application/msgpack"
+
+    def __init__(self) -> None:
+        self._msgpack = _import_optional("msgpack", "msgpack")
+
+    def encode(self, obj: Any) -> bytes:
+        """Encodes an object into msgpack bytes."""
+        data: bytes = self._msgpack.packb(obj)
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        """Decodes msgpack bytes into an object."""
+        return self._msgpack.unpackb(data)
+
+    def join(self, items: list[bytes]) -> bytes:
+        """Joins encoded objects into a msgpack array."""
+        size = len(items)
+        if size < 16:  # noqa: PLR2004
+            header = bytes((0x90 | size,))
+        elif size < 2 ** 16:
+            header = b"\xdc" + size.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + size.to_bytes(4, "big")
+        return header + b"".join(items)
+
+
+class Compressor(Protocol):
+
+    """Protocol for compressing mailing service payloads."""
+
+    encoding: str
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compresses the given data.
+
+        :param data: (bytes): The data to be compressed.
+
+        :return: (bytes): The compressed data.
+        """
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompresses the given data.
+
+        :param data: (bytes): The data to be decompressed.
+
+        :return: (bytes): The decompressed data.
+        """
+        raise NotImplementedError
+
+
+class ZstdCompressor(Compressor):
+
+    """Compressor based on zstandard."""
+
+    encoding = "zstd"
+
+    def __init__(self, level: int = 3) -> None:
+        zstandard = _import_optional("zstandard", "zstd")
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        """Compresses the given data with zstd."""
+        compressed: bytes = self._compressor.compress(data)
+        return compressed
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompresses the given zstd data."""
+        decompressed: bytes = self._decompressor.decompress(data)
+        return decompressed
+
+
+_CODECS: Final[dict[PayloadCodec, type[Codec]]] = {
+    PayloadCodec.JSON: JsonCodec,
+    PayloadCodec.ORJSON: OrjsonCodec,
+    PayloadCodec.MSGPACK: MsgpackCodec,
+}
+
+_COMPRESSORS: Final[dict[PayloadCompression, type[Compressor]]] = {
+    PayloadCompression.ZSTD: ZstdCompressor,
+}
+
+
+class PayloadSerializer:
+
+    """
+    Serializes mailing service payloads with the configured codec and compression.
+
+    The used format is described by the Content-Type and Content-Encoding headers,
+    so payloads are decoded with the format they were encoded with.
+    Payloads without headers are treated as uncompressed JSON.
+    """
+
+    def __init__(self, codec: Codec, compressor: Optional[Compressor] = None, compression_threshold: int = 0) -> None:
+        self.codec = codec
+        self.compressor = compressor
+        self.compression_threshold = compression_threshold
+        self._codecs: dict[str, Codec] = {JsonCodec.content_type: JsonCodec(), codec.content_type: codec}
+        self._compressors: dict[str, Compressor] = {compressor.encoding: compressor} if compressor else {}
+
+    @classmethod
+    def from_settings(cls, settings: MailingServiceSettings) -> "PayloadSerializer":
+        """
+        Creates a PayloadSerializer from the mailing service settings.
+
+        :param settings: (MailingServiceSettings): The mailing service settings.
+
+        :return: (PayloadSerializer): The created serializer.
+        """
+        compressor = None if settings.compression == PayloadCompression.NONE else _COMPRESSORS[settings.compression]()
+        return cls(_CODECS[settings.codec](), compressor, settings.compression_threshold)
+
+    def dumps(self, obj: Any) -> tuple[bytes, dict[str, str]]:
+        """
+        Serializes an object.
+
+        :param obj: (Any): The object to be serialized.
+
+        :return: (tuple[bytes, dict[str, str]]): The payload and the headers describing its format.
+        """
+        return self.finalize(self.codec.encode(obj))
+
+    def finalize(self, data: bytes) -> tuple[bytes, dict[str, str]]:
+        """
+        Compresses already encoded data if it exceeds the compression threshold.
+
+        :param data: (bytes): The data encoded with the codec.
+
+        :return: (tuple[bytes, dict[str, str]]): The payload and the headers describing its format.
+        """
+        headers = {CONTENT_TYPE_HEADER: self.codec.content_type, CONTENT_ENCODING_HEADER: IDENTITY_ENCODING}
+        if self.compressor is not None and len(data) >= self.compression_threshold:
+            data = self.compressor.compress(data)
+            headers[CONTENT_ENCODING_HEADER] = self.compressor.encoding
+        return data, headers
+
+    def loads(self, data: bytes, headers: Optional[Mapping[str, str]] = None) -> Any:
+        """
+        Deserializes a payload according to its headers.
+
+        :param data: (bytes): The payload.
+        :param headers: (Optional[Mapping[str, str]]): The headers of the message.
+
+        :return: (Any): The deserialized object.
+
+        :raises ValueError: If the format of the payload is not supported.
+        """
+        headers = headers or {}
+        content_type = headers.get(CONTENT_TYPE_HEADER, JsonCodec.content_type)
+        encoding = headers.get(CONTENT_ENCODING_HEADER, IDENTITY_ENCODING)
+        if encoding != IDENTITY_ENCODING:
+            if (compressor := self._compressors.get(encoding)) is None:
+                raise ValueError(f"Unsupported content encoding: {encoding}")
+            data = compressor.decompress(data)
+        if (codec := self._codecs.get(content_type)) is None:
+            raise ValueError(f"Unsupported content type: {content_type}")
+        return codec.decode(data)
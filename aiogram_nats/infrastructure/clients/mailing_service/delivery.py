@@ -0,0 +1,230 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import suppress
+from enum import Enum
+from types import TracebackType
+from typing import Any, Optional, Self
+
+from nats.aio.client import Client
+from nats.aio.msg import Msg
+from nats.errors import MsgAlreadyAckdError
+
+DeadLetterPublisher = Callable[[Msg, str], Awaitable[Any]]
+
+
+class DeliveryOutcome(Enum):
+
+    """An enumeration of outcomes of a mailing message delivery."""
+
+    ACK = "ack"
+    NAK = "nak"
+    TERM = "term"
+
+
+class DeliveryBatch:
+
+    """
+    Collects the delivery outcomes of fetched mailing messages and acknowledges them in batches.
+
+    Outcomes are buffered and written to the server together once `flush_size` outcomes are collected,
+    followed by a single flush of the connection instead of a round-trip per message.
+    While the batch is used as an asynchronous context manager, messages without an outcome
+    receive `in_progress` heartbeats every `heartbeat_interval` seconds, and on exit the remaining outcomes are flushed
+    and messages without an outcome are negatively acknowledged for redelivery.
+    With a dead-letter publisher, terminated messages and messages which exhausted `max_deliveries`
+    are published to the dead-letter stream with the failure reason before they are terminated.
+    A message whose dead-letter publish fails is terminated by a later flush once the publish succeeds,
+    or redelivered by the server if the batch is closed before that.
+    """
+
+    def __init__(
+            self,
+            nats_client: Client,
+            messages: Iterable[Msg] = (),
+            *,
+            flush_size: int = 100,
+            heartbeat_interval: Optional[float] = 10.0,
+            base_redelivery_delay: float = 1.0,
+            max_redelivery_delay: float = 300.0,
+            max_deliveries: Optional[int] = None,
+            dead_letter: Optional[DeadLetterPublisher] = None,
+    ) -> None:
+        self._nc = nats_client
+        self.flush_size = flush_size
+        self.heartbeat_interval = heartbeat_interval
+        self.base_redelivery_delay = base_redelivery_delay
+        self.max_redelivery_delay = max_redelivery_delay
+        self.max_deliveries = max_deliveries
+        self.dead_letter = dead_letter
+        self._pending: dict[int, Msg] = {}
+        self._outcomes: list[tuple[Msg, DeliveryOutcome, Optional[float], Optional[str]]] = []
+        self._lock = asyncio.Lock()
+        self._heartbeat: Optional[asyncio.Task[None]] = None
+        self.add(messages)
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of messages without an outcome."""
+        return len(self._pending)
+
+    def add(self, messages: Iterable[Msg]) -> None:
+        """
+        Adds fetched messages to the batch.
+
+        :param messages: (Iterable[Msg]): The fetched messages.
+
+        :return: (None)
+        """
+        for msg in messages:
+            self._pending[id(msg)] = msg
+
+    async def ack(self, msg: Msg) -> None:
+        """
+        Records a successful delivery of the message.
+
+        :param msg: (Msg): The delivered message.
+
+        :return: (None)
+        """
+        await self._record(msg, DeliveryOutcome.ACK)
+
+    async def nak(self, msg: Msg, delay: Optional[float] = None) -> None:
+        """
+        Records a failed delivery of the message, which is redelivered after the given delay.
+
+        :param msg: (Msg): The message to be redelivered.
+        :param delay: (Optional[float]): The redelivery delay in seconds. Defaults to None, meaning immediate redelivery.
+
+        :return: (None)
+        """
+        await self._record(msg, DeliveryOutcome.NAK, delay)
+
+    async def retry(self, msg: Msg, retry_after: Optional[float] = None, reason: Optional[str] = None) -> None:
+        """
+        Records a failed delivery of the message and computes its redelivery delay.
+
+        The delay grows exponentially with the number of deliveries of the message,
+        is never shorter than the `retry_after` requested by Telegram and never longer than `max_redelivery_delay`.
+        A message delivered `max_deliveries` times is terminated instead.
+
+        :param msg: (Msg): The message to be redelivered.
+        :param retry_after: (Optional[float]): The flood-wait in seconds reported by Telegram. Defaults to None.
+        :param reason: (Optional[str]): The reason of the failure, recorded if the message is terminated. Defaults to None.
+
+        :return: (None)
+        """
+        if self.max_deliveries is not None and msg.metadata.num_delivered >= self.max_deliveries:
+            await self.term(msg, f"Delivery attempts are exhausted: {reason or 'unknown error'}")
+        else:
+            await self.nak(msg, self.redelivery_delay(msg, retry_after))
+
+    async def term(self, msg: Msg, reason: Optional[str] = None) -> None:
+        """
+        Records that the message must never be redelivered.
+
+        :param msg: (Msg): The message to be terminated.
+        :param reason: (Optional[str]): The reason of the failure, sent to the dead-letter stream. Defaults to None.
+
+        :return: (None)
+        """
+        await self._record(msg, DeliveryOutcome.TERM, reason=reason)
+
+    def redelivery_delay(self, msg: Msg, retry_after: Optional[float] = None) -> float:
+        """
+        Computes the redelivery delay of the message.
+
+        :param msg: (Msg): The message to be redelivered.
+        :param retry_after: (Optional[float]): The flood-wait in seconds reported by Telegram. Defaults to None.
+
+        :return: (float): The redelivery delay in seconds.
+        """
+        attempt: int = max(msg.metadata.num_delivered - 1, 0)
+        backoff: float = self.base_redelivery_delay * 2 ** attempt
+        return min(max(backoff, retry_after or 0.0), self.max_redelivery_delay)
+
+    async def flush(self) -> None:
+        """
+        Writes all recorded outcomes to the server.
+
+        A terminated message whose dead-letter publish failed is not terminated,
+        its outcome is kept and published again by the next flush.
+
+        :return: (None)
+        """
+        async with self._lock:
+            outcomes, self._outcomes = self._outcomes, []
+            if self.dead_letter is not None:
+                terms = [(msg, reason) for msg, outcome, _, reason in outcomes if outcome == DeliveryOutcome.TERM]
+                results = await asyncio.gather(*(self.dead_letter(msg, reason or "Terminated") for msg, reason in terms), return_exceptions=True)
+                failed = {id(msg) for (msg, _), result in zip(terms, results, strict=True) if isinstance(result, BaseException)}
+                if failed:
+                    # Outcomes recorded while the dead letters were published are kept behind the deferred terms.
+                    self._outcomes[:0] = [item for item in outcomes if id(item[0]) in failed]
+                    outcomes = [item for item in outcomes if id(item[0]) not in failed]
+            for msg, outcome, delay, _ in outcomes:
+                with suppress(MsgAlreadyAckdError):
+                    if outcome == DeliveryOutcome.ACK:
+                        await msg.ack()
+                    elif outcome == DeliveryOutcome.NAK:
+                        await msg.nak(delay)
+                    else:
+                        await msg.term()
+            if outcomes:
+                await self._nc.flush()
+
+    async def heartbeat(self) -> None:
+        """
+        Tells the server that the messages without an outcome are still being processed.
+
+        :return: (None)
+        """
+        async with self._lock:
+            for msg in list(self._pending.values()):
+                await msg.in_progress()
+            if self._pending:
+                await self._nc.flush()
+
+    async def __aenter__(self) -> Self:
+        """
+        Starts sending heartbeats for the messages without an outcome.
+
+        :return: The DeliveryBatch instance itself.
+        """
+        if self.heartbeat_interval:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop(self.heartbeat_interval))
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Optional[type[BaseException]],
+            exc_val: Optional[BaseException],
+            exc_tb: Optional[TracebackType],
+    ) -> None:
+        """
+        Stops the heartbeats and flushes the outcomes, messages without an outcome are redelivered.
+
+        :param exc_type: The type of exception that occurred, if any.
+        :param exc_val: The value of the exception that occurred, if any.
+        :param exc_tb: The traceback of the exception that occurred, if any.
+        :return: None
+        """
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat
+            self._heartbeat = None
+        for msg in list(self._pending.values()):
+            self._outcomes.append((msg, DeliveryOutcome.NAK, None, None))
+        self._pending.clear()
+        await self.flush()
+
+    async def _record(self, msg: Msg, outcome: DeliveryOutcome, delay: Optional[float] = None, reason: Optional[str] = None) -> None:
+        self._pending.pop(id(msg), None)
+        self._outcomes.append((msg, outcome, delay, reason))
+        if len(self._outcomes) >= self.flush_size:
+            await self.flush()
+
+    async def _heartbeat_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.heartbeat()
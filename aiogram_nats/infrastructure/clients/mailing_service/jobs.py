@@ -0,0 +1,77 @@
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional, Self
+
+
+class MailingJobState(Enum):
+
+    """An enumeration of the states of a mailing creation job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class MailingJob:
+
+    """
+    Represents the status of a mailing creation job submitted to the mailing service.
+
+    Attributes :
+        job_id (str): The ID of the job.
+        state (MailingJobState): The state of the job.
+        mailing_id (Optional[str]): The ID of the created mailing, once the job is completed.
+        processed (int): The number of payloads processed by the mailing service.
+        total (Optional[int]): The total number of payloads of the job, if known.
+        error (Optional[str]): The reason of the failure, if the job failed.
+    """
+
+    job_id: str
+    state: MailingJobState = MailingJobState.QUEUED
+    mailing_id: Optional[str] = None
+    processed: int = 0
+    total: Optional[int] = None
+    error: Optional[str] = None
+
+    def is_finished(self) -> bool:
+        """
+        Checks if the job will not change anymore.
+
+        Returns :
+            bool: True if the job is completed or failed, False otherwise.
+        """
+        return self.state in {MailingJobState.COMPLETED, MailingJobState.FAILED}
+
+    def to_bytes(self) -> bytes:
+        """Returns the JSON representation of the job status stored in the KV bucket."""
+        data: dict[str, Any] = {
+            "state": self.state.value,
+            "mailing_id": self.mailing_id,
+            "processed": self.processed,
+            "total": self.total,
+            "error": self.error,
+        }
+        return json.dumps(data).encode()
+
+    @classmethod
+    def from_bytes(cls, job_id: str, data: bytes) -> Self:
+        """
+        Creates the job status from its JSON representation stored in the KV bucket.
+
+        :param job_id: (str): The ID of the job.
+        :param data: (bytes): The JSON representation.
+
+        :return: (MailingJob): The job status.
+        """
+        status = json.loads(data)
+        return cls(
+            job_id=job_id,
+            state=MailingJobState(status["state"]),
+            mailing_id=status.get("mailing_id"),
+            processed=status.get("processed", 0),
+            total=status.get("total"),
+            error=status.get("error"),
+        )
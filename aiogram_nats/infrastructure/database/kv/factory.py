@@ -0,0 +1,21 @@
+from nats.js import JetStreamContext
+from nats.js.api import KeyValueConfig
+from nats.js.errors import BucketNotFoundError
+from nats.js.kv import KeyValue
+
+
+async def get_or_create_kv(js: JetStreamContext, config: KeyValueConfig) -> KeyValue:
+    """
+    Binds to a NATS KV bucket, creating it from the given config if it does not exist.
+
+    Args :
+        js (JetStreamContext): The JetStream context.
+        config (KeyValueConfig): The config of the bucket.
+
+    Returns :
+        KeyValue: The bound KV bucket.
+    """
+    try:
+        return await js.key_value(config.bucket)
+    except BucketNotFoundError:
+        return await js.create_key_value(config=config)
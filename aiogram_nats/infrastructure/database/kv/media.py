@@ -0,0 +1,48 @@
+import hashlib
+from typing import Optional
+
+from nats.js.errors import KeyNotFoundError
+from nats.js.kv import KeyValue
+
+from aiogram_nats.core.interfaces.interfaces.media import FileIdCache
+
+
+class KVFileIdCache(FileIdCache):
+
+    """
+    Caches the Telegram file IDs of uploaded media in a NATS KV bucket.
+
+    Keys are SHA-256 hashes of the media addresses, entries expire with the TTL of the bucket.
+    """
+
+    def __init__(self, kv: KeyValue) -> None:
+        self.kv = kv
+
+    async def get(self, media_address: str) -> Optional[str]:
+        """
+        Asynchronously retrieves the Telegram file ID of an uploaded media.
+
+        :param media_address: (str): The address of the media.
+
+        :return: (Optional[str]): The file ID, or None if the media was not uploaded yet.
+        """
+        try:
+            entry = await self.kv.get(self._key(media_address))
+        except KeyNotFoundError:
+            return None
+        return entry.value.decode() if entry.value else None
+
+    async def set(self, media_address: str, file_id: str) -> None:
+        """
+        Asynchronously saves the Telegram file ID of an uploaded media.
+
+        :param media_address: (str): The address of the media.
+        :param file_id: (str): The file ID returned by Telegram.
+
+        :return: (None)
+        """
+        await self.kv.put(self._key(media_address), file_id.encode())
+
+    @staticmethod
+    def _key(media_address: str) -> str:
+        return hashlib.sha256(media_address.encode()).hexdigest()
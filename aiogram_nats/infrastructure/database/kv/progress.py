@@ -0,0 +1,158 @@
+import json
+from collections.abc import Iterable
+from typing import Optional
+from uuid import UUID
+
+from nats.js.errors import KeyNotFoundError
+from nats.js.kv import KeyValue
+
+from aiogram_nats.core.entities.audience import Partition
+from aiogram_nats.core.entities.progress import MailingProgress, MailingState, PartitionReport
+from aiogram_nats.core.interfaces.interfaces.progress import MailingProgressStore
+
+
+class KVMailingProgressStore(MailingProgressStore):
+
+    """
+    Stores the execution progress of mailings in a NATS KV bucket.
+
+    The cursor and the state are kept under separate keys, so that the state can be changed
+    by other processes while the cursor is being checkpointed.
+    Every partition of a mailing has its own cursor and report keys.
+    """
+
+    def __init__(self, kv: KeyValue) -> None:
+        self.kv = kv
+
+    async def get(self, mailing_id: UUID, partition: Optional[Partition] = None) -> Optional[MailingProgress]:
+        """
+        Asynchronously retrieves the progress of a mailing.
+
+        :param mailing_id: (UUID): The ID of the mailing.
+        :param partition: (Optional[Partition]): The partition whose cursor is retrieved, the whole mailing if None.
+
+        :return: (Optional[MailingProgress]): The progress of the mailing, or None if the mailing was never started.
+        """
+        state = await self._get(self._state_key(mailing_id))
+        if state is None:
+            return None
+        cursor = json.loads(await self._get(self._cursor_key(mailing_id, partition)) or "{}")
+        return MailingProgress(
+            mailing_id=mailing_id,
+            cursor=cursor.get("cursor"),
+            completed=frozenset(cursor.get("completed", ())),
+            state=MailingState(state),
+        )
+
+    async def save_cursor(
+            self,
+            mailing_id: UUID,
+            cursor: Optional[int],
+            completed: Iterable[int] = (),
+            partition: Optional[Partition] = None,
+    ) -> None:
+        """
+        Asynchronously saves the progress cursor of a mailing.
+
+        :param mailing_id: (UUID): The ID of the mailing.
+        :param cursor: (Optional[int]): The chat ID up to which all recipients have been processed.
+        :param completed: (Iterable[int]): The chat IDs of recipients after the cursor that have already been processed.
+        :param partition: (Optional[Partition]): The partition whose cursor is saved, the whole mailing if None.
+
+        :return: (None)
+        """
+        value = json.dumps({"cursor": cursor, "completed": sorted(completed)})
+        await self.kv.put(self._cursor_key(mailing_id, partition), value.encode())
+
+    async def save_report(self, mailing_id: UUID, report: PartitionReport) -> None:
+        """
+        Asynchronously saves the delivery results of a partition of a mailing.
+
+        :param mailing_id: (UUID): The ID of the mailing.
+        :param report: (PartitionReport): The delivery results of the partition.
+
+        :return: (None)
+        """
+        value = json.dumps({
+            "index": report.partition.index,
+            "count": report.partition.count,
+            "sent": report.sent,
+            "failed": report.failed,
+            "finished": report.finished,
+            "heartbeat": report.heartbeat,
+            "owner": report.owner,
+        })
+        await self.kv.put(f"{mailing_id}.report.{report.partition.index}", value.encode())
+
+    async def get_reports(self, mailing_id: UUID) -> list[PartitionReport]:
+        """
+        Asynchronously retrieves the delivery results of all reported partitions of a mailing.
+
+        :param mailing_id: (UUID): The ID of the mailing.
+
+        :return: (list[PartitionReport]): The reports ordered by the partition index.
+        """
+        reports = []
+        for value in (await self._get_all(f"{mailing_id}.report.*")).values():
+            report = json.loads(value)
+            reports.append(PartitionReport(
+                partition=Partition(report["index"], report["count"]),
+                sent=report["sent"],
+                failed=report["failed"],
+                finished=report["finished"],
+                heartbeat=report.get("heartbeat", 0),
+                owner=report.get("owner"),
+            ))
+        return sorted(reports, key=lambda report: report.partition.index)
+
+    async def set_state(self, mailing_id: UUID, state: MailingState) -> None:
+        """
+        Asynchronously sets the execution state of a mailing.
+
+        :param mailing_id: (UUID): The ID of the mailing.
+        :param state: (MailingState): The new state of the mailing.
+
+        :return: (None)
+        """
+        await self.kv.put(self._state_key(mailing_id), state.value.encode())
+
+    async def delete(self, mailing_id: UUID) -> None:
+        """
+        Asynchronously deletes the progress of a mailing.
+
+        :param mailing_id: (UUID): The ID of the mailing.
+
+        :return: (None)
+        """
+        for key in await self._get_all(f"{mailing_id}.>"):
+            await self.kv.purge(key)
+
+    async def _get(self, key: str) -> Optional[str]:
+        try:
+            entry = await self.kv.get(key)
+        except KeyNotFoundError:
+            return None
+        return entry.value.decode() if entry.value else None
+
+    async def _get_all(self, keys: str) -> dict[str, str]:
+        watcher = await self.kv.watch(keys, ignore_deletes=True)
+        values = {}
+        try:
+            async for entry in watcher:
+                if entry is None:
+                    break
+                if entry.value:
+                    values[entry.key] = entry.value.decode()
+        finally:
+            await watcher.stop()
+        return values
+
+    @staticmethod
+    def _cursor_key(mailing_id: UUID, partition: Optional[Partition] = None) -> str:
+        if partition is None:
+            return f"{mailing_id}.cursor"
+        return f"{mailing_id}.cursor.{partition.index}"
+
+    @staticmethod
+    def _state_key(mailing_id: UUID) -> str:
+        return f"{mailing_id}.state"
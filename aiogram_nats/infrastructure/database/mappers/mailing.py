@@ -0,0 +1,61 @@
+from base64 import b64decode, b64encode
+from typing import Any, Final, cast
+from uuid import UUID
+
+from adaptix import Retort, dumper, loader
+
+from aiogram_nats.core.entities.audience import AllUsers, Audience, ExplicitRecipients, JoinedBetween
+from aiogram_nats.core.entities.mailing import Mailing, MailingMessage
+from aiogram_nats.core.entities.recipients import RecipientSet
+
+_AUDIENCE_TYPES: Final[dict[str, type[Audience]]] = {
+    "all_users": AllUsers,
+    "joined_between": JoinedBetween,
+    "explicit_recipients": ExplicitRecipients,
+}
+_AUDIENCE_TAGS: Final[dict[type[Audience], str]] = {audience_type: tag for tag, audience_type in _AUDIENCE_TYPES.items()}
+
+_mailing_retort = Retort(
+    recipe=[
+        loader(RecipientSet, lambda data: RecipientSet.from_bytes(b64decode(data))),
+        dumper(RecipientSet, lambda recipients: b64encode(recipients.to_bytes()).decode()),
+    ],
+)
+
+
+def mailing_to_dict(mailing: Mailing) -> dict[str, Any]:
+    """
+    Converts a mailing into a JSON-compatible dictionary, the audience is tagged with its type.
+
+    :param mailing: (Mailing): The mailing to be converted.
+
+    :return: (dict[str, Any]): The dictionary representing the mailing.
+    """
+    return {
+        "id": str(mailing.id),
+        "audience": {"type": _AUDIENCE_TAGS[type(mailing.audience)], **_mailing_retort.dump(mailing.audience)},
+        "message": _mailing_retort.dump(mailing.message),
+    }
+
+
+def dict_to_mailing(data: dict[str, Any]) -> Mailing:
+    """
+    Converts a dictionary produced by `mailing_to_dict` back into a mailing.
+
+    :param data: (dict[str, Any]): The dictionary representing the mailing.
+
+    :return: (Mailing): The mailing.
+    """
+    audience = dict(data["audience"])
+    audience_type = _AUDIENCE_TYPES[audience.pop("type")]
+    return Mailing(
+        id=UUID(data["id"]),
+        audience=cast(Audience, _mailing_retort.load(audience, audience_type)),
+        message=_mailing_retort.load(data["message"], MailingMessage),
+    )
+
+
+__all__ = [
+    "mailing_to_dict",
+    "dict_to_mailing",
+]
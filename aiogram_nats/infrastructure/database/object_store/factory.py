@@ -0,0 +1,23 @@
+from nats.js import JetStreamContext
+from nats.js.api import ObjectStoreConfig
+from nats.js.errors import BucketNotFoundError
+from nats.js.object_store import ObjectStore
+
+
+async def get_or_create_object_store(js: JetStreamContext, config: ObjectStoreConfig) -> ObjectStore:
+    """
+    Binds to a NATS Object Store bucket, creating it from the given config if it does not exist.
+
+    Args :
+        js (JetStreamContext): The JetStream context.
+        config (ObjectStoreConfig): The config of the bucket.
+
+    Returns :
+        ObjectStore: The bound Object Store bucket.
+    """
+    if not config.bucket:
+        raise ValueError("The bucket name of the Object Store is required")
+    try:
+        return await js.object_store(config.bucket)
+    except BucketNotFoundError:
+        return await js.create_object_store(config=config)
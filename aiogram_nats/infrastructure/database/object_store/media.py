@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import hashlib
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Final, Optional, Union
+
+from nats.errors import TimeoutError
+from nats.js import JetStreamContext
+from nats.js.api import AckPolicy, ConsumerConfig, DeliverPolicy, ObjectInfo, ObjectMeta, ObjectMetaOptions
+from nats.js.errors import DigestMismatchError
+from nats.js.object_store import OBJ_CHUNKS_PRE_TEMPLATE, OBJ_DIGEST_TYPE, OBJ_STREAM_TEMPLATE, ObjectStore
+
+OBJECT_STORE_SCHEME: Final[str] = "nats-object://"
+
+
+class ObjectStoreMediaStorage:
+
+    """
+    Stores mailing media in a NATS Object Store bucket and reads them back chunk by chunk.
+
+    Stored media are addressed as `nats-object://<name>` in `media_address`.
+    Chunks are read through a pull consumer one at a time, so at most one chunk of a media is held in memory.
+    """
+
+    def __init__(self, js: JetStreamContext, store: ObjectStore, bucket: str, chunk_size: int = 128 * 1024, timeout: float = 5.0) -> None:
+        self.js = js
+        self.store = store
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    @staticmethod
+    def is_stored(media_address: str) -> bool:
+        """
+        Checks if the media address points to the Object Store.
+
+        :param media_address: (str): The address of the media.
+
+        :return: (bool): True if the media is stored in the Object Store.
+        """
+        return media_address.startswith(OBJECT_STORE_SCHEME)
+
+    @staticmethod
+    def object_name(media_address: str) -> str:
+        """
+        Returns the object name of a media address pointing to the Object Store.
+
+        :param media_address: (str): The address of the media.
+
+        :return: (str): The name of the object.
+        """
+        return media_address.removeprefix(OBJECT_STORE_SCHEME)
+
+    async def put_file(self, path: Union[str, Path], name: Optional[str] = None) -> str:
+        """
+        Asynchronously stores a local file in the Object Store, reading it chunk by chunk.
+
+        The file is opened, read and closed in worker threads, so the event loop is never blocked by the disk.
+
+        :param path: (Union[str, Path]): The path of the file.
+        :param name: (Optional[str]): The name of the object. Defaults to the name of the file.
+
+        :return: (str): The media address of the stored object.
+        """
+        path = Path(path)
+        name = name or path.name
+        meta = ObjectMeta(name=name, options=ObjectMetaOptions(max_chunk_size=self.chunk_size))
+        file = await asyncio.to_thread(path.open, "rb")
+        try:
+            # The store reads buffered files with `readinto` in the default executor of the loop.
+            await self.store.put(name, file, meta=meta)
+        finally:
+            await asyncio.to_thread(file.close)
+        return f"{OBJECT_STORE_SCHEME}{name}"
+
+    async def get_info(self, media_address: str) -> ObjectInfo:
+        """
+        Asynchronously retrieves the info of a stored media.
+
+        :param media_address: (str): The media address of the object.
+
+        :return: (ObjectInfo): The info of the object.
+        """
+        return await self.store.get_info(self.object_name(media_address))
+
+    async def iter_chunks(self, media_address: str) -> AsyncGenerator[bytes, None]:
+        """
+        Asynchronously iterates over the chunks of a stored media and verifies its digest at the end.
+
+        The next chunk is requested only after the previous one has been consumed.
+
+        :param media_address: (str): The media address of the object.
+
+        :return: (AsyncGenerator[bytes, None]): The chunks of the media.
+
+        :raises DigestMismatchError: If the digest of the read data does not match the digest of the object.
+        """
+        info = await self.get_info(media_address)
+        if not info.size:
+            return
+        psub = await self.js.pull_subscribe(
+            OBJ_CHUNKS_PRE_TEMPLATE.format(bucket=self.bucket, obj=info.nuid),
+            stream=OBJ_STREAM_TEMPLATE.format(bucket=self.bucket),
+            config=ConsumerConfig(
+                ack_policy=AckPolicy.EXPLICIT,
+                deliver_policy=DeliverPolicy.ALL,
+                max_ack_pending=1,
+                inactive_threshold=self.timeout * 2,
+            ),
+        )
+        digest = hashlib.sha256()
+        try:
+            for _ in range(info.chunks or 0):
+                try:
+                    msg = (await psub.fetch(batch=1, timeout=self.timeout))[0]
+                except TimeoutError as e:
+                    raise TimeoutError(f"Chunk of {media_address} was not received in time") from e
+                await msg.ack()
+                digest.update(msg.data)
+                yield msg.data
+        finally:
+            await psub.unsubscribe()
+        expected = base64.urlsafe_b64decode((info.digest or "").removeprefix(OBJ_DIGEST_TYPE).removeprefix(OBJ_DIGEST_TYPE.upper()))
+        if digest.digest() != expected:
+            raise DigestMismatchError
@@ -0,0 +1,63 @@
+from collections.abc import AsyncGenerator
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from aiogram_nats.core.entities.audience import Audience, ExplicitRecipients, JoinedBetween, Partition
+from aiogram_nats.core.interfaces.interfaces.audience import AudienceResolver
+from aiogram_nats.infrastructure.database.rdb.dao.user import UserDAO
+
+
+class RDBAudienceResolver(AudienceResolver):
+
+    """
+    Resolves audiences into recipient chat IDs by streaming them from the relational database.
+
+    User IDs are read with keyset pagination, every chunk in its own short session,
+    so neither the whole audience nor a database connection is held for the duration of a mailing.
+    Users marked as unreachable are skipped, explicit recipients are checked against them with one query per chunk.
+    """
+
+    def __init__(self, pool: async_sessionmaker[AsyncSession]) -> None:
+        self.pool = pool
+
+    async def iter_recipients(
+            self,
+            audience: Audience,
+            after: Optional[int] = None,
+            chunk_size: int = 1000,
+            partition: Optional[Partition] = None,
+    ) -> AsyncGenerator[list[int], None]:
+        """
+        Asynchronously iterates over the chat IDs of the audience in ascending order, chunk by chunk.
+
+        :param audience: (Audience): The audience to be resolved.
+        :param after: (Optional[int]): Only the chat IDs greater than this one are returned. Defaults to None.
+        :param chunk_size: (int): The maximum number of chat IDs in a chunk. Defaults to 1000.
+        :param partition: (Optional[Partition]): Only the chat IDs of this partition are returned. Defaults to None.
+
+        :return: (AsyncGenerator[list[int], None]): The chunks of chat IDs.
+        """
+        if isinstance(audience, ExplicitRecipients):
+            for chunk in audience.recipients.chunks(chunk_size, after=after):
+                ids = chunk.tolist() if partition is None else [chat_id for chat_id in chunk if chat_id in partition]
+                if not ids:
+                    continue
+                async with self.pool() as session:
+                    unreachable = await UserDAO(session).get_unreachable_ids(ids)
+                if unreachable:
+                    ids = [chat_id for chat_id in ids if chat_id not in unreachable]
+                if ids:
+                    yield ids
+            return
+
+        joined = audience if isinstance(audience, JoinedBetween) else JoinedBetween()
+        while True:
+            async with self.pool() as session:
+                ids = await UserDAO(session).get_ids(
+                    after=after, limit=chunk_size, joined_since=joined.since, joined_until=joined.until, partition=partition,
+                )
+            if not ids:
+                return
+            yield ids
+            after = ids[-1]
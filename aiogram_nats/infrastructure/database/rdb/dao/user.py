@@ -1,8 +1,12 @@
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
+from datetime import datetime
+from typing import Optional
 
+from sqlalchemy import func, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from aiogram_nats.core.entities.audience import Partition
 from aiogram_nats.core.entities.user import User as UserEntity
 from aiogram_nats.infrastructure.database.mappers.rdb import userdb_to_entity
 from aiogram_nats.infrastructure.database.rdb.dao.base import BaseDAO
@@ -33,6 +37,8 @@ class UserDAO(BaseDAO[User]):
         """
         Inserts or updates a user in the database.
 
+        An upserted user is considered reachable again.
+
         Args :
             user (User): The user to be inserted or updated.
 
@@ -44,6 +50,7 @@ class UserDAO(BaseDAO[User]):
             "first_name": user.first_name,
             "last_name": user.last_name,
             "username": user.username,
+            "is_reachable": True,
         }
         saved_user = await self.session.execute(
             insert(User)
@@ -56,12 +63,103 @@ class UserDAO(BaseDAO[User]):
         )
         return userdb_to_entity(saved_user.scalar_one())
 
-    async def get_all(self) -> Sequence[UserEntity]:
+    async def get_all(self, *, include_unreachable: bool = False) -> Sequence[UserEntity]:
         """
         Retrieves all User objects from the database.
 
+        Args :
+            include_unreachable (bool): Whether the users marked as unreachable are included. Defaults to False.
+
         Returns :
             Sequence[User]: A sequence of all User objects.
         """
-        users = await self._get_all()
-        return [userdb_to_entity(user) for user in users]
+        query = select(User)
+        if not include_unreachable:
+            query = query.where(User.is_reachable)
+        users = await self.session.scalars(query)
+        return [userdb_to_entity(user) for user in users.all()]
+
+    async def get_names(self, user_ids: Collection[int]) -> dict[int, str]:
+        """
+        Retrieves the names of the users with one select statement.
+
+        Args :
+            user_ids (Collection[int]): The IDs of the users.
+
+        Returns :
+            dict[int, str]: The names by user ID, unknown users are omitted.
+        """
+        if not user_ids:
+            return {}
+        users = await self.session.scalars(select(User).where(User.id.in_(user_ids)))
+        return {user.id: userdb_to_entity(user).name for user in users.all()}
+
+    async def get_unreachable_ids(self, user_ids: Collection[int]) -> set[int]:
+        """
+        Retrieves which of the users are marked as unreachable with one select statement.
+
+        Args :
+            user_ids (Collection[int]): The IDs of the users.
+
+        Returns :
+            set[int]: The IDs of the unreachable users, unknown users are omitted.
+        """
+        if not user_ids:
+            return set()
+        result = await self.session.scalars(select(User.id).where(User.id.in_(user_ids), ~User.is_reachable))
+        return set(result.all())
+
+    async def mark_unreachable(self, user_ids: Collection[int], failed_at: Optional[datetime] = None) -> None:
+        """
+        Marks the users as unreachable with one update statement.
+
+        Args :
+            user_ids (Collection[int]): The IDs of the users.
+            failed_at (Optional[datetime]): The time of the failed delivery. Defaults to the current database time.
+        """
+        if not user_ids:
+            return
+        await self.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(is_reachable=False, last_failed_at=failed_at or func.now()),
+        )
+
+    async def get_ids(
+            self,
+            *,
+            after: Optional[int] = None,
+            limit: int = 1000,
+            joined_since: Optional[datetime] = None,
+            joined_until: Optional[datetime] = None,
+            partition: Optional[Partition] = None,
+            include_unreachable: bool = False,
+    ) -> list[int]:
+        """
+        Retrieves a page of user IDs in ascending order.
+
+        Args :
+            after (Optional[int]): Only the IDs greater than this one are returned. Defaults to None.
+            limit (int): The maximum number of IDs. Defaults to 1000.
+            joined_since (Optional[datetime]): Only the users who joined at this time or later are returned. Defaults to None.
+            joined_until (Optional[datetime]): Only the users who joined before this time are returned. Defaults to None.
+            partition (Optional[Partition]): Only the IDs of this partition are returned. Defaults to None.
+            include_unreachable (bool): Whether the users marked as unreachable are included. Defaults to False.
+
+        Returns :
+            list[int]: The IDs of the users.
+        """
+        query = select(User.id).order_by(User.id).limit(limit)
+        if after is not None:
+            query = query.where(User.id > after)
+        if joined_since is not None:
+            query = query.where(User.joined_us >= joined_since)
+        if joined_until is not None:
+            query = query.where(User.joined_us < joined_until)
+        if partition is not None:
+            # The SQL remainder takes the sign of the dividend, it is shifted to match `Partition` for negative IDs.
+            query = query.where((User.id % partition.count + partition.count) % partition.count == partition.index)
+        if not include_unreachable:
+            query = query.where(User.is_reachable)
+        result = await self.session.scalars(query)
+        return list(result.all())
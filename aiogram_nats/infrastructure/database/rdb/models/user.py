@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import BigInteger, DateTime, Text, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Text, func, true
 from sqlalchemy.orm import Mapped, mapped_column
 
 from aiogram_nats.infrastructure.database.rdb.models.base import Base
@@ -18,6 +18,8 @@ class User(Base):
         first_name (str): The first name of the user.
         last_name (str): The last name of the user.
         joined_us (datetime): The date and time when the user joined.
+        is_reachable (bool): False if the last message to the user failed because the bot was blocked or the chat is gone.
+        last_failed_at (Optional[datetime]): The date and time when a message to the user failed for this reason last time.
     """
 
     __tablename__ = "users"
@@ -31,3 +33,5 @@ class User(Base):
         nullable=True,
         server_default=func.now(),
     )
+    is_reachable: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default=true())
+    last_failed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,25 @@
+from collections.abc import Collection
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from aiogram_nats.core.interfaces.interfaces.user import UserNameGetter
+from aiogram_nats.infrastructure.database.rdb.dao.user import UserDAO
+
+
+class RDBUserNameGetter(UserNameGetter):
+
+    """Reads the names of users from the relational database, every batch in its own short session."""
+
+    def __init__(self, pool: async_sessionmaker[AsyncSession]) -> None:
+        self.pool = pool
+
+    async def get_names(self, user_ids: Collection[int]) -> dict[int, str]:
+        """
+        Asynchronously retrieves the names of the users.
+
+        :param user_ids: (Collection[int]): The IDs of the users.
+
+        :return: (dict[int, str]): The names by user ID, unknown users are omitted.
+        """
+        async with self.pool() as session:
+            return await UserDAO(session).get_names(user_ids)
@@ -0,0 +1,25 @@
+from collections.abc import Collection
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from aiogram_nats.core.interfaces.interfaces.user import UserReachabilityUpdater
+from aiogram_nats.infrastructure.database.rdb.dao.user import UserDAO
+
+
+class RDBUserReachabilityUpdater(UserReachabilityUpdater):
+
+    """Marks users as unreachable in the relational database, every batch in its own short transaction."""
+
+    def __init__(self, pool: async_sessionmaker[AsyncSession]) -> None:
+        self.pool = pool
+
+    async def mark_unreachable(self, user_ids: Collection[int]) -> None:
+        """
+        Asynchronously marks the users as unreachable, so they are skipped by future mailings.
+
+        :param user_ids: (Collection[int]): The IDs of the users.
+
+        :return: (None)
+        """
+        async with self.pool() as session, session.begin():
+            await UserDAO(session).mark_unreachable(user_ids)
@@ -0,0 +1,20 @@
+from aiogram_nats.infrastructure.delivery.deletion import CoalescingMessageRemover
+from aiogram_nats.infrastructure.delivery.engine import DeliveryEngine
+from aiogram_nats.infrastructure.delivery.media import MediaResolver, ObjectStoreInputFile
+from aiogram_nats.infrastructure.delivery.partitioned import PartitionedMailingStarter, register_partition_task
+from aiogram_nats.infrastructure.delivery.sender import AiogramMessageSender, TemplateMessageSender
+from aiogram_nats.infrastructure.delivery.stats import DeliveryStats
+from aiogram_nats.infrastructure.delivery.template import CompiledTemplate
+
+__all__ = [
+    "DeliveryEngine",
+    "AiogramMessageSender",
+    "MediaResolver",
+    "ObjectStoreInputFile",
+    "PartitionedMailingStarter",
+    "register_partition_task",
+    "DeliveryStats",
+    "TemplateMessageSender",
+    "CompiledTemplate",
+    "CoalescingMessageRemover",
+]
@@ -0,0 +1,141 @@
+import asyncio
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Union
+
+import structlog
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+
+from aiogram_nats.common.log.configuration import LoggerName
+from aiogram_nats.core.entities.message import MessageBatchDeletionScheduled, MessageDeletionScheduled
+from aiogram_nats.core.interactors.messages.scheduled import MAX_DELETION_BATCH_SIZE
+
+logger = structlog.stdlib.get_logger(LoggerName.SCHEDULE_MESSAGE.value)
+
+
+@dataclass
+class _PendingDeletion:
+    ids: list[int] = field(default_factory=list)
+    done: asyncio.Future[None] = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class CoalescingMessageRemover:
+
+    """
+    Deletes scheduled messages with batched deleteMessages calls.
+
+    A batch deletion is executed at once, in calls of up to `batch_size` messages.
+    Single deletions of one chat which come within `linger` seconds are buffered and deleted together,
+    each of them returns once its batch is deleted.
+
+    Attributes :
+        linger (float): The number of seconds single deletions of a chat are buffered for.
+        batch_size (int): The maximum number of messages deleted by one call.
+        max_retries (int): The number of times a call throttled by a flood-wait is repeated after its `retry_after`.
+    """
+
+    def __init__(self, bot: Bot, linger: float = 0.5, batch_size: int = MAX_DELETION_BATCH_SIZE, max_retries: int = 3) -> None:
+        if not 0 < batch_size <= MAX_DELETION_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_DELETION_BATCH_SIZE}")
+        self.bot = bot
+        self.linger = linger
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._pending: dict[int, _PendingDeletion] = {}
+        self._timers: dict[int, asyncio.Task[None]] = {}
+
+    async def __call__(self, message: Union[MessageBatchDeletionScheduled, MessageDeletionScheduled]) -> None:
+        """
+        Asynchronously deletes the scheduled messages.
+
+        :param message: (Union[MessageBatchDeletionScheduled, MessageDeletionScheduled]): The scheduled deletion.
+
+        :return: (None)
+        """
+        if isinstance(message, MessageBatchDeletionScheduled):
+            await self.delete(message.user.id, message.ids)
+        else:
+            await self.add(message.user.id, message.id)
+
+    async def add(self, chat_id: int, message_id: int) -> None:
+        """
+        Buffers the deletion of a message and waits until its batch is deleted.
+
+        The buffer of the chat is deleted after `linger` seconds, or at once when it holds `batch_size` messages.
+        An unexpected error of the batch deletion is raised to every message of the batch.
+
+        :param chat_id: (int): The ID of the chat.
+        :param message_id: (int): The ID of the message.
+
+        :return: (None)
+        """
+        pending = self._pending.setdefault(chat_id, _PendingDeletion())
+        pending.ids.append(message_id)
+        if len(pending.ids) >= self.batch_size:
+            if (timer := self._timers.pop(chat_id, None)) is not None:
+                timer.cancel()
+            await self._flush(chat_id)
+        elif chat_id not in self._timers:
+            self._timers[chat_id] = asyncio.create_task(self._flush_later(chat_id))
+        await asyncio.shield(pending.done)
+
+    async def delete(self, chat_id: int, message_ids: Sequence[int]) -> None:
+        """
+        Deletes the messages of a chat in calls of up to `batch_size` messages.
+
+        A call throttled by a flood-wait is repeated after its `retry_after`, up to `max_retries` times.
+        Messages which could not be deleted for another reason are logged and skipped.
+
+        :param chat_id: (int): The ID of the chat.
+        :param message_ids: (Sequence[int]): The IDs of the messages.
+
+        :return: (None)
+
+        :raises TelegramRetryAfter: If a call is still throttled after `max_retries` retries.
+        """
+        for start in range(0, len(message_ids), self.batch_size):
+            chunk = list(message_ids[start:start + self.batch_size])
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self.bot.delete_messages(chat_id, chunk)
+                except TelegramRetryAfter as e:
+                    if attempt == self.max_retries:
+                        raise
+                    logger.info("Messages deletion is throttled", chat_id=chat_id, count=len(chunk), retry_after=e.retry_after)
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                except TelegramAPIError as e:
+                    logger.warning("Messages were not deleted", chat_id=chat_id, count=len(chunk), error=str(e))
+                break
+
+    async def close(self) -> None:
+        """
+        Deletes all buffered messages at once.
+
+        :return: (None)
+        """
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        await asyncio.gather(*(self._flush(chat_id) for chat_id in list(self._pending)))
+
+    async def _flush_later(self, chat_id: int) -> None:
+        await asyncio.sleep(self.linger)
+        self._timers.pop(chat_id, None)
+        await self._flush(chat_id)
+
+    async def _flush(self, chat_id: int) -> None:
+        pending = self._pending.pop(chat_id, None)
+        if pending is None:
+            return
+        # The waiters of the batch re-raise its error, the flush itself never fails.
+        try:
+            await self.delete(chat_id, pending.ids)
+        except asyncio.CancelledError:
+            pending.done.cancel()
+            raise
+        except Exception as e:  # noqa: BLE001
+            pending.done.set_exception(e)
+        else:
+            pending.done.set_result(None)
@@ -0,0 +1,353 @@
+import asyncio
+from collections import deque
+from collections.abc import Iterable
+from contextlib import aclosing, suppress
+from typing import Optional
+from uuid import uuid4
+
+import structlog
+
+from aiogram_nats.common.log.configuration import LoggerName
+from aiogram_nats.common.settings.models.mailing_service import DeliverySettings
+from aiogram_nats.core.entities.audience import Partition
+from aiogram_nats.core.entities.mailing import Mailing, MailingMessage
+from aiogram_nats.core.entities.progress import MailingState, PartitionReport
+from aiogram_nats.core.exceptions.delivery import DeliveryError, RecipientUnreachableError, RetryAfterError, TransientDeliveryError
+from aiogram_nats.core.interfaces.interfaces.audience import AudienceResolver
+from aiogram_nats.core.interfaces.interfaces.mailing import MailingStarter
+from aiogram_nats.core.interfaces.interfaces.progress import MailingProgressStore
+from aiogram_nats.core.interfaces.interfaces.sender import MessageSender
+from aiogram_nats.core.interfaces.interfaces.user import UserNameGetter, UserReachabilityUpdater
+from aiogram_nats.infrastructure.delivery.rate_limit import ChatPacer, FloodWaitDetector, TokenBucket
+from aiogram_nats.infrastructure.delivery.retry import RetryQueue, retry_delay
+from aiogram_nats.infrastructure.delivery.stats import DeliveryStats, SecondStats
+from aiogram_nats.infrastructure.delivery.template import NAME_PLACEHOLDER
+from aiogram_nats.infrastructure.delivery.unreachable import UnreachableRecipients
+
+logger = structlog.stdlib.get_logger(LoggerName.MAILING.value)
+
+
+class DeliveryEngine(MailingStarter):
+
+    """
+    Delivers mailings to their recipients at the highest rate allowed by Telegram.
+
+    Every send takes a token from a global token bucket and respects the minimal interval between sends to one chat.
+    A partition of a mailing takes its tokens from its own bucket with the share `global_rate / partitions` of the rate,
+    so that the partitions delivered in parallel by different workers stay within the global rate together.
+    At most `max_concurrency` sends are in flight at once. When Telegram reports a flood-wait,
+    the sends to the throttled chat are delayed for the requested time, and the whole engine pauses
+    only if `global_flood_threshold` different chats are throttled within `global_flood_window` seconds.
+    Recipients whose delivery failed temporarily are moved to a retry queue and delivered again once their backoff
+    or flood-wait is over, at most `max_attempts` times, so that they never block the delivery to other recipients.
+    With a reachability updater, the recipients who blocked the bot or whose chat is gone are marked as unreachable in batches.
+    With a name getter, the names of the recipients of a personalized message are read for every resolved chunk
+    and substituted for the `{name}` placeholders by the sender.
+    The engine is meant to be shared between mailings, so that they share the limits as well.
+    """
+
+    def __init__(
+            self,
+            sender: MessageSender,
+            audience_resolver: AudienceResolver,
+            settings: DeliverySettings,
+            progress_store: Optional[MailingProgressStore] = None,
+            stats: Optional[DeliveryStats] = None,
+            reachability_updater: Optional[UserReachabilityUpdater] = None,
+            name_getter: Optional[UserNameGetter] = None,
+    ) -> None:
+        self.sender = sender
+        self.audience_resolver = audience_resolver
+        self.settings = settings
+        self.progress_store = progress_store
+        self.name_getter = name_getter
+        self.stats = stats or DeliveryStats(settings.stats_window)
+        self._bucket = TokenBucket(settings.global_rate)
+        self._pacer = ChatPacer(settings.per_chat_interval)
+        self._flood_waits = FloodWaitDetector(settings.global_flood_window, settings.global_flood_threshold)
+        self._unreachable = UnreachableRecipients(reachability_updater, settings.unreachable_flush_size) if reachability_updater else None
+
+    async def start(self, mailing: Mailing, partition: Optional[Partition] = None) -> None:
+        """
+        Asynchronously delivers the mailing message to every recipient of the mailing or of one of its partitions.
+
+        The audience of the mailing is resolved while it is delivered, chunk by chunk.
+        With a progress store, the progress cursor is saved every `checkpoint_interval` seconds,
+        the delivery continues from the saved cursor, and it stops once the mailing is paused or cancelled.
+        The delivery is at-least-once: after a crash, the recipients processed since the last checkpoint,
+        at most `checkpoint_interval` seconds of sends, are delivered again.
+        Cancelled and completed mailings are not delivered again.
+        A partition does not change the state of the mailing, it reports its results instead,
+        and the mailing is completed by the coordinator once every partition is finished.
+        A partition task takes the partition over from any previous one, and stops without saving
+        once another task has taken it over.
+
+        :param mailing: (Mailing): The mailing to be delivered.
+        :param partition: (Optional[Partition]): The partition of the audience to be delivered, the whole audience if None.
+
+        :return: (None)
+        """
+        cursor = await self._load_cursor(mailing, partition)
+        if cursor is None:
+            return
+        report = await self._load_report(mailing, partition)
+        stopped = asyncio.Event()
+        queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue(maxsize=self.settings.max_concurrency * 2)
+        retries: RetryQueue[tuple[int, int]] = RetryQueue()
+        totals = SecondStats(second=0)
+        names: dict[int, str] = {}
+        bucket = self._bucket if partition is None else TokenBucket(self.settings.global_rate / partition.count)
+        tasks = [
+            asyncio.create_task(self._worker(queue, retries, mailing.message, cursor, report, totals, names, bucket))
+            for _ in range(self.settings.max_concurrency)
+        ]
+        tasks.append(asyncio.create_task(self._retry_loop(queue, retries)))
+        if self.progress_store is not None:
+            tasks.append(asyncio.create_task(self._checkpoint_loop(mailing, cursor, report, stopped)))
+        try:
+            await self._produce(mailing, queue, cursor, stopped, partition, names)
+            await self._drain(queue, retries, stopped)
+        finally:
+            for task in tasks:
+                task.cancel()
+            for task in tasks:
+                with suppress(asyncio.CancelledError):
+                    await task
+        if self._unreachable is not None:
+            await self._unreachable.flush()
+        taken_over = report is not None and not await self._owns(mailing, report)
+        if self.progress_store is not None and not taken_over:
+            await self.progress_store.save_cursor(mailing.id, cursor.value, cursor.completed, partition)
+            if report is not None:
+                report.finished = not stopped.is_set()
+                await self.progress_store.save_report(mailing.id, report)
+            elif not stopped.is_set():
+                await self.progress_store.set_state(mailing.id, MailingState.COMPLETED)
+        logger.info(
+            "Mailing delivery finished",
+            mailing_id=str(mailing.id),
+            partition=partition and partition.index,
+            cursor=cursor.value,
+            sent=totals.sent,
+            failed=totals.failed,
+            stopped=stopped.is_set(),
+            taken_over=taken_over,
+        )
+
+    async def deliver(
+            self,
+            chat_id: int,
+            message: MailingMessage,
+            attempt: int = 1,
+            name: Optional[str] = None,
+            bucket: Optional[TokenBucket] = None,
+    ) -> bool:
+        """
+        Asynchronously makes one attempt to deliver a message to a chat within the rate limits.
+
+        :param chat_id: (int): The ID of the recipient chat.
+        :param message: (MailingMessage): The message to be delivered.
+        :param attempt: (int): The number of the attempt, starting from 1. Defaults to 1.
+        :param name: (Optional[str]): The name of the recipient substituted for the `{name}` placeholders. Defaults to None.
+        :param bucket: (Optional[TokenBucket]): The token bucket of the send. Defaults to the global bucket of the engine.
+
+        :return: (bool): True if the message was delivered, False if it was not and must not be retried.
+
+        :raises TransientDeliveryError: If the delivery failed temporarily and the attempts are not exhausted.
+        """
+        bucket = bucket or self._bucket
+        await self._pacer.wait(chat_id)
+        await bucket.acquire()
+        try:
+            await self.sender.send(chat_id, message, name)
+        except TransientDeliveryError as e:
+            if isinstance(e, RetryAfterError):
+                self.stats.record_throttled()
+                self._pacer.delay(chat_id, e.retry_after)
+                if self._flood_waits.record(chat_id):
+                    bucket.pause(e.retry_after)
+                    logger.warning("Delivery is rate limited globally", chat_id=chat_id, retry_after=e.retry_after, attempt=attempt)
+                else:
+                    logger.info("Delivery to the chat is rate limited", chat_id=chat_id, retry_after=e.retry_after, attempt=attempt)
+            if attempt < self.settings.max_attempts:
+                raise
+            self.stats.record_failed()
+            logger.warning("Message was not delivered, attempts are exhausted", chat_id=chat_id, attempts=attempt, error=str(e))
+            return False
+        except RecipientUnreachableError as e:
+            self.stats.record_failed()
+            logger.info("Recipient is unreachable", chat_id=chat_id, error=str(e))
+            if self._unreachable is not None:
+                await self._unreachable.add(chat_id)
+            return False
+        except DeliveryError as e:
+            self.stats.record_failed()
+            logger.warning("Message was not delivered", chat_id=chat_id, error=str(e))
+            return False
+        else:
+            self.stats.record_sent()
+            return True
+
+    async def _produce(
+            self,
+            mailing: Mailing,
+            queue: asyncio.Queue[tuple[int, int]],
+            cursor: "_Cursor",
+            stopped: asyncio.Event,
+            partition: Optional[Partition],
+            names: dict[int, str],
+    ) -> None:
+        name_getter = self.name_getter if NAME_PLACEHOLDER in mailing.message.text else None
+        chunks = self.audience_resolver.iter_recipients(
+            mailing.audience, after=cursor.value, chunk_size=self.settings.resolve_chunk_size, partition=partition,
+        )
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                chat_ids = [chat_id for chat_id in chunk if not cursor.is_completed(chat_id)]
+                if name_getter is not None and chat_ids:
+                    names.update(await name_getter.get_names(chat_ids))
+                for chat_id in chat_ids:
+                    if stopped.is_set():
+                        return
+                    cursor.track(chat_id)
+                    await queue.put((chat_id, 1))
+
+    async def _drain(self, queue: asyncio.Queue[tuple[int, int]], retries: RetryQueue[tuple[int, int]], stopped: asyncio.Event) -> None:
+        while True:
+            await queue.join()
+            if not retries or stopped.is_set():
+                return
+            waiters = {asyncio.create_task(retries.drained()), asyncio.create_task(stopped.wait())}
+            _, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in pending:
+                waiter.cancel()
+
+    async def _retry_loop(self, queue: asyncio.Queue[tuple[int, int]], retries: RetryQueue[tuple[int, int]]) -> None:
+        while True:
+            await queue.put(await retries.get())
+
+    async def _worker(
+            self,
+            queue: asyncio.Queue[tuple[int, int]],
+            retries: RetryQueue[tuple[int, int]],
+            message: MailingMessage,
+            cursor: "_Cursor",
+            report: Optional[PartitionReport],
+            totals: SecondStats,
+            names: dict[int, str],
+            bucket: TokenBucket,
+    ) -> None:
+        while True:
+            chat_id, attempt = await queue.get()
+            delivered: Optional[bool] = None
+            try:
+                delivered = await self.deliver(chat_id, message, attempt, names.get(chat_id), bucket)
+            except TransientDeliveryError as e:
+                delay = retry_delay(
+                    attempt, self.settings.retry_base_delay, self.settings.max_retry_delay, getattr(e, "retry_after", None),
+                )
+                retries.push((chat_id, attempt + 1), delay)
+            except Exception:
+                self.stats.record_failed()
+                logger.exception("Message delivery failed unexpectedly", chat_id=chat_id, attempt=attempt)
+                delivered = False
+            finally:
+                if delivered is not None:
+                    totals.sent += delivered
+                    totals.failed += not delivered
+                    if report is not None:
+                        report.sent += delivered
+                        report.failed += not delivered
+                    names.pop(chat_id, None)
+                    cursor.complete(chat_id)
+                queue.task_done()
+
+    async def _load_cursor(self, mailing: Mailing, partition: Optional[Partition]) -> Optional["_Cursor"]:
+        if self.progress_store is None:
+            return _Cursor(None)
+        progress = await self.progress_store.get(mailing.id, partition)
+        if progress is not None and progress.is_finished():
+            logger.info("Mailing is already finished", mailing_id=str(mailing.id), state=progress.state.value)
+            return None
+        if partition is not None and progress is not None and progress.state != MailingState.RUNNING:
+            logger.info("Mailing is not running", mailing_id=str(mailing.id), partition=partition.index, state=progress.state.value)
+            return None
+        if partition is None:
+            await self.progress_store.set_state(mailing.id, MailingState.RUNNING)
+        if progress is None:
+            return _Cursor(None)
+        return _Cursor(progress.cursor, progress.completed)
+
+    async def _load_report(self, mailing: Mailing, partition: Optional[Partition]) -> Optional[PartitionReport]:
+        if partition is None:
+            return None
+        report = PartitionReport(partition)
+        if self.progress_store is not None:
+            for stored in await self.progress_store.get_reports(mailing.id):
+                if stored.partition == partition:
+                    report = stored
+            report.finished = False
+            report.owner = uuid4().hex
+            await self.progress_store.save_report(mailing.id, report)
+        return report
+
+    async def _owns(self, mailing: Mailing, report: PartitionReport) -> bool:
+        if self.progress_store is None:
+            return True
+        for stored in await self.progress_store.get_reports(mailing.id):
+            if stored.partition == report.partition:
+                return stored.owner == report.owner
+        return True
+
+    async def _checkpoint_loop(self, mailing: Mailing, cursor: "_Cursor", report: Optional[PartitionReport], stopped: asyncio.Event) -> None:
+        if self.progress_store is None:
+            return
+        partition = report.partition if report is not None else None
+        while True:
+            await asyncio.sleep(self.settings.checkpoint_interval)
+            if report is not None:
+                if not await self._owns(mailing, report):
+                    logger.warning("Mailing partition was taken over by another task", mailing_id=str(mailing.id), partition=report.partition.index)
+                    stopped.set()
+                    return
+                report.heartbeat += 1
+            await self.progress_store.save_cursor(mailing.id, cursor.value, cursor.completed, partition)
+            if report is not None:
+                await self.progress_store.save_report(mailing.id, report)
+            if self._unreachable is not None:
+                await self._unreachable.flush()
+            progress = await self.progress_store.get(mailing.id)
+            if progress is not None and progress.state != MailingState.RUNNING:
+                logger.info("Mailing delivery is stopping", mailing_id=str(mailing.id), state=progress.state.value)
+                stopped.set()
+                return
+
+
+class _Cursor:
+
+    """
+    Tracks the chat ID up to which all recipients are processed while sends complete out of order.
+
+    Recipients are tracked in the ascending order they are streamed in.
+    """
+
+    def __init__(self, value: Optional[int], completed: Iterable[int] = ()) -> None:
+        self.value = value
+        self._completed: set[int] = set(completed)
+        self._tracked: deque[int] = deque()
+
+    @property
+    def completed(self) -> frozenset[int]:
+        return frozenset(chat_id for chat_id in self._completed if self.value is None or chat_id > self.value)
+
+    def is_completed(self, chat_id: int) -> bool:
+        return (self.value is not None and chat_id <= self.value) or chat_id in self._completed
+
+    def track(self, chat_id: int) -> None:
+        self._tracked.append(chat_id)
+
+    def complete(self, chat_id: int) -> None:
+        self._completed.add(chat_id)
+        while self._tracked and self._tracked[0] in self._completed:
+            self.value = self._tracked.popleft()
+            self._completed.remove(self.value)
@@ -0,0 +1,149 @@
+import asyncio
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from aiogram.types import FSInputFile, InputFile, Message, URLInputFile
+from nats.errors import Error as NatsError
+from nats.js.errors import DigestMismatchError, ObjectNotFoundError
+
+from aiogram_nats.core.exceptions.delivery import DeliveryError, TransientDeliveryError
+from aiogram_nats.core.interfaces.interfaces.media import FileIdCache
+from aiogram_nats.infrastructure.database.object_store.media import ObjectStoreMediaStorage
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+MediaUpload = Callable[[Union[InputFile, str]], Awaitable[Message]]
+
+
+@dataclass
+class _UploadLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class ObjectStoreInputFile(InputFile):
+
+    """
+    Represents a media stored in the NATS Object Store, streamed into the upload chunk by chunk.
+
+    Only the chunk being uploaded is held in memory, regardless of the size of the media.
+    Errors of the Object Store are raised as delivery errors: a missing or corrupted media fails the delivery,
+    other errors, such as timeouts, are transient.
+    """
+
+    def __init__(self, storage: ObjectStoreMediaStorage, media_address: str, filename: Optional[str] = None) -> None:
+        super().__init__(filename=filename or storage.object_name(media_address), chunk_size=storage.chunk_size)
+        self.storage = storage
+        self.media_address = media_address
+
+    async def read(self, bot: "Bot") -> AsyncGenerator[bytes, None]:
+        """
+        Asynchronously reads the media chunk by chunk.
+
+        :param bot: (Bot): The bot uploading the media.
+
+        :return: (AsyncGenerator[bytes, None]): The chunks of the media.
+
+        :raises DeliveryError: If the media does not exist or its digest does not match.
+        :raises TransientDeliveryError: If the media could not be read because of a temporary failure.
+        """
+        try:
+            async for chunk in self.storage.iter_chunks(self.media_address):
+                yield chunk
+        except (ObjectNotFoundError, DigestMismatchError) as e:
+            raise DeliveryError(f"Media {self.media_address} cannot be read from the Object Store: {type(e).__name__}") from e
+        except NatsError as e:
+            raise TransientDeliveryError(f"Media {self.media_address} was not read from the Object Store: {type(e).__name__}: {e}") from e
+
+
+class MediaResolver:
+
+    """
+    Uploads every media to Telegram once and reuses the returned file ID for all later sends.
+
+    The file IDs are kept in memory and in the file ID cache, so they survive restarts and are shared between workers.
+    Concurrent sends of a media which is not uploaded yet wait for a single upload instead of uploading it each.
+    Media stored in the Object Store are streamed into the upload from the given storage.
+    """
+
+    def __init__(self, cache: FileIdCache, storage: Optional[ObjectStoreMediaStorage] = None) -> None:
+        self.cache = cache
+        self.storage = storage
+        self._file_ids: dict[str, str] = {}
+        self._locks: dict[str, _UploadLock] = {}
+
+    async def send(self, media_address: str, upload: MediaUpload) -> Message:
+        """
+        Asynchronously sends a media using its cached file ID, uploading it first if there is no such ID.
+
+        :param media_address: (str): The URL, the local path or the Object Store address of the media.
+        :param upload: (MediaUpload): Sends the given file or file ID and returns the sent message.
+
+        :return: (Message): The sent message.
+        """
+        file_id = await self.get_file_id(media_address)
+        if file_id is not None:
+            return await upload(file_id)
+        lock = self._locks.setdefault(media_address, _UploadLock())
+        lock.users += 1
+        try:
+            async with lock.lock:
+                file_id = await self.get_file_id(media_address)
+                if file_id is not None:
+                    return await upload(file_id)
+                message = await upload(self.input_file(media_address))
+                file_id = _extract_file_id(message)
+                if file_id is not None:
+                    self._file_ids[media_address] = file_id
+                    await self.cache.set(media_address, file_id)
+        finally:
+            # The lock is dropped only by its last user, so that a failed upload is retried by one waiter at a time.
+            lock.users -= 1
+            if not lock.users:
+                del self._locks[media_address]
+        return message
+
+    async def get_file_id(self, media_address: str) -> Optional[str]:
+        """
+        Asynchronously retrieves the file ID of an already uploaded media.
+
+        :param media_address: (str): The URL or the local path of the media.
+
+        :return: (Optional[str]): The file ID, or None if the media was not uploaded yet.
+        """
+        file_id = self._file_ids.get(media_address)
+        if file_id is None:
+            file_id = await self.cache.get(media_address)
+            if file_id is not None:
+                self._file_ids[media_address] = file_id
+        return file_id
+
+    def input_file(self, media_address: str) -> InputFile:
+        """
+        Creates the file uploading the media from its address.
+
+        :param media_address: (str): The URL, the local path or the Object Store address of the media.
+
+        :return: (InputFile): The file to be uploaded.
+
+        :raises DeliveryError: If the media is stored in the Object Store, but no storage is configured.
+        """
+        if ObjectStoreMediaStorage.is_stored(media_address):
+            if self.storage is None:
+                raise DeliveryError(f"Media {media_address} is stored in the Object Store, but no storage is configured")
+            return ObjectStoreInputFile(self.storage, media_address)
+        if media_address.startswith(("http://", "https://")):
+            return URLInputFile(media_address)
+        return FSInputFile(Path(media_address))
+
+
+def _extract_file_id(message: Message) -> Optional[str]:
+    for media in (message.document, message.animation, message.video, message.audio, message.voice, message.sticker):
+        if media is not None:
+            return media.file_id
+    if message.photo:
+        return message.photo[-1].file_id
+    return None
@@ -0,0 +1,134 @@
+import asyncio
+from typing import Any, Final
+
+import structlog
+from taskiq import AsyncBroker, AsyncTaskiqDecoratedTask
+from taskiq.kicker import AsyncKicker
+
+from aiogram_nats.common.log.configuration import LoggerName
+from aiogram_nats.common.settings.models.mailing_service import DeliverySettings
+from aiogram_nats.core.entities.audience import Partition
+from aiogram_nats.core.entities.mailing import Mailing
+from aiogram_nats.core.entities.progress import MailingState
+from aiogram_nats.core.interfaces.interfaces.mailing import MailingStarter
+from aiogram_nats.core.interfaces.interfaces.progress import MailingProgressStore
+from aiogram_nats.infrastructure.database.mappers.mailing import dict_to_mailing, mailing_to_dict
+from aiogram_nats.infrastructure.delivery.engine import DeliveryEngine
+
+logger = structlog.stdlib.get_logger(LoggerName.MAILING.value)
+
+PARTITION_TASK_NAME: Final[str] = "aiogram_nats:deliver_mailing_partition"
+
+
+def register_partition_task(broker: AsyncBroker, engine: DeliveryEngine, task_name: str = PARTITION_TASK_NAME) -> AsyncTaskiqDecoratedTask[Any, Any]:
+    """
+    Registers the task delivering one partition of a mailing in the tasks broker of a worker.
+
+    :param broker: (AsyncBroker): The tasks broker.
+    :param engine: (DeliveryEngine): The engine delivering the partitions received by the worker.
+    :param task_name: (str): The name of the task. Defaults to `PARTITION_TASK_NAME`.
+
+    :return: (AsyncTaskiqDecoratedTask): The registered task.
+    """
+    async def deliver_mailing_partition(mailing: dict[str, Any], partition_index: int, partition_count: int) -> None:
+        await engine.start(dict_to_mailing(mailing), Partition(partition_index, partition_count))
+
+    return broker.register_task(deliver_mailing_partition, task_name=task_name)
+
+
+class PartitionedMailingStarter(MailingStarter):
+
+    """
+    Starts a mailing by fanning it out into partition tasks delivered by the taskiq workers in parallel.
+
+    The audience is split into `partitions` parts by the recipient chat IDs, every part is delivered by its own task.
+    The starter then coordinates the mailing: it waits for the reports of all partitions,
+    completes the mailing once every partition is finished and logs the aggregated results.
+    Partitions which are already finished are not started again when a paused mailing is resumed.
+    A running partition task saves its report every `checkpoint_interval` seconds, even while it waits out a flood-wait.
+    A partition whose report is not saved for `partition_stall_timeout` seconds is considered gone, for example because its worker died,
+    and is started again from its saved cursor. The new task takes the partition over, so that a task wrongly considered gone
+    stops at its next checkpoint. The mailing is paused if it is not finished within `coordination_timeout` seconds.
+    """
+
+    def __init__(
+            self,
+            broker: AsyncBroker,
+            progress_store: MailingProgressStore,
+            settings: DeliverySettings,
+            task_name: str = PARTITION_TASK_NAME,
+    ) -> None:
+        self.broker = broker
+        self.progress_store = progress_store
+        self.settings = settings
+        self.task_name = task_name
+
+    async def start(self, mailing: Mailing) -> None:
+        """
+        Asynchronously starts the partition tasks of a mailing and waits until they are finished.
+
+        :param mailing: (Mailing): The mailing to be started.
+
+        :return: (None)
+        """
+        progress = await self.progress_store.get(mailing.id)
+        if progress is not None and progress.is_finished():
+            logger.info("Mailing is already finished", mailing_id=str(mailing.id), state=progress.state.value)
+            return
+        await self.progress_store.set_state(mailing.id, MailingState.RUNNING)
+        reports = await self.progress_store.get_reports(mailing.id)
+        count = reports[0].partition.count if reports else self.settings.partitions
+        finished = {report.partition for report in reports if report.finished}
+        kicker: AsyncKicker[Any, Any] = AsyncKicker(self.task_name, self.broker, {})
+        payload = mailing_to_dict(mailing)
+        for partition in Partition.split(count):
+            if partition not in finished:
+                await kicker.kiq(payload, partition.index, partition.count)
+        logger.info("Mailing partitions started", mailing_id=str(mailing.id), partitions=count, finished=len(finished))
+        await self._coordinate(mailing, count, kicker, payload)
+
+    async def _coordinate(self, mailing: Mailing, count: int, kicker: AsyncKicker[Any, Any], payload: dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        advanced: dict[int, tuple[int, float]] = {index: (-1, started) for index in range(count)}
+        while True:
+            await asyncio.sleep(self.settings.checkpoint_interval)
+            now = loop.time()
+            progress = await self.progress_store.get(mailing.id)
+            if progress is not None and progress.state != MailingState.RUNNING:
+                logger.info("Mailing coordination is stopping", mailing_id=str(mailing.id), state=progress.state.value)
+                return
+            reports = {report.partition.index: report for report in await self.progress_store.get_reports(mailing.id)}
+            finished = sum(report.finished for report in reports.values())
+            logger.debug(
+                "Mailing partitions progress",
+                mailing_id=str(mailing.id),
+                finished=finished,
+                partitions={index: {"sent": report.sent, "failed": report.failed} for index, report in reports.items()},
+            )
+            if finished == count:
+                await self.progress_store.set_state(mailing.id, MailingState.COMPLETED)
+                logger.info(
+                    "Mailing delivery finished",
+                    mailing_id=str(mailing.id),
+                    partitions=count,
+                    sent=sum(report.sent for report in reports.values()),
+                    failed=sum(report.failed for report in reports.values()),
+                )
+                return
+            if self.settings.coordination_timeout is not None and now - started >= self.settings.coordination_timeout:
+                await self.progress_store.set_state(mailing.id, MailingState.PAUSED)
+                logger.error("Mailing coordination timed out, the mailing is paused", mailing_id=str(mailing.id), finished=finished, partitions=count)
+                return
+            for partition in Partition.split(count):
+                report = reports.get(partition.index)
+                if report is not None and report.finished:
+                    continue
+                heartbeat = -1 if report is None else report.heartbeat
+                seen, advanced_at = advanced[partition.index]
+                if heartbeat != seen:
+                    advanced[partition.index] = (heartbeat, now)
+                elif now - advanced_at >= self.settings.partition_stall_timeout:
+                    logger.warning("Mailing partition stopped reporting, starting it again", mailing_id=str(mailing.id), partition=partition.index)
+                    await kicker.kiq(payload, partition.index, partition.count)
+                    advanced[partition.index] = (heartbeat, now)
@@ -0,0 +1,142 @@
+import asyncio
+from collections import deque
+from time import monotonic
+from typing import Optional
+
+
+class TokenBucket:
+
+    """
+    An asynchronous token bucket limiting the global rate of sends.
+
+    Attributes :
+        rate (float): The number of tokens added per second.
+        capacity (float): The maximum number of tokens, which defines the allowed burst.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def paused(self) -> bool:
+        """Returns True if the bucket is paused."""
+        return monotonic() < self._paused_until
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given number of seconds and drains the bucket.
+
+        :param seconds: (float): The duration of the pause.
+
+        :return: (None)
+        """
+        self._paused_until = max(self._paused_until, monotonic() + seconds)
+        self._tokens = 0
+
+    async def acquire(self) -> float:
+        """
+        Waits until a token is available and takes it.
+
+        Waiting coroutines are served in the order they called this method.
+
+        :return: (float): The number of seconds spent waiting.
+        """
+        started = monotonic()
+        async with self._lock:
+            while True:
+                now = monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return monotonic() - started
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ChatPacer:
+
+    """
+    Keeps a minimal interval between sends to the same chat.
+
+    Attributes :
+        interval (float): The minimal number of seconds between two sends to one chat.
+    """
+
+    def __init__(self, interval: float, prune_size: int = 10_000) -> None:
+        self.interval = interval
+        self._prune_size = prune_size
+        self._next_send: dict[int, float] = {}
+
+    async def wait(self, chat_id: int) -> float:
+        """
+        Reserves the next send slot of the chat and waits for it.
+
+        :param chat_id: (int): The ID of the chat.
+
+        :return: (float): The number of seconds spent waiting.
+        """
+        now = monotonic()
+        slot = max(self._next_send.get(chat_id, now), now)
+        self._next_send[chat_id] = slot + self.interval
+        if len(self._next_send) > self._prune_size:
+            self._prune(now)
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return slot - now
+
+    def delay(self, chat_id: int, seconds: float) -> None:
+        """
+        Postpones the next send to the chat by at least the given number of seconds.
+
+        :param chat_id: (int): The ID of the chat.
+        :param seconds: (float): The delay in seconds.
+
+        :return: (None)
+        """
+        self._next_send[chat_id] = max(self._next_send.get(chat_id, 0.0), monotonic() + seconds)
+
+    def _prune(self, now: float) -> None:
+        self._next_send = {chat_id: slot for chat_id, slot in self._next_send.items() if slot > now}
+
+
+class FloodWaitDetector:
+
+    """
+    Tells a flood-wait of the whole bot from a flood-wait of a single chat.
+
+    Telegram reports both with the same error, so a flood-wait is considered global
+    once `threshold` different chats are throttled within `window` seconds.
+
+    Attributes :
+        window (float): The number of seconds the throttled chats are counted for.
+        threshold (int): The number of different throttled chats which indicates a global flood-wait.
+    """
+
+    def __init__(self, window: float, threshold: int) -> None:
+        self.window = window
+        self.threshold = threshold
+        self._throttled: deque[tuple[float, int]] = deque()
+
+    def record(self, chat_id: int) -> bool:
+        """
+        Records a flood-wait of a chat.
+
+        :param chat_id: (int): The ID of the throttled chat.
+
+        :return: (bool): True if the flood-wait is considered global.
+        """
+        now = monotonic()
+        self._throttled.append((now, chat_id))
+        while self._throttled[0][0] <= now - self.window:
+            self._throttled.popleft()
+        return len({throttled for _, throttled in self._throttled}) >= self.threshold
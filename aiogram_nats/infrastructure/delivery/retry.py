@@ -0,0 +1,77 @@
+import asyncio
+import heapq
+from contextlib import suppress
+from itertools import count
+from time import monotonic
+from typing import Generic, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+
+class RetryQueue(Generic[_T]):
+
+    """
+    A timer heap of items waiting for their retry.
+
+    Items become available in the order of their due time, independently of the time they were pushed.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, _T]] = []
+        self._counter = count()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        """Returns the number of waiting items."""
+        return len(self._heap)
+
+    def push(self, item: _T, delay: float) -> None:
+        """
+        Schedules the item to be retried after the given delay.
+
+        :param item: (_T): The item to be retried.
+        :param delay: (float): The delay in seconds.
+
+        :return: (None)
+        """
+        heapq.heappush(self._heap, (monotonic() + delay, next(self._counter), item))
+        self._changed.set()
+
+    async def get(self) -> _T:
+        """
+        Waits until the earliest item is due, removes it from the queue and returns it.
+
+        :return: (_T): The due item.
+        """
+        while True:
+            self._changed.clear()
+            timeout = self._heap[0][0] - monotonic() if self._heap else None
+            if timeout is not None and timeout <= 0:
+                item = heapq.heappop(self._heap)[2]
+                self._changed.set()
+                return item
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._changed.wait(), timeout)
+
+    async def drained(self) -> None:
+        """Waits until the queue is empty."""
+        while self._heap:
+            self._changed.clear()
+            await self._changed.wait()
+
+
+def retry_delay(attempt: int, base_delay: float, max_delay: float, retry_after: Optional[float] = None) -> float:
+    """
+    Computes the delay before the next attempt with an exponential backoff.
+
+    The delay requested by Telegram is always honored, even if it is longer than the maximum delay.
+
+    :param attempt: (int): The number of the failed attempt, starting from 1.
+    :param base_delay: (float): The delay after the first attempt.
+    :param max_delay: (float): The maximum backoff delay.
+    :param retry_after: (Optional[float]): The flood-wait in seconds reported by Telegram. Defaults to None.
+
+    :return: (float): The delay in seconds.
+    """
+    backoff: float = min(base_delay * 2 ** (attempt - 1), max_delay)
+    return max(backoff, retry_after or 0.0)
@@ -0,0 +1,170 @@
+import json
+from http import HTTPStatus
+from typing import Optional, Union
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.types import InputFile, Message
+from aiohttp import ClientError
+
+from aiogram_nats.core.entities.mailing import MailingMessage
+from aiogram_nats.core.exceptions.delivery import DeliveryError, RecipientUnreachableError, RetryAfterError, TransientDeliveryError
+from aiogram_nats.core.interfaces.interfaces.sender import MessageSender
+from aiogram_nats.infrastructure.delivery.media import MediaResolver
+from aiogram_nats.infrastructure.delivery.template import NAME_PLACEHOLDER, CompiledTemplate
+
+CHAT_NOT_FOUND = "chat not found"
+
+
+class AiogramMessageSender(MessageSender):
+
+    """
+    Sends mailing messages with an aiogram bot.
+
+    With a media resolver, every media is uploaded once and later sent by its Telegram file ID.
+    The `{name}` placeholders in the text are replaced with the name of the recipient, or with `default_name` if it is unknown.
+    """
+
+    def __init__(self, bot: Bot, media_resolver: Optional[MediaResolver] = None, default_name: str = "") -> None:
+        self.bot = bot
+        self.media_resolver = media_resolver
+        self.default_name = default_name
+
+    async def send(self, chat_id: int, message: MailingMessage, name: Optional[str] = None) -> None:
+        """
+        Asynchronously sends a message to a chat.
+
+        The message is sent as a document with a caption if it has a media address, and as a text message otherwise.
+
+        :param chat_id: (int): The ID of the recipient chat.
+        :param message: (MailingMessage): The message to be sent.
+        :param name: (Optional[str]): The name substituted for the `{name}` placeholders. Defaults to None.
+
+        :return: (None)
+
+        :raises RetryAfterError: If Telegram reports a flood-wait.
+        :raises TransientDeliveryError: If the request failed because of a network or a Telegram server error.
+        :raises RecipientUnreachableError: If the recipient blocked the bot or the chat does not exist.
+        :raises DeliveryError: If the message could not be delivered.
+        """
+        text = message.text.replace(NAME_PLACEHOLDER, self.default_name if name is None else name)
+        try:
+            if message.media_address:
+                await self._send_media(chat_id, message.media_address, text)
+            else:
+                await self.bot.send_message(chat_id, text)
+        except TelegramRetryAfter as e:
+            raise RetryAfterError(e.retry_after) from e
+        except (TelegramNetworkError, TelegramServerError) as e:
+            raise TransientDeliveryError(str(e)) from e
+        except TelegramForbiddenError as e:
+            raise RecipientUnreachableError(str(e)) from e
+        except TelegramBadRequest as e:
+            if CHAT_NOT_FOUND in e.message.lower():
+                raise RecipientUnreachableError(str(e)) from e
+            raise DeliveryError(str(e)) from e
+        except TelegramAPIError as e:
+            raise DeliveryError(str(e)) from e
+
+    async def _send_media(self, chat_id: int, media_address: str, caption: str) -> None:
+        async def upload(document: Union[InputFile, str]) -> Message:
+            return await self.bot.send_document(chat_id, document, caption=caption)
+
+        if self.media_resolver is None:
+            await upload(media_address)
+        else:
+            await self.media_resolver.send(media_address, upload)
+
+
+class TemplateMessageSender(MessageSender):
+
+    """
+    Sends mailing messages as pre-serialized Bot API requests through the HTTP session of an aiogram bot.
+
+    Every message is compiled into a template once, and a send only renders the recipient-specific fields into it.
+    Media which is not uploaded yet is sent through `AiogramMessageSender`, the template is used once its file ID is known.
+    The `{name}` placeholders in the text are replaced with the name of the recipient, or with `default_name` if it is unknown.
+    """
+
+    def __init__(self, bot: Bot, media_resolver: Optional[MediaResolver] = None, max_templates: int = 128, default_name: str = "") -> None:
+        if not isinstance(bot.session, AiohttpSession):
+            raise TypeError("TemplateMessageSender requires a bot with an aiohttp session")
+        self.bot = bot
+        self.session = bot.session
+        self.media_resolver = media_resolver
+        self.max_templates = max_templates
+        self.default_name = default_name
+        self._fallback = AiogramMessageSender(bot, media_resolver, default_name)
+        self._templates: dict[tuple[str, str], CompiledTemplate] = {}
+
+    async def send(self, chat_id: int, message: MailingMessage, name: Optional[str] = None) -> None:
+        """
+        Asynchronously sends a message to a chat.
+
+        :param chat_id: (int): The ID of the recipient chat.
+        :param message: (MailingMessage): The message to be sent.
+        :param name: (Optional[str]): The name substituted for the `{name}` placeholders. Defaults to None.
+
+        :return: (None)
+
+        :raises RetryAfterError: If Telegram reports a flood-wait.
+        :raises TransientDeliveryError: If the request failed because of a network or a Telegram server error.
+        :raises RecipientUnreachableError: If the recipient blocked the bot or the chat does not exist.
+        :raises DeliveryError: If the message could not be delivered.
+        """
+        template = await self.get_template(message)
+        if template is None:
+            await self._fallback.send(chat_id, message, name)
+            return
+        await self._post(template.method, template.render(chat_id, name))
+
+    async def get_template(self, message: MailingMessage) -> Optional[CompiledTemplate]:
+        """
+        Asynchronously retrieves the compiled template of a message, compiling it on the first use.
+
+        :param message: (MailingMessage): The message.
+
+        :return: (Optional[CompiledTemplate]): The template, or None if the media of the message is not uploaded yet.
+        """
+        key = (message.text, message.media_address)
+        if (template := self._templates.get(key)) is not None:
+            return template
+        document = None
+        if message.media_address:
+            document = message.media_address
+            if self.media_resolver is not None:
+                document = await self.media_resolver.get_file_id(message.media_address)
+                if document is None:
+                    return None
+        if len(self._templates) >= self.max_templates:
+            self._templates.clear()
+        template = self._templates[key] = CompiledTemplate.compile(message, document, self.default_name)
+        return template
+
+    async def _post(self, method: str, body: bytes) -> None:
+        http = await self.session.create_session()
+        url = self.session.api.api_url(token=self.bot.token, method=method)
+        try:
+            async with http.post(url, data=body, headers={"Content-Type": "application/json"}, timeout=self.session.timeout) as response:
+                result = await response.json(loads=json.loads, content_type=None)
+        except (ClientError, TimeoutError, ValueError) as e:
+            raise TransientDeliveryError(f"{method} request failed: {type(e).__name__}: {e}") from e
+        if result.get("ok"):
+            return
+        if retry_after := result.get("parameters", {}).get("retry_after"):
+            raise RetryAfterError(retry_after)
+        error_code, description = result.get("error_code", 0), result.get("description", "")
+        error = f"{method} failed with {error_code}: {description}"
+        if error_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            raise TransientDeliveryError(error)
+        if error_code == HTTPStatus.FORBIDDEN or (error_code == HTTPStatus.BAD_REQUEST and CHAT_NOT_FOUND in description.lower()):
+            raise RecipientUnreachableError(error)
+        raise DeliveryError(error)
@@ -0,0 +1,65 @@
+from collections import deque
+from dataclasses import dataclass
+from time import time
+
+
+@dataclass
+class SecondStats:
+
+    """
+    Represents the delivery counters of one second.
+
+    Attributes :
+        second (int): The unix timestamp of the second.
+        sent (int): The number of delivered messages.
+        throttled (int): The number of sends rejected by rate limiting.
+        failed (int): The number of messages that could not be delivered.
+    """
+
+    second: int
+    sent: int = 0
+    throttled: int = 0
+    failed: int = 0
+
+
+class DeliveryStats:
+
+    """Collects per-second delivery counters for the last `window` seconds."""
+
+    def __init__(self, window: int = 60) -> None:
+        self._seconds: deque[SecondStats] = deque(maxlen=window)
+        self.total = SecondStats(second=0)
+
+    def record_sent(self) -> None:
+        """Counts a delivered message."""
+        self._current().sent += 1
+        self.total.sent += 1
+
+    def record_throttled(self) -> None:
+        """Counts a send rejected by rate limiting."""
+        self._current().throttled += 1
+        self.total.throttled += 1
+
+    def record_failed(self) -> None:
+        """Counts a message that could not be delivered."""
+        self._current().failed += 1
+        self.total.failed += 1
+
+    def last_seconds(self, seconds: int = 1) -> list[SecondStats]:
+        """
+        Returns the counters of the last seconds, including the current one.
+
+        Seconds without any deliveries are omitted.
+
+        :param seconds: (int): The number of seconds. Defaults to 1.
+
+        :return: (list[SecondStats]): The counters ordered from the oldest to the newest second.
+        """
+        since = int(time()) - seconds
+        return [stats for stats in self._seconds if stats.second > since]
+
+    def _current(self) -> SecondStats:
+        second = int(time())
+        if not self._seconds or self._seconds[-1].second != second:
+            self._seconds.append(SecondStats(second=second))
+        return self._seconds[-1]
@@ -0,0 +1,72 @@
+import json
+from typing import Final, Optional, Self
+
+from aiogram_nats.core.entities.mailing import MailingMessage
+
+NAME_PLACEHOLDER: Final[str] = "{name}"
+
+
+class CompiledTemplate:
+
+    """
+    Represents a Bot API request for a mailing message, serialized once for all recipients.
+
+    The invariant part of the JSON body is pre-rendered into bytes,
+    so a send only splices in the chat ID and the escaped name of the recipient.
+
+    Attributes :
+        method (str): The Bot API method of the request.
+    """
+
+    __slots__ = ("method", "_parts", "_default_name")
+
+    def __init__(self, method: str, parts: tuple[bytes, ...], default_name: str = "") -> None:
+        self.method = method
+        self._parts = parts
+        self._default_name = _escape(default_name)
+
+    @classmethod
+    def compile(cls, message: MailingMessage, document: Optional[str] = None, default_name: str = "") -> Self:
+        """
+        Compiles a mailing message into a template.
+
+        The `{name}` placeholders in the text are replaced with the name of every recipient.
+
+        :param message: (MailingMessage): The message to be compiled.
+        :param document: (Optional[str]): The file ID or the URL of the document sent with the message.
+            The message is sent as text if it is not provided.
+        :param default_name: (str): The name used for recipients without a name. Defaults to an empty string.
+
+        :return: (CompiledTemplate): The compiled template.
+        """
+        if document is None:
+            method, text_field, fields = "sendMessage", "text", b""
+        else:
+            method, text_field, fields = "sendDocument", "caption", b',"document":"' + _escape(document) + b'"'
+        segments = [_escape(segment) for segment in message.text.split(NAME_PLACEHOLDER)]
+        segments[0] = fields + b',"' + text_field.encode() + b'":"' + segments[0]
+        segments[-1] += b'"}'
+        return cls(method, tuple(segments), default_name)
+
+    @property
+    def personalized(self) -> bool:
+        """Returns True if the text of the message contains name placeholders."""
+        return len(self._parts) > 1
+
+    def render(self, chat_id: int, name: Optional[str] = None) -> bytes:
+        """
+        Renders the JSON body of the request for one recipient.
+
+        :param chat_id: (int): The ID of the recipient chat.
+        :param name: (Optional[str]): The name of the recipient. Defaults to the default name of the template.
+
+        :return: (bytes): The JSON body of the request.
+        """
+        head = b'{"chat_id":' + str(chat_id).encode()
+        if not self.personalized:
+            return head + self._parts[0]
+        return head + (self._default_name if name is None else _escape(name)).join(self._parts)
+
+
+def _escape(value: str) -> bytes:
+    return json.dumps(value, ensure_ascii=False)[1:-1].encode()
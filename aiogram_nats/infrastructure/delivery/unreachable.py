@@ -0,0 +1,60 @@
+import asyncio
+
+import structlog
+
+from aiogram_nats.common.log.configuration import LoggerName
+from aiogram_nats.core.interfaces.interfaces.user import UserReachabilityUpdater
+
+logger = structlog.stdlib.get_logger(LoggerName.MAILING.value)
+
+
+class UnreachableRecipients:
+
+    """
+    Collects the recipients who blocked the bot or whose chat is gone and marks them as unreachable in batches.
+
+    Attributes :
+        flush_size (int): The number of collected recipients at which they are written automatically.
+    """
+
+    def __init__(self, updater: UserReachabilityUpdater, flush_size: int = 500) -> None:
+        self.updater = updater
+        self.flush_size = flush_size
+        self._chat_ids: set[int] = set()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        """Returns the number of collected recipients which are not written yet."""
+        return len(self._chat_ids)
+
+    async def add(self, chat_id: int) -> None:
+        """
+        Collects an unreachable recipient and writes the collected ones once there are `flush_size` of them.
+
+        :param chat_id: (int): The ID of the recipient chat.
+
+        :return: (None)
+        """
+        self._chat_ids.add(chat_id)
+        if len(self._chat_ids) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Marks all collected recipients as unreachable.
+
+        The recipients are collected again if the update fails, so that they are written by the next flush.
+
+        :return: (None)
+        """
+        async with self._lock:
+            chat_ids, self._chat_ids = self._chat_ids, set()
+            if not chat_ids:
+                return
+            try:
+                await self.updater.mark_unreachable(chat_ids)
+            except Exception:
+                self._chat_ids |= chat_ids
+                logger.exception("Unreachable recipients were not saved", count=len(chat_ids))
+            else:
+                logger.info("Unreachable recipients were saved", count=len(chat_ids))
@@ -1,9 +1,18 @@
-from taskiq import AsyncBroker, AsyncResultBackend, ScheduleSource
+from collections.abc import Iterable
+from typing import Optional
+
+from taskiq import AsyncBroker, AsyncResultBackend, ScheduleSource, TaskiqEvents, TaskiqState
 from taskiq_nats import PullBasedJetStreamBroker, PushBasedJetStreamBroker  # type: ignore[import-untyped]
-from taskiq_redis import RedisAsyncResultBackend, RedisScheduleSource
+from taskiq_redis import RedisAsyncResultBackend
 
 from aiogram_nats.common.settings import Settings
-from aiogram_nats.common.settings.models.broker import BrokerSettings, TasksBrokerType
+from aiogram_nats.common.settings.models.broker import BrokerSettings, ScheduleSourceType, TasksBrokerType
+from aiogram_nats.core.interfaces.interfaces.scheduler import Scheduler, Task
+from aiogram_nats.infrastructure.scheduler.impl import SchedulerImpl
+from aiogram_nats.infrastructure.scheduler.metrics import MetricsSink
+from aiogram_nats.infrastructure.scheduler.nats_source import NatsKVScheduleSource
+from aiogram_nats.infrastructure.scheduler.sources import TimeIndexedRedisScheduleSource
+from aiogram_nats.infrastructure.scheduler.wheel import TimingWheelScheduler
 
 
 def create_tasks_broker(settings: BrokerSettings) -> AsyncBroker:
@@ -53,17 +62,74 @@ def create_schedule_source(settings: Settings) -> ScheduleSource:
     """
     Creates a schedule source based on the provided settings.
 
+    The schedules are stored in Redis or, to need no other system than the broker, in a NATS KV bucket.
+
     :param settings: (Settings): The settings object containing the configuration for the schedule source.
     :return: (ScheduleSource): The created schedule source.
     """
+    if settings.broker.scheduler.source_type == ScheduleSourceType.NATS:
+        nats_settings = settings.broker.nats
+        return NatsKVScheduleSource(
+            [server.make_uri().value for server in nats_settings.servers],
+            kv_config=nats_settings.tasks.schedule_kv,
+            lookahead=nats_settings.tasks.schedule_lookahead,
+            max_clock_skew=nats_settings.tasks.schedule_clock_skew,
+        )
     redis_settings = settings.db.redis
     source_settings = redis_settings.tasks.schedule_source
 
-    source: RedisScheduleSource = RedisScheduleSource(
+    source: TimeIndexedRedisScheduleSource = TimeIndexedRedisScheduleSource(
         url=redis_settings.make_uri(db=source_settings.db).value,
+        lookahead=source_settings.lookahead,
+        pipeline_size=source_settings.pipeline_size,
         prefix=source_settings.prefix,
         buffer_size=source_settings.buffer_size,
         max_connection_pool_size=source_settings.max_connection_pool_size,
         **source_settings.connection_kwargs,
     )
     return source
+
+
+def create_scheduler(
+        broker: AsyncBroker,
+        source: ScheduleSource,
+        settings: BrokerSettings,
+        metrics: Optional[MetricsSink] = None,
+        durable_tasks: Iterable[Task] = (),
+) -> Scheduler:
+    """
+    Creates a scheduler based on the provided settings.
+
+    With the timing wheel enabled, short-delay schedules are executed in-process and the rest goes through the schedule source.
+    Tasks which must survive a crash of the process are given as durable tasks and are always scheduled through the source.
+    The wheel is stopped by the shutdown of the broker, which hands the pending in-memory schedules over to the source,
+    so the source must be shut down after the broker.
+
+    :param broker: (AsyncBroker): The tasks broker.
+    :param source: (ScheduleSource): The schedule source.
+    :param settings: (BrokerSettings): The broker settings containing the scheduler settings.
+    :param metrics: (Optional[MetricsSink]): The sink of the metrics of the in-memory schedules. Defaults to None.
+    :param durable_tasks: (Iterable[Task]): The tasks never kept in memory. Defaults to none.
+
+    :return: (Scheduler): The created scheduler.
+    """
+    scheduler = SchedulerImpl(broker, source)
+    wheel_settings = settings.scheduler
+    if not wheel_settings.wheel_enabled:
+        return scheduler
+    wheel = TimingWheelScheduler(
+        scheduler,
+        horizon=wheel_settings.horizon,
+        tick=wheel_settings.tick,
+        slots=wheel_settings.slots,
+        levels=wheel_settings.levels,
+        durable_tasks=durable_tasks,
+        metrics=metrics,
+    )
+
+    async def stop_wheel(_: TaskiqState) -> None:
+        await wheel.stop()
+
+    broker.add_event_handler(TaskiqEvents.CLIENT_SHUTDOWN, stop_wheel)
+    broker.add_event_handler(TaskiqEvents.WORKER_SHUTDOWN, stop_wheel)
+    return wheel
@@ -1,9 +1,24 @@
-from typing import Any
+import dataclasses
+import datetime
+from collections.abc import Sequence
+from typing import Any, Optional
 
 import taskiq.scheduler.created_schedule
-from taskiq import AsyncBroker, ScheduleSource
+from taskiq import AsyncBroker, AsyncTaskiqDecoratedTask, ScheduleSource
+from taskiq.compat import model_dump, model_validate
+from taskiq.kicker import AsyncKicker
+from taskiq.scheduler.scheduled_task import ScheduledTask
 
+from aiogram_nats.core.entities.scheduled import ScheduledEntity
 from aiogram_nats.core.interfaces.interfaces.scheduler import Scheduler, SupportScheduled, Task
+from aiogram_nats.infrastructure.scheduler.metrics import SCHEDULED_TIME_LABEL, TASK_TYPE_LABEL, task_type
+from aiogram_nats.infrastructure.scheduler.sources import (
+    SCHEDULE_KEYS_LABEL,
+    BufferScheduleSource,
+    BulkScheduleSource,
+    IndexedScheduleSource,
+    encode_schedule_keys,
+)
 
 
 class SchedulerImpl(Scheduler):
@@ -13,12 +28,19 @@ class SchedulerImpl(Scheduler):
 
     This class provides an implementation of the Scheduler interface and
     allows you to schedule tasks to be executed at a later time.
+    Every task is registered in the broker once, under a stable name derived from the task callable.
+    The keys of the scheduled entities are stored in the `schedule_keys` label of their schedules,
+    so that a source indexing them allows cancelling the schedules by key and rescheduling them.
+    The labels added with `add_labels` and the scheduled time of the entity are stored in the labels of every schedule,
+    they are used by `SchedulerMetricsMiddleware` to measure how late the tasks are executed.
+    The type the metrics of a task are labeled by is registered per task with `get_registered_task`.
     """
 
     def __init__(self, broker: AsyncBroker, source: ScheduleSource) -> None:
         self.broker = broker
         self.source = source
         self._labels: dict[str, Any] = {}
+        self._tasks: dict[Task, AsyncTaskiqDecoratedTask[Any, Any]] = {}
 
     async def schedule(self, entity: SupportScheduled, task: Task) -> str:
         """
@@ -29,20 +51,183 @@ class SchedulerImpl(Scheduler):
 
         :return: (str): The scheduling ID.
         """
-        reg_task = self.broker.register_task(task)
-        scheduled: taskiq.scheduler.created_schedule.CreatedSchedule = await reg_task.schedule_by_time(
+        scheduled: taskiq.scheduler.created_schedule.CreatedSchedule = await self._kicker(task, entity).schedule_by_time(
             self.source,
             entity.scheduled_time,
             entity,
         )
         return scheduled.schedule_id
 
+    async def schedule_many(self, entities: Sequence[SupportScheduled], task: Task) -> list[str]:
+        """
+        Schedule a task to be executed for each of the entities at its scheduled time.
+
+        The schedules are built in memory and written to the source at once,
+        in pipelined batches if the source supports it.
+
+        :param entities: (Sequence[SupportScheduled]): The entities to be scheduled.
+        :param task: (Task): The task to be executed for each entity.
+
+        :return: (list[str]): The scheduling IDs in the order of the entities.
+        """
+        buffer = BufferScheduleSource()
+        for entity in entities:
+            await self._kicker(task, entity).schedule_by_time(buffer, entity.scheduled_time, entity)
+        if isinstance(self.source, BulkScheduleSource):
+            await self.source.add_schedules(buffer.schedules)
+        else:
+            for schedule in buffer.schedules:
+                await self.source.add_schedule(schedule)
+        return [schedule.schedule_id for schedule in buffer.schedules]
+
+    async def cancel(self, schedule_id: str) -> bool:
+        """
+        Cancel a pending schedule.
+
+        :param schedule_id: (str): The scheduling ID.
+
+        :return: (bool): True if the schedule was pending and is cancelled, False if it was not found.
+         A source which does not index the schedules cannot tell, so the schedule is deleted and False is returned for it.
+         An indexed source also drops a schedule cancelled after the scheduler has read it, in its `pre_send` hook.
+        """
+        if not isinstance(self.source, IndexedScheduleSource):
+            await self.source.delete_schedule(schedule_id)
+            return False
+        if await self.source.get_schedule(schedule_id) is None:
+            return False
+        await self.source.delete_schedule(schedule_id)
+        return True
+
+    async def reschedule(self, schedule_id: str, scheduled_time: datetime.datetime) -> Optional[str]:
+        """
+        Move a pending schedule to another time, keeping its scheduling ID.
+
+        The scheduled time of the entity passed to the task is moved as well.
+        The schedule is replaced in the source in one step, so it is never missing nor stored twice.
+
+        :param schedule_id: (str): The scheduling ID.
+        :param scheduled_time: (datetime.datetime): The new time of the schedule.
+
+        :return: (Optional[str]): The scheduling ID, or None if the schedule was not found.
+
+        :raises NotImplementedError: If the schedule source does not index the schedules.
+        """
+        if not isinstance(self.source, IndexedScheduleSource):
+            raise NotImplementedError(f"{type(self.source).__name__} cannot look the schedules up")
+        schedule = await self.source.get_schedule(schedule_id)
+        if schedule is None:
+            return None
+        moved = model_validate(ScheduledTask, {
+            **model_dump(schedule),
+            "labels": {**schedule.labels, SCHEDULED_TIME_LABEL: scheduled_time.timestamp()},
+            "args": [_move_entity(arg, scheduled_time) for arg in schedule.args],
+            "time": scheduled_time,
+        })
+        await self.source.replace_schedule(moved)
+        return schedule_id
+
+    async def cancel_by_key(self, key: str) -> int:
+        """
+        Cancel every pending schedule of the entities indexed by the key.
+
+        :param key: (str): One of the keys returned by `ScheduledEntity.schedule_keys`.
+
+        :return: (int): The number of cancelled schedules.
+
+        :raises NotImplementedError: If the schedule source does not index the schedules.
+        """
+        if not isinstance(self.source, IndexedScheduleSource):
+            raise NotImplementedError(f"{type(self.source).__name__} cannot look the schedules up")
+        schedule_ids = await self.source.get_schedule_ids(key)
+        for schedule_id in schedule_ids:
+            await self.source.delete_schedule(schedule_id)
+        return len(schedule_ids)
+
+    def get_registered_task(self, task: Task, task_type: Optional[str] = None, name: Optional[str] = None) -> AsyncTaskiqDecoratedTask[Any, Any]:
+        """
+        Returns the task registered in the broker, registering it on the first call.
+
+        The name of a lambda or a local function, and the name shared by the bound methods or the instances of one class,
+        do not identify the task, so such tasks must be registered with an explicit name before they are scheduled.
+
+        :param task: (Task): The task callable.
+        :param task_type: (Optional[str]): The type the metrics of the task are labeled by, its name by default.
+         It is stored in the `task_type` label of the task and of its schedules.
+        :param name: (Optional[str]): The name the task is registered under on the first call, `task_name(task)` by default.
+
+        :return: (AsyncTaskiqDecoratedTask): The registered task.
+
+        :raises ValueError: If the task has no unique name, or another task is registered under its name.
+        """
+        if (registered := self._tasks.get(task)) is None:
+            registered = self._tasks[task] = self._register(task, name)
+        if task_type is not None:
+            registered.labels[TASK_TYPE_LABEL] = task_type
+        return registered
+
+    def get_task_type(self, task: Task) -> str:
+        """
+        Returns the type the metrics of the task are labeled by, the same on the workers and in memory.
+
+        :param task: (Task): The task callable.
+
+        :return: (str): The task type.
+        """
+        registered = self.get_registered_task(task)
+        return task_type(registered.labels, registered.task_name)
+
+    def _register(self, task: Task, name: Optional[str]) -> AsyncTaskiqDecoratedTask[Any, Any]:
+        if name is None:
+            name = task_name(task)
+            if "<lambda>" in name or "<locals>" in name:
+                raise ValueError(f"The task {name} has no unique name, register it with an explicit name")
+        if (existing := self.broker.find_task(name)) is not None and existing.original_func != task:
+            raise ValueError(f"Another task is already registered as {name}, register this one with an explicit name")
+        return self.broker.register_task(task, task_name=name)
+
+    def _kicker(self, task: Task, entity: ScheduledEntity) -> AsyncKicker[Any, Any]:
+        registered = self.get_registered_task(task)
+        labels = {**registered.labels, **self._labels, SCHEDULED_TIME_LABEL: entity.scheduled_time.timestamp()}
+        if keys := entity.schedule_keys():
+            labels[SCHEDULE_KEYS_LABEL] = encode_schedule_keys(keys)
+        return AsyncKicker(task_name=registered.task_name, broker=self.broker, labels=labels)
+
     def add_labels(self, labels: dict[str, Any]) -> None:
         """
         Update the labels of the SchedulerImpl instance with the provided dictionary.
 
+        The labels are added to every schedule of every task, so the `task_type` label is set per task with `get_registered_task`.
+
         :param labels: (dict[str, Any]): A dictionary containing the labels to be added.
 
         :return: (None)
+
+        :raises ValueError: If the labels contain the `task_type` label.
         """
+        if TASK_TYPE_LABEL in labels:
+            raise ValueError(f"The {TASK_TYPE_LABEL} label is set per task with get_registered_task")
         self._labels.update(labels)
+
+
+def _move_entity(arg: Any, scheduled_time: datetime.datetime) -> Any:
+    if isinstance(arg, ScheduledEntity):
+        return dataclasses.replace(arg, scheduled_time=scheduled_time)
+    if isinstance(arg, dict) and "scheduled_time" in arg:
+        return {**arg, "scheduled_time": scheduled_time.isoformat() if isinstance(arg["scheduled_time"], str) else scheduled_time}
+    return arg
+
+
+def task_name(task: Task) -> str:
+    """
+    Returns the stable name of a task callable: `module:qualname` of the function, or of the class of a callable object.
+
+    The name is unique for module-level functions and classes only: the bound methods and the instances of one class share it.
+
+    :param task: (Task): The task callable.
+
+    :return: (str): The name of the task.
+    """
+    func = getattr(task, "__func__", task)
+    if not hasattr(func, "__qualname__"):
+        func = type(task)
+    return f"{func.__module__}:{func.__qualname__}"
@@ -0,0 +1,281 @@
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC
+from inspect import isawaitable
+from time import perf_counter, time
+from typing import Any, Final, Optional, Protocol
+
+from taskiq import ScheduledTask, ScheduleSource, TaskiqMessage, TaskiqMiddleware, TaskiqResult
+
+SCHEDULE_LAG: Final[str] = "schedule_lag_seconds"
+SCHEDULE_DISPATCH_LAG: Final[str] = "schedule_dispatch_lag_seconds"
+TASK_DURATION: Final[str] = "task_duration_seconds"
+QUEUE_DEPTH: Final[str] = "schedule_queue_depth"
+TASKS_IN_FLIGHT: Final[str] = "scheduled_tasks_in_flight"
+
+SCHEDULED_TIME_LABEL: Final[str] = "scheduled_time"
+TASK_TYPE_LABEL: Final[str] = "task_type"
+
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+Labels = Mapping[str, str]
+
+
+class MetricsSink(Protocol):
+
+    """Protocol for the receivers of the scheduler metrics, such as an in-memory aggregator or an exporter to a monitoring system."""
+
+    def observe(self, name: str, value: float, labels: Labels) -> None:
+        """
+        Records a value of a histogram.
+
+        Args :
+            name (str): The name of the metric.
+            value (float): The observed value.
+            labels (Labels): The labels of the observation.
+        """
+        raise NotImplementedError
+
+    def set_gauge(self, name: str, value: float, labels: Labels) -> None:
+        """
+        Sets the current value of a gauge.
+
+        Args :
+            name (str): The name of the metric.
+            value (float): The current value.
+            labels (Labels): The labels of the gauge.
+        """
+        raise NotImplementedError
+
+
+@dataclass
+class Histogram:
+
+    """
+    Counts the observed values in fixed buckets.
+
+    Attributes :
+        buckets (Sequence[float]): The ascending upper bounds of the buckets, values above the last one are counted in an overflow bucket.
+        counts (list[int]): The number of values per bucket, the last item is the overflow bucket.
+        total (float): The sum of the observed values.
+        count (int): The number of observed values.
+    """
+
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        """Creates the bucket counters."""
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """
+        Counts a value.
+
+        :param value: (float): The observed value.
+
+        :return: (None)
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile of the observed values as the upper bound of the bucket it falls into.
+
+        :param q: (float): The quantile, between 0 and 1.
+
+        :return: (float): The estimate, infinity if it falls into the overflow bucket, 0 if nothing was observed.
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class InMemoryMetricsSink(MetricsSink):
+
+    """Aggregates the scheduler metrics in memory, per metric name and label set."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.histograms: dict[tuple[str, frozenset[tuple[str, str]]], Histogram] = {}
+        self.gauges: dict[tuple[str, frozenset[tuple[str, str]]], float] = {}
+
+    def observe(self, name: str, value: float, labels: Labels) -> None:
+        """
+        Records a value of a histogram.
+
+        :param name: (str): The name of the metric.
+        :param value: (float): The observed value.
+        :param labels: (Labels): The labels of the observation.
+
+        :return: (None)
+        """
+        key = (name, frozenset(labels.items()))
+        if (histogram := self.histograms.get(key)) is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def set_gauge(self, name: str, value: float, labels: Labels) -> None:
+        """
+        Sets the current value of a gauge.
+
+        :param name: (str): The name of the metric.
+        :param value: (float): The current value.
+        :param labels: (Labels): The labels of the gauge.
+
+        :return: (None)
+        """
+        self.gauges[(name, frozenset(labels.items()))] = value
+
+    def get_histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        """
+        Returns the histogram of a metric with the given labels.
+
+        :param name: (str): The name of the metric.
+        :param labels: (str): The labels of the histogram.
+
+        :return: (Optional[Histogram]): The histogram, or None if nothing was observed.
+        """
+        return self.histograms.get((name, frozenset(labels.items())))
+
+
+def task_type(message_labels: Mapping[str, Any], task_name: str) -> str:
+    """
+    Returns the type of a task the metrics are labeled by: its `task_type` label, set with `SchedulerImpl.get_registered_task`, or its name.
+
+    :param message_labels: (Mapping[str, Any]): The labels of the task.
+    :param task_name: (str): The name of the task.
+
+    :return: (str): The task type.
+    """
+    return str(message_labels.get(TASK_TYPE_LABEL) or task_name)
+
+
+class SchedulerMetricsMiddleware(TaskiqMiddleware):
+
+    """
+    Records the metrics of the scheduled tasks on the workers.
+
+    The lag between the scheduled time of a task, stored in its `scheduled_time` label by `SchedulerImpl`, and the start of its execution,
+    the execution time of every task and the number of tasks being executed by the worker are sent to the sink.
+    """
+
+    def __init__(self, sink: MetricsSink) -> None:
+        super().__init__()
+        self.sink = sink
+        self._started: dict[str, float] = {}
+
+    def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        """
+        Records the lag of a scheduled task and starts measuring its execution time.
+
+        :param message: (TaskiqMessage): The task message.
+
+        :return: (TaskiqMessage): The unchanged message.
+        """
+        labels = {"task": task_type(message.labels, message.task_name), "path": "worker"}
+        if (scheduled_time := message.labels.get(SCHEDULED_TIME_LABEL)) is not None:
+            self.sink.observe(SCHEDULE_LAG, max(time() - float(scheduled_time), 0.0), labels)
+        self._started[message.task_id] = perf_counter()
+        self.sink.set_gauge(TASKS_IN_FLIGHT, len(self._started), {"path": "worker"})
+        return message
+
+    def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        """
+        Records the execution time of a task.
+
+        :param message: (TaskiqMessage): The task message.
+        :param result: (TaskiqResult[Any]): The result of the task.
+
+        :return: (None)
+        """
+        started = self._started.pop(message.task_id, None)
+        self.sink.set_gauge(TASKS_IN_FLIGHT, len(self._started), {"path": "worker"})
+        if started is not None:
+            labels = {"task": task_type(message.labels, message.task_name), "status": "error" if result.is_err else "ok"}
+            self.sink.observe(TASK_DURATION, perf_counter() - started, labels)
+
+
+class InstrumentedScheduleSource(ScheduleSource):
+
+    """
+    Wraps a schedule source of the taskiq scheduler process and records how late the schedules are dispatched.
+
+    Every poll sets the number of schedules which are already due, which grows when the source or the scheduler is saturated.
+    Any other attribute is taken from the wrapped source.
+    """
+
+    def __init__(self, source: ScheduleSource, sink: MetricsSink) -> None:
+        self.source = source
+        self.sink = sink
+
+    async def startup(self) -> None:
+        """Starts the wrapped source."""
+        await self.source.startup()
+
+    async def shutdown(self) -> None:
+        """Shuts the wrapped source down."""
+        await self.source.shutdown()
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        """
+        Asynchronously reads the schedules of the wrapped source and records the number of due ones.
+
+        :return: (list[ScheduledTask]): The schedules.
+        """
+        schedules = await self.source.get_schedules()
+        now = time()
+        due = sum(1 for schedule in schedules if schedule.time is not None and _timestamp(schedule) <= now)
+        self.sink.set_gauge(QUEUE_DEPTH, due, {"path": "source"})
+        return schedules
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        """Adds the schedule to the wrapped source."""
+        await self.source.add_schedule(schedule)
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        """Removes the schedule from the wrapped source."""
+        await self.source.delete_schedule(schedule_id)
+
+    async def pre_send(self, task: ScheduledTask) -> None:
+        """
+        Asynchronously records how late a one-off schedule is dispatched to the broker.
+
+        :param task: (ScheduledTask): The dispatched schedule.
+
+        :return: (None)
+        """
+        await _maybe_await(self.source.pre_send(task))
+        if task.time is not None:
+            labels = {"task": task_type(task.labels, task.task_name), "path": "source"}
+            self.sink.observe(SCHEDULE_DISPATCH_LAG, max(time() - _timestamp(task), 0.0), labels)
+
+    async def post_send(self, task: ScheduledTask) -> None:
+        """Runs the post-send hook of the wrapped source."""
+        await _maybe_await(self.source.post_send(task))
+
+    def __getattr__(self, name: str) -> Any:
+        """Returns the attribute of the wrapped source."""
+        return getattr(self.source, name)
+
+
+def _timestamp(schedule: ScheduledTask) -> float:
+    if schedule.time is None:
+        raise ValueError("The schedule has no time")
+    return schedule.time.timestamp() if schedule.time.tzinfo is not None else schedule.time.replace(tzinfo=UTC).timestamp()
+
+
+async def _maybe_await(value: Any) -> None:
+    if isawaitable(value):
+        await value
@@ -0,0 +1,272 @@
+import asyncio
+import base64
+import math
+from contextlib import suppress
+from datetime import UTC
+from time import time
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+import nats
+from nats.js.api import KeyValueConfig
+from nats.js.errors import KeyNotFoundError
+from nats.js.kv import KeyValue
+from taskiq import ScheduledTask, ScheduleSource
+from taskiq.abc.serializer import TaskiqSerializer
+from taskiq.compat import model_dump, model_validate
+from taskiq.serializers import PickleSerializer
+
+from aiogram_nats.infrastructure.database.kv.factory import get_or_create_kv
+from aiogram_nats.infrastructure.scheduler.sources import ensure_pending, get_schedule_keys
+
+if TYPE_CHECKING:
+    from nats.aio.client import Client
+
+BUCKET_SECONDS: Final[int] = 60
+_ONE_OFF_PREFIX: Final[str] = "at"
+_CRON_PREFIX: Final[str] = "cron"
+_INDEX_PREFIX: Final[str] = "idx"
+
+
+class NatsKVScheduleSource(ScheduleSource):
+
+    """
+    A schedule source storing the schedules in a NATS KV bucket, so that scheduling needs no other system than the broker.
+
+    One-off schedules are stored under time-bucketed keys `at.{minute}.{schedule_id}`, where the minute is the unix minute of their time,
+    and cron schedules under `cron.{schedule_id}`. A poll reads only the buckets from the oldest pending one
+    up to the bucket of `lookahead` seconds from now, so its cost does not depend on the number of schedules due later.
+    The buckets of executed schedules are not read again.
+    A schedule added with a time in the past is stored in the bucket of the current minute, so that it is not behind the poll cursor.
+    As a schedule may be added by a process whose clock is behind the one of the scheduler, a poll also reads
+    the buckets up to `max_clock_skew` seconds before the cursor.
+    The IDs of the schedules are indexed under `idx.{key}.{schedule_id}` per key of their `schedule_keys` label, the key being base64-encoded.
+    A schedule cancelled or moved after the scheduler has read it is dropped by `pre_send`.
+
+    :param servers: (list[str]): The NATS servers.
+    :param kv_config: (KeyValueConfig): The config of the KV bucket.
+    :param lookahead: (float): The number of seconds ahead of now the schedules are read for.
+    :param max_bucket_reads: (int): The number of buckets up to which they are read one by one, a whole bucket scan is done otherwise.
+    :param max_clock_skew: (float): The number of seconds the clocks of the processes adding schedules may be behind the scheduler.
+    :param serializer: (Optional[TaskiqSerializer]): The serializer of the schedules, pickle by default.
+    :param connect_kwargs: (Any): Additional arguments for `nats.connect`.
+    """
+
+    def __init__(
+            self,
+            servers: list[str],
+            kv_config: KeyValueConfig,
+            lookahead: float = 60.0,
+            max_bucket_reads: int = 10,
+            max_clock_skew: float = 60.0,
+            serializer: Optional[TaskiqSerializer] = None,
+            **connect_kwargs: Any,
+    ) -> None:
+        self.servers = servers
+        self.kv_config = kv_config
+        self.lookahead = lookahead
+        self.max_bucket_reads = max_bucket_reads
+        self.max_clock_skew = max_clock_skew
+        self.serializer = serializer or PickleSerializer()
+        self.connect_kwargs = connect_kwargs
+        self._nc: Optional[Client] = None
+        self._kv: Optional[KeyValue] = None
+        self._lock = asyncio.Lock()
+        self._cursor: Optional[int] = None
+        self._keys: dict[str, str] = {}
+
+    async def startup(self) -> None:
+        """
+        Asynchronously connects to NATS and binds to the KV bucket, creating it if it does not exist.
+
+        :return: (None)
+        """
+        await self._get_kv()
+
+    async def shutdown(self) -> None:
+        """
+        Asynchronously closes the NATS connection.
+
+        :return: (None)
+        """
+        if self._nc is not None:
+            await self._nc.close()
+        self._nc, self._kv = None, None
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        """
+        Asynchronously stores the schedule under its time-bucketed key.
+
+        :param schedule: (ScheduledTask): The schedule to be added.
+
+        :return: (None)
+        """
+        kv = await self._get_kv()
+        await kv.put(self._key(schedule), self.serializer.dumpb(model_dump(schedule)))
+        for key in get_schedule_keys(schedule):
+            await kv.put(self._index_key(key, schedule.schedule_id), schedule.schedule_id.encode())
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        """
+        Asynchronously removes the schedule.
+
+        :param schedule_id: (str): The ID of the schedule.
+
+        :return: (None)
+        """
+        kv = await self._get_kv()
+        key = await self._find_key(kv, schedule_id)
+        self._keys.pop(schedule_id, None)
+        if key is None:
+            return
+        if (schedule := await self._get(kv, key)) is not None:
+            for schedule_key in get_schedule_keys(schedule):
+                await kv.purge(self._index_key(schedule_key, schedule_id))
+        await kv.purge(key)
+
+    async def replace_schedule(self, schedule: ScheduledTask) -> None:
+        """
+        Asynchronously replaces the stored schedule with the same ID.
+
+        A schedule kept in the same bucket is replaced by a single put. As a KV bucket has no multi-key transactions,
+        a schedule moved to another bucket is deleted and added again.
+
+        :param schedule: (ScheduledTask): The new version of the schedule.
+
+        :return: (None)
+        """
+        kv = await self._get_kv()
+        if await self._find_key(kv, schedule.schedule_id) == self._key(schedule):
+            await kv.put(self._key(schedule), self.serializer.dumpb(model_dump(schedule)))
+            return
+        await self.delete_schedule(schedule.schedule_id)
+        await self.add_schedule(schedule)
+
+    async def get_schedule(self, schedule_id: str) -> Optional[ScheduledTask]:
+        """
+        Asynchronously reads the schedule with the given ID.
+
+        :param schedule_id: (str): The ID of the schedule.
+
+        :return: (Optional[ScheduledTask]): The schedule, or None if it does not exist.
+        """
+        kv = await self._get_kv()
+        key = await self._find_key(kv, schedule_id)
+        return await self._get(kv, key) if key is not None else None
+
+    async def get_schedule_ids(self, key: str) -> list[str]:
+        """
+        Asynchronously reads the IDs of the schedules indexed by the key.
+
+        :param key: (str): The key.
+
+        :return: (list[str]): The IDs of the schedules.
+        """
+        kv = await self._get_kv()
+        return [value.decode() for value in (await self._watch(kv, self._index_key(key, "*"))).values()]
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        """
+        Asynchronously reads the cron schedules and the one-off schedules due within the lookahead.
+
+        :return: (list[ScheduledTask]): The schedules.
+        """
+        kv = await self._get_kv()
+        current = int(time()) // BUCKET_SECONDS
+        last = int(time() + self.lookahead) // BUCKET_SECONDS
+        first = None if self._cursor is None else self._cursor - math.ceil(self.max_clock_skew / BUCKET_SECONDS)
+        if first is None or last - first > self.max_bucket_reads:
+            values = {
+                key: value for key, value in (await self._watch(kv, f"{_ONE_OFF_PREFIX}.>")).items()
+                if self._minute(key) <= last
+            }
+        else:
+            values = {}
+            for minute in range(first, last + 1):
+                values.update(await self._watch(kv, f"{_ONE_OFF_PREFIX}.{minute}.*"))
+        self._cursor = min((self._minute(key) for key in values), default=current)
+        self._cursor = min(self._cursor, current)
+        values.update(await self._watch(kv, f"{_CRON_PREFIX}.*"))
+        schedules = []
+        for key, value in values.items():
+            schedule = model_validate(ScheduledTask, self.serializer.loadb(value))
+            self._keys[schedule.schedule_id] = key
+            schedules.append(schedule)
+        return schedules
+
+    async def pre_send(self, task: ScheduledTask) -> None:
+        """
+        Asynchronously drops a schedule cancelled or moved after it was read.
+
+        :param task: (ScheduledTask): The schedule about to be sent.
+
+        :return: (None)
+        """
+        await ensure_pending(self, task)
+
+    async def post_send(self, task: ScheduledTask) -> None:
+        """
+        Asynchronously removes an executed one-off schedule.
+
+        :param task: (ScheduledTask): The executed schedule.
+
+        :return: (None)
+        """
+        if task.time is not None:
+            await self.delete_schedule(task.schedule_id)
+
+    async def _get_kv(self) -> KeyValue:
+        async with self._lock:
+            if self._kv is None:
+                self._nc = await nats.connect(self.servers, **self.connect_kwargs)
+                self._kv = await get_or_create_kv(self._nc.jetstream(), self.kv_config)
+            return self._kv
+
+    async def _find_key(self, kv: KeyValue, schedule_id: str) -> Optional[str]:
+        if (key := self._keys.get(schedule_id)) is not None:
+            return key
+        for key in await self._watch(kv, f"{_ONE_OFF_PREFIX}.*.{schedule_id}"):
+            return key
+        with suppress(KeyNotFoundError):
+            await kv.get(f"{_CRON_PREFIX}.{schedule_id}")
+            return f"{_CRON_PREFIX}.{schedule_id}"
+        return None
+
+    async def _get(self, kv: KeyValue, key: str) -> Optional[ScheduledTask]:
+        try:
+            entry = await kv.get(key)
+        except KeyNotFoundError:
+            return None
+        return model_validate(ScheduledTask, self.serializer.loadb(entry.value)) if entry.value else None
+
+    @staticmethod
+    async def _watch(kv: KeyValue, keys: str) -> dict[str, bytes]:
+        watcher = await kv.watch(keys, ignore_deletes=True)
+        values = {}
+        try:
+            async for entry in watcher:
+                if entry is None:
+                    break
+                if entry.value:
+                    values[entry.key] = entry.value
+        finally:
+            await watcher.stop()
+        return values
+
+    def _key(self, schedule: ScheduledTask) -> str:
+        if schedule.time is None:
+            return f"{_CRON_PREFIX}.{schedule.schedule_id}"
+        scheduled_time = schedule.time if schedule.time.tzinfo is not None else schedule.time.replace(tzinfo=UTC)
+        minute = max(int(scheduled_time.timestamp()), int(time())) // BUCKET_SECONDS
+        # A clock stepped back must not put the schedule behind the buckets this instance has already read.
+        if self._cursor is not None:
+            minute = max(minute, self._cursor)
+        return f"{_ONE_OFF_PREFIX}.{minute}.{schedule.schedule_id}"
+
+    @staticmethod
+    def _index_key(key: str, schedule_id: str) -> str:
+        encoded = base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+        return f"{_INDEX_PREFIX}.{encoded}.{schedule_id}"
+
+    @staticmethod
+    def _minute(key: str) -> int:
+        return int(key.split(".", 2)[1])
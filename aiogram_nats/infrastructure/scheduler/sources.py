@@ -0,0 +1,375 @@
+from collections.abc import Iterable, Sequence
+from datetime import UTC
+from time import time
+from typing import Any, Final, Optional, Protocol, runtime_checkable
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from taskiq import ScheduledTask, ScheduleSource
+from taskiq.compat import model_dump, model_validate
+from taskiq.exceptions import ScheduledTaskCancelledError
+from taskiq_redis import RedisScheduleSource
+
+SCHEDULE_KEYS_LABEL: Final[str] = "schedule_keys"
+_KEYS_SEPARATOR: Final[str] = ","
+
+
+def encode_schedule_keys(keys: Iterable[str]) -> str:
+    """
+    Encodes the keys of a schedule into the value of its `schedule_keys` label.
+
+    :param keys: (Iterable[str]): The keys of the schedule.
+
+    :return: (str): The label value.
+    """
+    return _KEYS_SEPARATOR.join(keys)
+
+
+def get_schedule_keys(schedule: ScheduledTask) -> list[str]:
+    """
+    Returns the keys a schedule is indexed by, stored in its `schedule_keys` label.
+
+    :param schedule: (ScheduledTask): The schedule.
+
+    :return: (list[str]): The keys of the schedule.
+    """
+    value = schedule.labels.get(SCHEDULE_KEYS_LABEL)
+    return [key for key in str(value).split(_KEYS_SEPARATOR) if key] if value else []
+
+
+@runtime_checkable
+class IndexedScheduleSource(Protocol):
+
+    """Protocol for schedule sources able to look the schedules up by their ID and by the keys in their `schedule_keys` label."""
+
+    async def get_schedule(self, schedule_id: str) -> Optional[ScheduledTask]:
+        """
+        Returns the schedule with the given ID.
+
+        Args :
+            schedule_id (str): The ID of the schedule.
+
+        Returns :
+            Optional[ScheduledTask]: The schedule, or None if it does not exist.
+        """
+        raise NotImplementedError
+
+    async def get_schedule_ids(self, key: str) -> list[str]:
+        """
+        Returns the IDs of the schedules indexed by the key.
+
+        Args :
+            key (str): The key.
+
+        Returns :
+            list[str]: The IDs of the schedules.
+        """
+        raise NotImplementedError
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        """
+        Removes the schedule and its index entries.
+
+        Args :
+            schedule_id (str): The ID of the schedule.
+        """
+        raise NotImplementedError
+
+    async def replace_schedule(self, schedule: ScheduledTask) -> None:
+        """
+        Replaces the stored schedule with the same ID and its index entries.
+
+        Args :
+            schedule (ScheduledTask): The new version of the schedule.
+        """
+        raise NotImplementedError
+
+
+async def ensure_pending(source: IndexedScheduleSource, task: ScheduledTask) -> None:
+    """
+    Checks that a schedule read by the scheduler is still pending as it was read.
+
+    The taskiq scheduler reads the schedules due within the next minute and waits for their time in memory,
+    so a schedule cancelled or moved meanwhile is dropped when it is about to be sent.
+
+    :param source: (IndexedScheduleSource): The source the schedule was read from.
+    :param task: (ScheduledTask): The schedule about to be sent.
+
+    :return: (None)
+
+    :raises ScheduledTaskCancelledError: If the schedule was deleted or moved to another time.
+    """
+    stored = await source.get_schedule(task.schedule_id)
+    if stored is None or stored.time != task.time:
+        raise ScheduledTaskCancelledError
+
+
+@runtime_checkable
+class BulkScheduleSource(Protocol):
+
+    """Protocol for schedule sources able to add many schedules at once."""
+
+    async def add_schedules(self, schedules: Sequence[ScheduledTask]) -> None:
+        """
+        Adds the schedules to the source.
+
+        Args :
+            schedules (Sequence[ScheduledTask]): The schedules to be added.
+        """
+        raise NotImplementedError
+
+
+class PipelinedRedisScheduleSource(RedisScheduleSource):
+
+    """
+    A Redis schedule source adding many schedules in pipelined batches.
+
+    Every batch of `pipeline_size` schedules is written with a single round-trip to Redis.
+    """
+
+    def __init__(self, url: str, pipeline_size: int = 1000, **kwargs: Any) -> None:
+        super().__init__(url, **kwargs)
+        self.pipeline_size = pipeline_size
+
+    async def add_schedules(self, schedules: Sequence[ScheduledTask]) -> None:
+        """
+        Asynchronously adds the schedules to Redis in pipelined batches.
+
+        :param schedules: (Sequence[ScheduledTask]): The schedules to be added.
+
+        :return: (None)
+        """
+        async with Redis(connection_pool=self.connection_pool) as redis:
+            for start in range(0, len(schedules), self.pipeline_size):
+                async with redis.pipeline(transaction=False) as pipe:
+                    for schedule in schedules[start:start + self.pipeline_size]:
+                        pipe.set(f"{self.prefix}:{schedule.schedule_id}", self.serializer.dumpb(model_dump(schedule)))
+                    await pipe.execute()
+
+
+class TimeIndexedRedisScheduleSource(PipelinedRedisScheduleSource):
+
+    """
+    A Redis schedule source indexing the schedules by their time.
+
+    The one-off schedules are indexed in a sorted set scored by their scheduled time and the cron schedules in a set,
+    so that a poll reads only the cron schedules and the one-off schedules due within `lookahead` seconds,
+    instead of scanning every stored schedule. The schedules are stored under the same keys as in `RedisScheduleSource`,
+    the schedules stored without the index are indexed on startup.
+    The IDs of the schedules are also indexed in a set per key of their `schedule_keys` label.
+    A schedule cancelled or moved after the scheduler has read it is dropped by `pre_send`.
+    """
+
+    def __init__(self, url: str, lookahead: float = 60.0, **kwargs: Any) -> None:
+        super().__init__(url, **kwargs)
+        self.lookahead = lookahead
+        self.time_index_key = f"{self.prefix}-index:time"
+        self.cron_index_key = f"{self.prefix}-index:cron"
+        self.key_index_prefix = f"{self.prefix}-index:key"
+
+    async def startup(self) -> None:
+        """
+        Asynchronously indexes the stored schedules which are not indexed yet.
+
+        :return: (None)
+        """
+        await self.reindex()
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        """
+        Asynchronously adds the schedule to Redis and indexes it.
+
+        :param schedule: (ScheduledTask): The schedule to be added.
+
+        :return: (None)
+        """
+        await self.add_schedules([schedule])
+
+    async def add_schedules(self, schedules: Sequence[ScheduledTask]) -> None:
+        """
+        Asynchronously adds the schedules to Redis and indexes them in pipelined batches.
+
+        :param schedules: (Sequence[ScheduledTask]): The schedules to be added.
+
+        :return: (None)
+        """
+        async with Redis(connection_pool=self.connection_pool) as redis:
+            for start in range(0, len(schedules), self.pipeline_size):
+                async with redis.pipeline(transaction=False) as pipe:
+                    for schedule in schedules[start:start + self.pipeline_size]:
+                        pipe.set(self._key(schedule.schedule_id), self.serializer.dumpb(model_dump(schedule)))
+                        self._index(pipe, schedule)
+                    await pipe.execute()
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        """
+        Asynchronously removes the schedule and its index entries.
+
+        :param schedule_id: (str): The ID of the schedule.
+
+        :return: (None)
+        """
+        schedule = await self.get_schedule(schedule_id)
+        async with Redis(connection_pool=self.connection_pool) as redis, redis.pipeline(transaction=False) as pipe:
+            self._remove(pipe, schedule_id, schedule)
+            await pipe.execute()
+
+    async def replace_schedule(self, schedule: ScheduledTask) -> None:
+        """
+        Asynchronously replaces the stored schedule with the same ID and its index entries in one MULTI transaction.
+
+        :param schedule: (ScheduledTask): The new version of the schedule.
+
+        :return: (None)
+        """
+        previous = await self.get_schedule(schedule.schedule_id)
+        async with Redis(connection_pool=self.connection_pool) as redis, redis.pipeline(transaction=True) as pipe:
+            self._remove(pipe, schedule.schedule_id, previous)
+            pipe.set(self._key(schedule.schedule_id), self.serializer.dumpb(model_dump(schedule)))
+            self._index(pipe, schedule)
+            await pipe.execute()
+
+    async def get_schedule(self, schedule_id: str) -> Optional[ScheduledTask]:
+        """
+        Asynchronously reads the schedule with the given ID.
+
+        :param schedule_id: (str): The ID of the schedule.
+
+        :return: (Optional[ScheduledTask]): The schedule, or None if it does not exist.
+        """
+        async with Redis(connection_pool=self.connection_pool) as redis:
+            value = await redis.get(self._key(schedule_id))
+        return model_validate(ScheduledTask, self.serializer.loadb(value)) if value else None
+
+    async def get_schedule_ids(self, key: str) -> list[str]:
+        """
+        Asynchronously reads the IDs of the schedules indexed by the key.
+
+        Index entries of schedules which no longer exist are removed.
+
+        :param key: (str): The key.
+
+        :return: (list[str]): The IDs of the schedules.
+        """
+        async with Redis(connection_pool=self.connection_pool) as redis:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.smembers(self._key_index(key))
+                (members,) = await pipe.execute()
+            ids = [member.decode() if isinstance(member, bytes) else member for member in members]
+            if not ids:
+                return []
+            async with redis.pipeline(transaction=False) as pipe:
+                for schedule_id in ids:
+                    pipe.exists(self._key(schedule_id))
+                exists = await pipe.execute()
+            stale = [schedule_id for schedule_id, found in zip(ids, exists, strict=True) if not found]
+            if stale:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.srem(self._key_index(key), *stale)
+                    await pipe.execute()
+        return [schedule_id for schedule_id, found in zip(ids, exists, strict=True) if found]
+
+    async def pre_send(self, task: ScheduledTask) -> None:
+        """
+        Asynchronously drops a schedule cancelled or moved after it was read.
+
+        :param task: (ScheduledTask): The schedule about to be sent.
+
+        :return: (None)
+        """
+        await ensure_pending(self, task)
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        """
+        Asynchronously reads the cron schedules and the one-off schedules due within the lookahead.
+
+        Index entries of schedules which no longer exist are removed.
+
+        :return: (list[ScheduledTask]): The schedules.
+        """
+        async with Redis(connection_pool=self.connection_pool) as redis:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zrangebyscore(self.time_index_key, "-inf", time() + self.lookahead)
+                pipe.smembers(self.cron_index_key)
+                due, cron = await pipe.execute()
+            ids = [*due, *cron]
+            schedules, stale = [], []
+            for start in range(0, len(ids), self.buffer_size):
+                chunk = ids[start:start + self.buffer_size]
+                for schedule_id, value in zip(chunk, await redis.mget([self._key(schedule_id) for schedule_id in chunk]), strict=True):
+                    if value:
+                        schedules.append(model_validate(ScheduledTask, self.serializer.loadb(value)))
+                    else:
+                        stale.append(schedule_id)
+            if stale:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.zrem(self.time_index_key, *stale)
+                    pipe.srem(self.cron_index_key, *stale)
+                    await pipe.execute()
+        return schedules
+
+    async def reindex(self) -> int:
+        """
+        Asynchronously indexes the stored schedules which are not indexed yet.
+
+        Every stored schedule is scanned, so it is meant to be run once, when the source is started.
+
+        :return: (int): The number of added index entries.
+        """
+        indexed = 0
+        async with Redis(connection_pool=self.connection_pool) as redis:
+            keys = [key async for key in redis.scan_iter(f"{self.prefix}:*", count=self.buffer_size)]
+            for start in range(0, len(keys), self.pipeline_size):
+                chunk = keys[start:start + self.pipeline_size]
+                async with redis.pipeline(transaction=False) as pipe:
+                    for value in await redis.mget(chunk):
+                        if value:
+                            self._index(pipe, model_validate(ScheduledTask, self.serializer.loadb(value)))
+                    indexed += sum(await pipe.execute())
+        return indexed
+
+    def _key(self, schedule_id: str | bytes) -> str:
+        if isinstance(schedule_id, bytes):
+            schedule_id = schedule_id.decode()
+        return f"{self.prefix}:{schedule_id}"
+
+    def _index(self, pipe: Pipeline, schedule: ScheduledTask) -> None:
+        if schedule.time is not None:
+            scheduled_time = schedule.time if schedule.time.tzinfo is not None else schedule.time.replace(tzinfo=UTC)
+            pipe.zadd(self.time_index_key, {schedule.schedule_id: scheduled_time.timestamp()})
+        else:
+            pipe.sadd(self.cron_index_key, schedule.schedule_id)
+        for key in get_schedule_keys(schedule):
+            pipe.sadd(self._key_index(key), schedule.schedule_id)
+
+    def _remove(self, pipe: Pipeline, schedule_id: str, schedule: Optional[ScheduledTask]) -> None:
+        pipe.delete(self._key(schedule_id))
+        pipe.zrem(self.time_index_key, schedule_id)
+        pipe.srem(self.cron_index_key, schedule_id)
+        for key in get_schedule_keys(schedule) if schedule is not None else ():
+            pipe.srem(self._key_index(key), schedule_id)
+
+    def _key_index(self, key: str) -> str:
+        return f"{self.key_index_prefix}:{key}"
+
+
+class BufferScheduleSource(ScheduleSource):
+
+    """Collects the schedules added to it in memory, so they can be written to another source at once."""
+
+    def __init__(self, schedules: Optional[list[ScheduledTask]] = None) -> None:
+        self.schedules = schedules if schedules is not None else []
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        """Returns the collected schedules."""
+        return self.schedules
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        """
+        Collects the schedule.
+
+        :param schedule: (ScheduledTask): The schedule to be collected.
+
+        :return: (None)
+        """
+        self.schedules.append(schedule)
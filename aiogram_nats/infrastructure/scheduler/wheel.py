@@ -0,0 +1,381 @@
+import asyncio
+import dataclasses
+import datetime
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from math import ceil
+from time import monotonic, perf_counter, time
+from typing import Any, Generic, Optional, TypeVar
+from uuid import uuid4
+
+import structlog
+
+from aiogram_nats.common.log.configuration import LoggerName
+from aiogram_nats.core.entities.scheduled import ScheduledEntity
+from aiogram_nats.core.interfaces.interfaces.scheduler import Scheduler, SupportScheduled, Task
+from aiogram_nats.infrastructure.scheduler.impl import SchedulerImpl, task_name
+from aiogram_nats.infrastructure.scheduler.metrics import QUEUE_DEPTH, SCHEDULE_LAG, TASK_DURATION, MetricsSink
+
+logger = structlog.stdlib.get_logger(LoggerName.SCHEDULER.value)
+
+WHEEL_SCHEDULE_PREFIX = "wheel:"
+
+_T = TypeVar("_T")
+
+
+class TimingWheel(Generic[_T]):
+
+    """
+    A hierarchical timing wheel keeping items until their deadline.
+
+    Time is measured in ticks of `tick` seconds. The first level has `slots` slots of one tick each,
+    every next level has `slots` slots spanning a whole turn of the previous level.
+    Adding an item and advancing the wheel by one tick take O(1) time regardless of the number of items,
+    items of the upper levels cascade down as their slot is reached.
+
+    Attributes :
+        tick (float): The duration of one tick in seconds.
+        slots (int): The number of slots on each level.
+        levels (int): The number of levels.
+    """
+
+    def __init__(self, tick: float, slots: int = 64, levels: int = 3, start: float = 0.0) -> None:
+        if tick <= 0:
+            raise ValueError("tick must be greater than 0")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._start = start
+        self._current = 0
+        self._size = 0
+        self._wheels: list[list[list[tuple[int, _T]]]] = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._overdue: list[_T] = []
+
+    def __len__(self) -> int:
+        """Returns the number of items in the wheel."""
+        return self._size
+
+    @property
+    def span(self) -> float:
+        """Returns the longest delay in seconds the wheel can hold."""
+        return self.tick * float(self.slots ** self.levels - 1)
+
+    def add(self, deadline: float, item: _T) -> None:
+        """
+        Adds an item to the wheel.
+
+        Items whose deadline has passed are returned by the next advance.
+
+        :param deadline: (float): The deadline of the item on the clock of the wheel.
+        :param item: (_T): The item.
+
+        :return: (None)
+
+        :raises ValueError: If the deadline is beyond the span of the wheel.
+        """
+        ticks = ceil((deadline - self._start) / self.tick)
+        if ticks - self._current > self.slots ** self.levels - 1:
+            raise ValueError(f"Deadline is more than {self.span} seconds away")
+        self._place(ticks, item)
+        self._size += 1
+
+    def advance(self, now: float) -> list[_T]:
+        """
+        Moves the wheel to the given time and removes the items whose deadline has come.
+
+        :param now: (float): The current time on the clock of the wheel.
+
+        :return: (list[_T]): The due items.
+        """
+        due, self._overdue = self._overdue, []
+        target = int((now - self._start) // self.tick)
+        if self._size == len(due):
+            self._current = max(self._current, target)
+        while self._current < target:
+            self._current += 1
+            self._cascade()
+            slot = self._wheels[0][self._current % self.slots]
+            due.extend(item for _, item in slot)
+            slot.clear()
+            if self._overdue:
+                due.extend(self._overdue)
+                self._overdue.clear()
+        self._size -= len(due)
+        return due
+
+    def items(self) -> Iterator[_T]:
+        """Iterates over the items in the wheel in no particular order."""
+        yield from self._overdue
+        for wheel in self._wheels:
+            for slot in wheel:
+                for _, item in slot:
+                    yield item
+
+    def clear(self) -> None:
+        """Removes all items from the wheel."""
+        self._overdue.clear()
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+        self._size = 0
+
+    def _place(self, ticks: int, item: _T) -> None:
+        delta = ticks - self._current
+        if delta <= 0:
+            self._overdue.append(item)
+            return
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.slots:
+                self._wheels[level][(ticks // span) % self.slots].append((ticks, item))
+                return
+            span *= self.slots
+
+    def _cascade(self) -> None:
+        span = self.slots
+        for level in range(1, self.levels):
+            if self._current % span:
+                return
+            slot = self._wheels[level][(self._current // span) % self.slots]
+            entries = list(slot)
+            slot.clear()
+            for ticks, item in entries:
+                self._place(ticks, item)
+            span *= self.slots
+
+
+@dataclass
+class _WheelJob:
+    schedule_id: str
+    entity: ScheduledEntity
+    task: Task
+    cancelled: bool = False
+
+
+class TimingWheelScheduler(Scheduler):
+
+    """
+    Runs short-delay schedules in-process on a timing wheel and delegates the rest to another scheduler.
+
+    Entities due within `horizon` seconds are kept in memory and their tasks are executed in this process
+    with a precision of one tick, without a round trip through the schedule source.
+    Entities beyond the horizon and the tasks registered as durable are scheduled through the fallback scheduler.
+    Schedules which are still in memory when the scheduler is stopped are handed over to the fallback,
+    so `stop` must be awaited on shutdown; `create_scheduler` does it on the shutdown of the broker.
+    The in-memory schedules are indexed by their IDs and by the keys of their entities, so that they can be cancelled
+    and moved; cancelled schedules stay on the wheel until their time and are skipped then.
+    With a metrics sink, the lag and the execution time of the in-memory schedules and their number are recorded,
+    labeled by the same task type as on the workers.
+    """
+
+    def __init__(
+            self,
+            fallback: Scheduler,
+            horizon: float = 60.0,
+            tick: float = 0.05,
+            slots: int = 64,
+            levels: int = 3,
+            durable_tasks: Iterable[Task] = (),
+            metrics: Optional[MetricsSink] = None,
+    ) -> None:
+        self.fallback = fallback
+        self.metrics = metrics
+        self.horizon = horizon
+        self.durable_tasks = set(durable_tasks)
+        self._wheel: TimingWheel[_WheelJob] = TimingWheel(tick, slots, levels, start=monotonic())
+        if horizon > self._wheel.span:
+            raise ValueError(f"horizon must not exceed the span of the wheel: {self._wheel.span} seconds")
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task[None]] = None
+        self._running: set[asyncio.Task[Any]] = set()
+        self._jobs: dict[str, _WheelJob] = {}
+        self._keys: dict[str, set[str]] = {}
+
+    async def schedule(self, entity: SupportScheduled, task: Task) -> str:
+        """
+        Schedule a task to be executed at a later time.
+
+        :param entity: (SupportScheduled): The entity to be scheduled.
+        :param task: (Task): The task to be executed. It should take a `SupportScheduled` object and return an `Awaitable` object.
+
+        :return: (str): The scheduling ID.
+        """
+        if not self.is_short(entity, task):
+            return await self.fallback.schedule(entity, task)
+        return self._add(entity, task)
+
+    async def schedule_many(self, entities: Sequence[SupportScheduled], task: Task) -> list[str]:
+        """
+        Schedule a task to be executed for each of the entities at its scheduled time.
+
+        The short-delay entities are kept in memory, the others are scheduled through the fallback at once.
+
+        :param entities: (Sequence[SupportScheduled]): The entities to be scheduled.
+        :param task: (Task): The task to be executed for each entity.
+
+        :return: (list[str]): The scheduling IDs in the order of the entities.
+        """
+        ids: list[Optional[str]] = [None] * len(entities)
+        delegated: list[int] = []
+        for i, entity in enumerate(entities):
+            if self.is_short(entity, task):
+                ids[i] = self._add(entity, task)
+            else:
+                delegated.append(i)
+        if delegated:
+            delegated_ids = await self.fallback.schedule_many([entities[i] for i in delegated], task)
+            for i, schedule_id in zip(delegated, delegated_ids, strict=True):
+                ids[i] = schedule_id
+        return [schedule_id for schedule_id in ids if schedule_id is not None]
+
+    async def cancel(self, schedule_id: str) -> bool:
+        """
+        Cancel a pending schedule, in memory or through the fallback.
+
+        :param schedule_id: (str): The scheduling ID.
+
+        :return: (bool): True if the schedule is cancelled, False if it was not found.
+        """
+        if (job := self._jobs.get(schedule_id)) is not None:
+            self._forget(job)
+            job.cancelled = True
+            return True
+        if schedule_id.startswith(WHEEL_SCHEDULE_PREFIX):
+            return False
+        return await self.fallback.cancel(schedule_id)
+
+    async def reschedule(self, schedule_id: str, scheduled_time: datetime.datetime) -> Optional[str]:
+        """
+        Move a pending schedule to another time.
+
+        An in-memory schedule keeps its ID while the new time is within the horizon,
+        and is scheduled through the fallback under a new ID otherwise.
+        The schedules of the fallback are moved by the fallback.
+
+        :param schedule_id: (str): The scheduling ID.
+        :param scheduled_time: (datetime.datetime): The new time of the schedule.
+
+        :return: (Optional[str]): The scheduling ID after the move, or None if the schedule was not found.
+        """
+        if (job := self._jobs.get(schedule_id)) is None:
+            if schedule_id.startswith(WHEEL_SCHEDULE_PREFIX):
+                return None
+            return await self.fallback.reschedule(schedule_id, scheduled_time)
+        self._forget(job)
+        job.cancelled = True
+        entity = dataclasses.replace(job.entity, scheduled_time=scheduled_time)
+        if not self.is_short(entity, job.task):
+            return await self.fallback.schedule(entity, job.task)
+        return self._add(entity, job.task, schedule_id)
+
+    async def cancel_by_key(self, key: str) -> int:
+        """
+        Cancel every pending schedule of the entities indexed by the key, in memory and through the fallback.
+
+        :param key: (str): One of the keys returned by `ScheduledEntity.schedule_keys`.
+
+        :return: (int): The number of cancelled schedules.
+        """
+        cancelled = 0
+        for schedule_id in list(self._keys.get(key, ())):
+            cancelled += await self.cancel(schedule_id)
+        return cancelled + await self.fallback.cancel_by_key(key)
+
+    def is_short(self, entity: ScheduledEntity, task: Task) -> bool:
+        """
+        Checks if the entity is due within the horizon and its task may be executed in-process.
+
+        :param entity: (ScheduledEntity): The entity to be scheduled.
+        :param task: (Task): The task to be executed.
+
+        :return: (bool): True if the entity is kept on the wheel, False if it is delegated to the fallback.
+        """
+        return task not in self.durable_tasks and entity.time_left().total_seconds() <= self.horizon
+
+    def start(self) -> None:
+        """
+        Starts executing the due schedules. It is started automatically by the first in-memory schedule.
+
+        :return: (None)
+        """
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops executing the due schedules, hands the pending ones over to the fallback and waits for the running tasks.
+
+        :return: (None)
+        """
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        pending: dict[Task, list[ScheduledEntity]] = {}
+        for job in self._jobs.values():
+            pending.setdefault(job.task, []).append(job.entity)
+        self._wheel.clear()
+        self._jobs.clear()
+        self._keys.clear()
+        for task, entities in pending.items():
+            await self.fallback.schedule_many(entities, task)
+            logger.info("Pending schedules were handed over", count=len(entities))
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def __len__(self) -> int:
+        """Returns the number of schedules kept in memory."""
+        return len(self._jobs)
+
+    def _add(self, entity: ScheduledEntity, task: Task, schedule_id: Optional[str] = None) -> str:
+        job = _WheelJob(schedule_id or f"{WHEEL_SCHEDULE_PREFIX}{uuid4().hex}", entity, task)
+        self._wheel.add(monotonic() + entity.time_left().total_seconds(), job)
+        self._jobs[job.schedule_id] = job
+        for key in entity.schedule_keys():
+            self._keys.setdefault(key, set()).add(job.schedule_id)
+        self.start()
+        self._wakeup.set()
+        return job.schedule_id
+
+    async def _run(self) -> None:
+        while True:
+            if not self._wheel:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            await asyncio.sleep(self._wheel.tick)
+            due = self._wheel.advance(monotonic())
+            for job in due:
+                if job.cancelled:
+                    continue
+                self._forget(job)
+                running = asyncio.create_task(self._execute(job))
+                self._running.add(running)
+                running.add_done_callback(self._running.discard)
+            if due and self.metrics is not None:
+                self.metrics.set_gauge(QUEUE_DEPTH, len(self._jobs), {"path": "wheel"})
+
+    def _forget(self, job: _WheelJob) -> None:
+        self._jobs.pop(job.schedule_id, None)
+        for key in job.entity.schedule_keys():
+            if (ids := self._keys.get(key)) is not None:
+                ids.discard(job.schedule_id)
+                if not ids:
+                    del self._keys[key]
+
+    async def _execute(self, job: _WheelJob) -> None:
+        if self.metrics is not None:
+            lag = max(time() - job.entity.scheduled_time.timestamp(), 0.0)
+            self.metrics.observe(SCHEDULE_LAG, lag, {"task": self._task_type(job.task), "path": "wheel"})
+        started, status = perf_counter(), "ok"
+        try:
+            await job.task(job.entity)
+        except Exception:
+            status = "error"
+            logger.exception("Scheduled task failed", schedule_id=job.schedule_id)
+        if self.metrics is not None:
+            self.metrics.observe(TASK_DURATION, perf_counter() - started, {"task": self._task_type(job.task), "status": status})
+
+    def _task_type(self, task: Task) -> str:
+        if isinstance(self.fallback, SchedulerImpl):
+            return self.fallback.get_task_type(task)
+        return task_name(task)
@@ -0,0 +1,57 @@
+"""
+Compares the payload codecs of the mailing service client: encode and decode time and payload size, with and without zstd.
+
+The payload is a typical mailing: a list of user records with a shared text.
+Run with `python -m benchmarks.codecs [count]` from the root of the repository.
+Codecs and compressions whose optional packages are not installed are skipped.
+"""
+import sys
+import timeit
+from datetime import UTC, datetime
+from functools import partial
+from typing import Any
+
+from aiogram_nats.common.settings.models.mailing_service import MailingServiceSettings, PayloadCodec, PayloadCompression
+from aiogram_nats.infrastructure.clients.mailing_service.codecs import PayloadSerializer
+
+REPEAT = 5
+
+
+def make_payload(count: int) -> list[dict[str, Any]]:
+    joined = datetime(2024, 1, 1, tzinfo=UTC).isoformat()
+    return [
+        {"id": 1_000_000_000 + i, "first_name": f"User {i}", "username": f"user_{i}", "joined_us": joined, "text": "Weekly digest"}
+        for i in range(count)
+    ]
+
+
+def time_encode(serializer: PayloadSerializer, payload: list[dict[str, Any]]) -> float:
+    return min(timeit.repeat(partial(serializer.dumps, payload), number=1, repeat=REPEAT))
+
+
+def time_decode(serializer: PayloadSerializer, data: bytes, headers: dict[str, str]) -> float:
+    return min(timeit.repeat(partial(serializer.loads, data, headers), number=1, repeat=REPEAT))
+
+
+def main(count: int) -> None:
+    payload = make_payload(count)
+    print(f"payload: {count} records")
+    for codec in PayloadCodec:
+        for compression in PayloadCompression:
+            settings = MailingServiceSettings(codec=codec, compression=compression, compression_threshold=0)
+            try:
+                serializer = PayloadSerializer.from_settings(settings)
+            except RuntimeError as e:
+                print(f"{codec.value:>8} + {compression.value:<4}: skipped, {e}")
+                continue
+            data, headers = serializer.dumps(payload)
+            encode = time_encode(serializer, payload)
+            decode = time_decode(serializer, data, headers)
+            print(
+                f"{codec.value:>8} + {compression.value:<4}: {len(data) / 1024:9.1f} KB, "
+                f"encode {encode * 1000:7.1f}ms, decode {decode * 1000:7.1f}ms",
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
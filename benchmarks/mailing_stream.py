@@ -0,0 +1,78 @@
+"""
+Compares the peak RSS of reading a mailing with `MailingServiceClient.iter_mailing_messages` against fetching it as one list.
+
+The list-based read fetches every pending message in a single batch, as the removed `get_all_mailing_messages` did.
+Every read runs in a separate process, so that its peak RSS is not affected by the other one.
+Requires a running NATS server with JetStream, run with `python -m benchmarks.mailing_stream [nats url] [count] [size]`
+from the root of the repository. The benchmark uses a separate stream and removes it afterwards.
+"""
+import asyncio
+import resource
+import subprocess
+import sys
+from uuid import uuid4
+
+import nats
+from nats.js.api import StreamConfig
+
+from aiogram_nats.common.settings.models.mailing_service import MailingServiceSettings
+from aiogram_nats.infrastructure.clients.mailing_service.client import MailingServiceClient
+
+SETTINGS = MailingServiceSettings(main_subject="benchmark.mailing", stream_name="benchmark_mailing_stream")
+MODES = ("list", "iter")
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def read(url: str, mode: str, mailing_id: str, count: int) -> None:
+    nc = await nats.connect(url)
+    client = MailingServiceClient(nc, SETTINGS, nc.jetstream())
+    baseline = peak_rss_mb()
+    received = 0
+    if mode == "list":
+        msgs = await client.get_mailing_messages(mailing_id, batch=count, timeout=30)
+        for msg in msgs:
+            received += 1
+            await msg.ack()
+    else:
+        async for _ in client.iter_mailing_messages(mailing_id, max_inflight=100, timeout=2):
+            received += 1
+    print(f"{mode}: {received} messages, peak RSS +{peak_rss_mb() - baseline:.1f} MB")
+    await nc.close()
+
+
+async def main(url: str, count: int, size: int) -> None:
+    nc = await nats.connect(url)
+    js = nc.jetstream()
+    client = MailingServiceClient(nc, SETTINGS, js)
+    await js.add_stream(StreamConfig(name=SETTINGS.stream_name, subjects=[client.messages_subject(">")]))
+    try:
+        mailing_ids = {mode: uuid4().hex for mode in MODES}
+        payload = b"x" * size
+        for mailing_id in mailing_ids.values():
+            for start in range(0, count, 1000):
+                acks = [
+                    await js.publish_async(client.messages_subject(mailing_id), payload, stream=SETTINGS.stream_name)
+                    for _ in range(start, min(start + 1000, count))
+                ]
+                await asyncio.gather(*acks)
+        for mode, mailing_id in mailing_ids.items():
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.mailing_stream", "--read", mode, url, mailing_id, str(count)], check=True,
+            )
+    finally:
+        await js.delete_stream(SETTINGS.stream_name)
+        await nc.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--read":
+        asyncio.run(read(sys.argv[3], sys.argv[2], sys.argv[4], int(sys.argv[5])))
+    else:
+        asyncio.run(main(
+            sys.argv[1] if len(sys.argv) > 1 else "nats://localhost:4222",
+            int(sys.argv[2]) if len(sys.argv) > 2 else 50_000,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 1024,
+        ))
@@ -0,0 +1,68 @@
+"""
+Compares the memory taken by the recipients of a mailing as a `RecipientSet`, a signed 64-bit array, against a `list[User]`.
+
+The `list[User]` is the former recipient list of `Mailing`: full user dataclasses with names and datetimes.
+A `list[int]` of chat IDs is measured as well, as the smallest form a plain list can take.
+The memory is measured with tracemalloc while the collection is built from realistic Telegram users.
+The lists get their own objects, as they would when decoded from a payload, so they are counted as well.
+Run with `python -m benchmarks.recipients [count]` from the root of the repository.
+"""
+import random
+import sys
+import tracemalloc
+from collections.abc import Callable, Collection
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import Any
+
+from aiogram_nats.core.entities.recipients import RecipientSet
+from aiogram_nats.core.entities.user import User
+
+EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+def measure(build: Callable[[], Collection[Any]]) -> int:
+    tracemalloc.start()
+    try:
+        collection = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del collection
+    return size
+
+
+def build_users(chat_ids: list[int]) -> list[User]:
+    return [
+        User(
+            id=int(str(chat_id)),
+            first_name=f"User {i}",
+            joined_us=EPOCH + timedelta(seconds=chat_id % 100_000_000),
+            username=f"user_{chat_id}",
+            last_name=f"Surname {i}" if i % 2 else None,
+        )
+        for i, chat_id in enumerate(chat_ids)
+    ]
+
+
+def build_ids(chat_ids: list[int]) -> list[int]:
+    return [int(str(chat_id)) for chat_id in chat_ids]
+
+
+def main(count: int) -> None:
+    chat_ids = sorted(random.Random(42).sample(range(100_000_000, 7_000_000_000), count))
+    print(f"recipients: {count}")
+    baseline = 0
+    builds: list[tuple[str, Callable[[], Collection[Any]]]] = [
+        ("list[User]", partial(build_users, chat_ids)),
+        ("list[int]", partial(build_ids, chat_ids)),
+        ("RecipientSet", partial(RecipientSet, chat_ids)),
+    ]
+    for name, build in builds:
+        size = measure(build)
+        baseline = baseline or size
+        print(f"{name:>12}: {size / 1024 / 1024:8.2f} MB, {size / count:6.1f} bytes per recipient, {size / baseline:6.1%} of list[User]")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
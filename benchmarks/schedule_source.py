@@ -0,0 +1,74 @@
+"""
+Compares the cost of one scheduler poll of `RedisScheduleSource` and `TimeIndexedRedisScheduleSource` against the backlog size.
+
+Every backlog holds one-off schedules spread over the next week, of which 100 are due within the lookahead.
+Requires a running Redis, run with `python -m benchmarks.schedule_source [redis url]` from the root of the repository.
+The benchmark uses a separate key prefix and removes its schedules afterwards.
+"""
+import asyncio
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+
+from redis.asyncio import Redis
+from taskiq import ScheduledTask, ScheduleSource
+from taskiq_redis import RedisScheduleSource
+
+from aiogram_nats.infrastructure.scheduler.sources import TimeIndexedRedisScheduleSource
+
+PREFIX = "benchmark_source"
+BACKLOGS = (1_000, 10_000, 100_000)
+DUE = 100
+POLLS = 5
+
+
+def make_schedules(count: int) -> list[ScheduledTask]:
+    now = datetime.now(UTC)
+    week = timedelta(days=7).total_seconds()
+    return [
+        ScheduledTask(
+            task_name="benchmark",
+            labels={},
+            args=[],
+            kwargs={},
+            time=now + timedelta(seconds=i if i < DUE else 3600 + week * i / count),
+        )
+        for i in range(count)
+    ]
+
+
+async def measure_poll(source: ScheduleSource) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(POLLS):
+        schedules = await source.get_schedules()
+    return (time.perf_counter() - started) / POLLS, len(schedules)
+
+
+async def cleanup(redis: Redis) -> None:
+    keys = [key async for key in redis.scan_iter(f"{PREFIX}*", count=1000)]
+    for start in range(0, len(keys), 1000):
+        await redis.delete(*keys[start:start + 1000])
+
+
+async def main(url: str) -> None:
+    source = TimeIndexedRedisScheduleSource(url, prefix=PREFIX, buffer_size=1000)
+    scanning = RedisScheduleSource(url, prefix=PREFIX, buffer_size=1000)
+    async with Redis(connection_pool=source.connection_pool) as redis:
+        try:
+            for backlog in BACKLOGS:
+                await cleanup(redis)
+                await source.add_schedules(make_schedules(backlog))
+                scan_cost, scan_found = await measure_poll(scanning)
+                index_cost, index_found = await measure_poll(source)
+                print(
+                    f"backlog {backlog:>7}: scan {scan_cost * 1000:8.1f}ms ({scan_found} schedules), "
+                    f"index {index_cost * 1000:6.1f}ms ({index_found} schedules), {scan_cost / index_cost:.0f}x faster",
+                )
+        finally:
+            await cleanup(redis)
+    await source.shutdown()
+    await scanning.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "redis://localhost:6379/15"))
@@ -0,0 +1,58 @@
+"""
+Compares scheduling messages one by one with `SchedulerImpl.schedule` against `SchedulerImpl.schedule_many`.
+
+Requires a running Redis, run with `python -m benchmarks.scheduling [redis url] [count]` from the root of the repository.
+The benchmark uses a separate key prefix and removes its schedules afterwards.
+"""
+import asyncio
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+
+from redis.asyncio import Redis
+from taskiq import InMemoryBroker
+
+from aiogram_nats.core.entities.message import MessageDeletionScheduled
+from aiogram_nats.core.entities.user import User
+from aiogram_nats.infrastructure.scheduler.impl import SchedulerImpl
+from aiogram_nats.infrastructure.scheduler.sources import PipelinedRedisScheduleSource
+
+PREFIX = "benchmark_schedule"
+
+
+async def delete_message(message: MessageDeletionScheduled) -> None:
+    """Does nothing, only the scheduling is measured."""
+
+
+async def main(url: str, count: int) -> None:
+    source = PipelinedRedisScheduleSource(url, prefix=PREFIX)
+    scheduler = SchedulerImpl(InMemoryBroker(), source)
+    when = datetime.now(UTC) + timedelta(days=1)
+    user = User(id=1, first_name="Benchmark", joined_us=datetime.now(UTC))
+    messages = [MessageDeletionScheduled(user=user, scheduled_time=when, id=i) for i in range(count)]
+    try:
+        started = time.perf_counter()
+        for message in messages:
+            await scheduler.schedule(message, delete_message)
+        one_by_one = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await scheduler.schedule_many(messages, delete_message)
+        many = time.perf_counter() - started
+    finally:
+        async with Redis(connection_pool=source.connection_pool) as redis:
+            keys = [key async for key in redis.scan_iter(f"{PREFIX}:*")]
+            for start in range(0, len(keys), 1000):
+                await redis.delete(*keys[start:start + 1000])
+        await source.shutdown()
+
+    batches = -(-count // source.pipeline_size)
+    print(f"schedule      x{count}: {one_by_one:.3f}s, {count} round-trips")
+    print(f"schedule_many x{count}: {many:.3f}s, {batches} round-trips ({one_by_one / many:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        sys.argv[1] if len(sys.argv) > 1 else "redis://localhost:6379/15",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50_000,
+    ))
@@ -0,0 +1,34 @@
+"""
+Compares registering a task in the broker on every schedule against the cached registration of `SchedulerImpl`.
+
+Run with `python -m benchmarks.task_registration` from the root of the repository.
+"""
+import timeit
+
+from taskiq import InMemoryBroker
+
+from aiogram_nats.core.entities.message import MessageDeletionScheduled
+from aiogram_nats.infrastructure.scheduler.impl import SchedulerImpl
+from aiogram_nats.infrastructure.scheduler.sources import BufferScheduleSource
+
+CALLS = 100_000
+
+
+async def delete_message(message: MessageDeletionScheduled) -> None:
+    """Does nothing, only the registration is measured."""
+
+
+def main() -> None:
+    broker = InMemoryBroker()
+    scheduler = SchedulerImpl(broker, BufferScheduleSource())
+    cases = {
+        "register_task": lambda: broker.register_task(delete_message),
+        "cached registration": lambda: scheduler.get_registered_task(delete_message),
+    }
+    for title, register in cases.items():
+        seconds = timeit.timeit(register, number=CALLS)
+        print(f"{title:>20}: {seconds / CALLS * 1e6:.2f} us per schedule")
+
+
+if __name__ == "__main__":
+    main()
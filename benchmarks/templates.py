@@ -0,0 +1,45 @@
+"""
+Compares the per-recipient CPU cost of rendering a mailing request from a compiled template against building it naively.
+
+Run with `python -m benchmarks.templates` from the root of the repository.
+"""
+import json
+import timeit
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import SendMessage
+
+from aiogram_nats.core.entities.mailing import MailingMessage
+from aiogram_nats.infrastructure.delivery.template import NAME_PLACEHOLDER, CompiledTemplate
+
+RECIPIENTS = 100_000
+MESSAGE = MailingMessage(text="Hello, {name}! " + "Our weekly digest is here. " * 40, media_address="")
+NAME = "John Doe"
+SESSION = AiohttpSession()
+BOT = Bot("42:TOKEN", session=SESSION)
+
+
+def naive_aiogram(chat_id: int) -> object:
+    method = SendMessage(chat_id=chat_id, text=MESSAGE.text.replace(NAME_PLACEHOLDER, NAME))
+    return SESSION.build_form_data(BOT, method)
+
+
+def naive_json(chat_id: int) -> bytes:
+    return json.dumps({"chat_id": chat_id, "text": MESSAGE.text.replace(NAME_PLACEHOLDER, NAME)}, ensure_ascii=False).encode()
+
+
+def main() -> None:
+    template = CompiledTemplate.compile(MESSAGE)
+    cases = {
+        "aiogram method": naive_aiogram,
+        "json.dumps": naive_json,
+        "compiled template": lambda chat_id: template.render(chat_id, NAME),
+    }
+    for title, render in cases.items():
+        seconds = timeit.timeit("for chat_id in range(RECIPIENTS): render(chat_id)", globals={"render": render, "RECIPIENTS": RECIPIENTS}, number=1)
+        print(f"{title:>20}: {seconds / RECIPIENTS * 1e6:.2f} us per recipient")
+
+
+if __name__ == "__main__":
+    main()
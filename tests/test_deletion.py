@@ -0,0 +1,84 @@
+import asyncio
+import datetime
+from collections.abc import Sequence
+from typing import cast
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import DeleteMessages
+from aiogram_nats.core.entities.message import MessageDeletionScheduled
+from aiogram_nats.core.entities.user import User
+from aiogram_nats.core.interactors.messages.scheduled import ScheduleCoalescedMessageDeletion
+from aiogram_nats.core.interfaces.interfaces.scheduler import Scheduler, Task
+from aiogram_nats.infrastructure.delivery.deletion import CoalescingMessageRemover
+
+NOW = datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+
+
+class FakeBot:
+
+    """Records the deletions, or fails them with the given errors, one per call."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.deleted: list[tuple[int, list[int]]] = []
+
+    async def delete_messages(self, chat_id: int, message_ids: Sequence[int]) -> bool:
+        """Records the deletion or raises the next error."""
+        if self.errors:
+            raise self.errors.pop(0)
+        self.deleted.append((chat_id, list(message_ids)))
+        return True
+
+
+def deletion(chat_id: int, message_id: int, seconds: float) -> MessageDeletionScheduled:
+    """Returns the deletion of a message scheduled the given number of seconds after `NOW`."""
+    user = User(id=chat_id, first_name="user", joined_us=NOW)
+    return MessageDeletionScheduled(scheduled_time=NOW + datetime.timedelta(seconds=seconds), user=user, id=message_id)
+
+
+def test_deletions_are_coalesced_by_chat_and_bucket() -> None:
+    """Deletions of one chat within a bucket form batches of at most `batch_size` scheduled at their latest time."""
+    interactor = ScheduleCoalescedMessageDeletion(cast(Scheduler, None), cast(Task, None), datetime.timedelta(seconds=10), batch_size=2)
+    messages = [deletion(1, 1, 1), deletion(1, 2, 3), deletion(1, 3, 2), deletion(2, 4, 1), deletion(1, 5, 15)]
+    batches = interactor.coalesce(messages)
+    assert [(batch.user.id, batch.ids, batch.scheduled_time) for batch in batches] == [
+        (2, [4], NOW + datetime.timedelta(seconds=1)),
+        (1, [3], NOW + datetime.timedelta(seconds=2)),
+        (1, [1, 2], NOW + datetime.timedelta(seconds=3)),
+        (1, [5], NOW + datetime.timedelta(seconds=15)),
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_single_deletions_of_a_chat_are_deleted_together() -> None:
+    """Deletions which come within the linger are deleted by one call."""
+    bot = FakeBot()
+    remover = CoalescingMessageRemover(cast(Bot, bot), linger=0.01)
+    await asyncio.gather(remover.add(1, 10), remover.add(1, 11), remover.add(2, 20))
+    assert sorted(bot.deleted) == [(1, [10, 11]), (2, [20])]
+
+
+@pytest.mark.asyncio()
+async def test_unexpected_errors_are_raised_to_every_waiter() -> None:
+    """A batch which fails with a non-Telegram error does not report success."""
+    remover = CoalescingMessageRemover(cast(Bot, FakeBot(ConnectionError("down"))), linger=0.01)
+    results = await asyncio.gather(remover.add(1, 10), remover.add(1, 11), return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def throttled() -> TelegramRetryAfter:
+    """Returns a flood-wait of no time."""
+    return TelegramRetryAfter(DeleteMessages(chat_id=1, message_ids=[1]), "Too Many Requests", 0)
+
+
+@pytest.mark.asyncio()
+async def test_throttled_deletions_are_retried_after_the_flood_wait() -> None:
+    """A throttled call is repeated, one still throttled after `max_retries` retries is raised to the waiters."""
+    bot = FakeBot(throttled(), throttled())
+    await CoalescingMessageRemover(cast(Bot, bot), max_retries=2).delete(1, [10, 11])
+    assert bot.deleted == [(1, [10, 11])]
+    remover = CoalescingMessageRemover(cast(Bot, FakeBot(*(throttled() for _ in range(3)))), linger=0.01, max_retries=2)
+    with pytest.raises(TelegramRetryAfter):
+        await remover.add(1, 10)
@@ -0,0 +1,169 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Optional, cast
+
+import pytest
+from aiogram_nats.infrastructure.clients.mailing_service.delivery import DeliveryBatch
+from nats.aio.client import Client
+from nats.aio.msg import Msg
+
+
+class FakeMsg(Msg):
+
+    """Records the acknowledgements sent for a message."""
+
+    def __init__(self, num_delivered: int = 1) -> None:
+        super().__init__(cast(Client, None))
+        self.num_delivered = num_delivered
+        self.calls: list[tuple[str, Optional[float]]] = []
+
+    @property
+    def metadata(self) -> Msg.Metadata:
+        """Returns the delivery count of the message."""
+        return cast(Msg.Metadata, SimpleNamespace(num_delivered=self.num_delivered))
+
+    async def ack(self) -> None:
+        """Records an ack."""
+        self.calls.append(("ack", None))
+
+    async def nak(self, delay: Optional[float] = None) -> None:
+        """Records a nak."""
+        self.calls.append(("nak", delay))
+
+    async def term(self) -> None:
+        """Records a term."""
+        self.calls.append(("term", None))
+
+    async def in_progress(self) -> None:
+        """Records a heartbeat."""
+        self.calls.append(("in_progress", None))
+
+
+class FakeClient:
+
+    """Counts the flushes of the connection."""
+
+    def __init__(self) -> None:
+        self.flushes = 0
+
+    async def flush(self) -> None:
+        """Records a flush."""
+        self.flushes += 1
+
+
+def make_batch(messages: list[FakeMsg], **kwargs: Any) -> tuple[DeliveryBatch, FakeClient]:
+    """Creates a batch over fake messages without heartbeats."""
+    client = FakeClient()
+    kwargs.setdefault("heartbeat_interval", None)
+    return DeliveryBatch(cast(Client, client), messages, **kwargs), client
+
+
+@pytest.mark.asyncio()
+async def test_outcomes_are_flushed_in_batches() -> None:
+    """Outcomes are written once `flush_size` of them are recorded, with a single connection flush."""
+    msgs = [FakeMsg() for _ in range(3)]
+    batch, client = make_batch(msgs, flush_size=2)
+    await batch.ack(msgs[0])
+    assert msgs[0].calls == []
+    await batch.nak(msgs[1], 5.0)
+    assert msgs[0].calls == [("ack", None)]
+    assert msgs[1].calls == [("nak", 5.0)]
+    assert client.flushes == 1
+    assert batch.pending == 1
+
+
+@pytest.mark.asyncio()
+async def test_exit_naks_messages_without_outcome() -> None:
+    """Leaving the context flushes the recorded outcomes and redelivers the remaining messages."""
+    msgs = [FakeMsg(), FakeMsg()]
+    batch, client = make_batch(msgs)
+    async with batch:
+        await batch.term(msgs[0])
+    assert msgs[0].calls == [("term", None)]
+    assert msgs[1].calls == [("nak", None)]
+    assert batch.pending == 0
+    assert client.flushes == 1
+
+
+@pytest.mark.asyncio()
+async def test_heartbeat_touches_only_pending_messages() -> None:
+    """Heartbeats are sent for the messages without an outcome."""
+    msgs = [FakeMsg(), FakeMsg()]
+    batch, _ = make_batch(msgs)
+    await batch.ack(msgs[0])
+    await batch.heartbeat()
+    assert msgs[0].calls == []
+    assert msgs[1].calls == [("in_progress", None)]
+
+
+def test_redelivery_delay_backs_off_exponentially() -> None:
+    """The delay doubles per delivery, honours the flood-wait and is capped."""
+    batch, _ = make_batch([], base_redelivery_delay=1.0, max_redelivery_delay=10.0)
+    assert batch.redelivery_delay(FakeMsg(1)) == 1.0
+    assert batch.redelivery_delay(FakeMsg(3)) == 4.0
+    assert batch.redelivery_delay(FakeMsg(3), retry_after=7.0) == 7.0
+    assert batch.redelivery_delay(FakeMsg(10)) == 10.0
+
+
+@pytest.mark.asyncio()
+async def test_retry_terminates_exhausted_messages() -> None:
+    """A message delivered `max_deliveries` times is terminated and dead-lettered instead of redelivered."""
+    dead: list[tuple[FakeMsg, str]] = []
+
+    async def dead_letter(msg: FakeMsg, reason: str) -> None:
+        dead.append((msg, reason))
+
+    fresh, exhausted = FakeMsg(1), FakeMsg(3)
+    batch, _ = make_batch([fresh, exhausted], max_deliveries=3, dead_letter=dead_letter)
+    await batch.retry(fresh, reason="timeout")
+    await batch.retry(exhausted, reason="timeout")
+    await batch.flush()
+    assert fresh.calls == [("nak", 1.0)]
+    assert exhausted.calls == [("term", None)]
+    assert dead == [(exhausted, "Delivery attempts are exhausted: timeout")]
+
+
+@pytest.mark.asyncio()
+async def test_failed_dead_letter_keeps_the_term_and_the_other_outcomes_are_written() -> None:
+    """A failed dead-letter publish defers only that term, the other outcomes are written and the term is retried."""
+    failures = [ConnectionError("stream is unavailable")]
+
+    async def dead_letter(msg: FakeMsg, reason: str) -> None:
+        if failures:
+            raise failures.pop()
+
+    acked, terminated = FakeMsg(), FakeMsg()
+    batch, _ = make_batch([acked, terminated], dead_letter=dead_letter)
+    await batch.ack(acked)
+    await batch.term(terminated, "bad request")
+    await batch.flush()
+    assert acked.calls == [("ack", None)]
+    assert terminated.calls == []
+    await batch.flush()
+    assert acked.calls == [("ack", None)]
+    assert terminated.calls == [("term", None)]
+
+
+@pytest.mark.asyncio()
+async def test_outcomes_recorded_during_a_failing_flush_are_kept() -> None:
+    """Outcomes recorded while a failing dead-letter publish is pending are written by the next flush."""
+    publishing, failing = asyncio.Event(), asyncio.Event()
+
+    async def dead_letter(msg: Msg, reason: str) -> None:
+        publishing.set()
+        await failing.wait()
+        raise ConnectionError("stream is unavailable")
+
+    msgs = [FakeMsg() for _ in range(4)]
+    terminated, acked = msgs[0], msgs[1:]
+    batch, _ = make_batch(msgs, dead_letter=dead_letter)
+    await batch.term(terminated, "bad request")
+    flush = asyncio.create_task(batch.flush())
+    await publishing.wait()
+    for msg in acked:
+        await batch.ack(msg)
+    failing.set()
+    await flush
+    assert all(msg.calls == [] for msg in msgs)
+    await batch.flush()
+    assert all(msg.calls == [("ack", None)] for msg in acked)
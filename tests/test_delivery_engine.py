@@ -0,0 +1,133 @@
+import asyncio
+from collections.abc import AsyncGenerator, Collection
+from time import monotonic
+from typing import Optional
+from uuid import uuid4
+
+import pytest
+from aiogram_nats.common.settings.models.mailing_service import DeliverySettings
+from aiogram_nats.core.entities.audience import AllUsers, Audience, Partition
+from aiogram_nats.core.entities.mailing import Mailing, MailingMessage
+from aiogram_nats.infrastructure.delivery.engine import DeliveryEngine
+from aiogram_nats.infrastructure.delivery.rate_limit import ChatPacer, TokenBucket
+
+
+class FakeResolver:
+
+    """Resolves every audience into a fixed list of chat IDs."""
+
+    def __init__(self, chat_ids: list[int]) -> None:
+        self.chat_ids = chat_ids
+
+    async def iter_recipients(
+            self,
+            audience: Audience,
+            after: Optional[int] = None,
+            chunk_size: int = 1000,
+            partition: Optional[Partition] = None,
+    ) -> AsyncGenerator[list[int], None]:
+        """Yields the chat IDs in one chunk."""
+        yield [chat_id for chat_id in self.chat_ids if after is None or chat_id > after]
+
+
+class FailingSender:
+
+    """Records the sends and raises an unexpected error for the given chats."""
+
+    def __init__(self, failing: set[int]) -> None:
+        self.failing = failing
+        self.sent: list[int] = []
+
+    async def send(self, chat_id: int, message: MailingMessage, name: Optional[str] = None) -> None:
+        """Records the send or fails."""
+        if chat_id in self.failing:
+            raise RuntimeError("unexpected")
+        self.sent.append(chat_id)
+
+
+@pytest.mark.asyncio()
+async def test_token_bucket_limits_the_rate() -> None:
+    """Tokens beyond the burst are handed out at the bucket rate."""
+    bucket = TokenBucket(rate=100, capacity=2)
+    started = monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    assert 0.03 <= monotonic() - started < 0.2
+
+
+@pytest.mark.asyncio()
+async def test_token_bucket_pause_drains_the_tokens() -> None:
+    """A paused bucket hands out no tokens until the pause is over."""
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.05)
+    assert bucket.paused
+    assert await bucket.acquire() >= 0.04
+    assert not bucket.paused
+
+
+def test_token_bucket_rejects_non_positive_rate() -> None:
+    """The rate must be positive."""
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(0)
+
+
+@pytest.mark.asyncio()
+async def test_chat_pacer_spaces_sends_to_one_chat() -> None:
+    """Sends to one chat are spaced by the interval, sends to other chats are not delayed."""
+    pacer = ChatPacer(0.05)
+    assert await pacer.wait(1) == 0
+    assert await pacer.wait(2) == 0
+    assert await pacer.wait(1) > 0.03
+
+
+@pytest.mark.asyncio()
+async def test_engine_survives_unexpected_sender_errors() -> None:
+    """An unexpected error counts as a failed delivery and does not stop the other workers."""
+    chat_ids = list(range(1, 21))
+    sender = FailingSender({3, 7})
+    settings = DeliverySettings(global_rate=10_000, per_chat_interval=0, max_concurrency=2)
+    engine = DeliveryEngine(sender, FakeResolver(chat_ids), settings)
+    mailing = Mailing(uuid4(), AllUsers(), MailingMessage("Hello", ""))
+    await asyncio.wait_for(engine.start(mailing), timeout=5)
+    assert sorted(sender.sent) == [chat_id for chat_id in chat_ids if chat_id not in {3, 7}]
+    assert engine.stats.total.sent == 18
+    assert engine.stats.total.failed == 2
+
+
+class FakeNameGetter:
+
+    """Returns the names of the known users and counts the lookups."""
+
+    def __init__(self, names: dict[int, str]) -> None:
+        self.names = names
+        self.calls = 0
+
+    async def get_names(self, user_ids: Collection[int]) -> dict[int, str]:
+        """Returns the known names."""
+        self.calls += 1
+        return {user_id: self.names[user_id] for user_id in user_ids if user_id in self.names}
+
+
+class RecordingSender:
+
+    """Records the names every chat was sent with."""
+
+    def __init__(self) -> None:
+        self.sent: dict[int, Optional[str]] = {}
+
+    async def send(self, chat_id: int, message: MailingMessage, name: Optional[str] = None) -> None:
+        """Records the send."""
+        self.sent[chat_id] = name
+
+
+@pytest.mark.asyncio()
+async def test_engine_passes_recipient_names_to_the_sender() -> None:
+    """Names are read once per chunk for personalized messages and passed with every send."""
+    sender, names = RecordingSender(), FakeNameGetter({1: "Ann", 2: "Bob"})
+    settings = DeliverySettings(global_rate=10_000, per_chat_interval=0, max_concurrency=2)
+    engine = DeliveryEngine(sender, FakeResolver([1, 2, 3]), settings, name_getter=names)
+    await engine.start(Mailing(uuid4(), AllUsers(), MailingMessage("Hi {name}", "")))
+    assert sender.sent == {1: "Ann", 2: "Bob", 3: None}
+    assert names.calls == 1
+    await engine.start(Mailing(uuid4(), AllUsers(), MailingMessage("Hi", "")))
+    assert names.calls == 1
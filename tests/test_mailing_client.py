@@ -0,0 +1,79 @@
+import asyncio
+import json
+from typing import Any, Optional, cast
+
+import pytest
+from aiogram_nats.common.settings.models.mailing_service import MailingServiceSettings
+from aiogram_nats.infrastructure.clients.mailing_service.client import JOB_ID_HEADER, MailingServiceClient
+from aiogram_nats.infrastructure.clients.mailing_service.jobs import MailingJob, MailingJobState
+from nats.aio.client import Client
+from nats.js import JetStreamContext
+
+
+class FakeKV:
+
+    """Keeps the last value of every key."""
+
+    def __init__(self) -> None:
+        self.entries: dict[str, bytes] = {}
+
+    async def put(self, key: str, value: bytes) -> int:
+        """Stores the value."""
+        self.entries[key] = value
+        return len(self.entries)
+
+
+class FakeJetStream:
+
+    """Records the published messages and acknowledges them immediately."""
+
+    def __init__(self) -> None:
+        self.kv = FakeKV()
+        self.published: list[tuple[str, bytes, Optional[str], dict[str, str]]] = []
+
+    async def key_value(self, bucket: str) -> FakeKV:
+        """Returns the KV bucket."""
+        return self.kv
+
+    async def publish(self, subject: str, payload: bytes, stream: Optional[str] = None, headers: Optional[dict[str, str]] = None) -> None:
+        """Records the message."""
+        self.published.append((subject, payload, stream, headers or {}))
+
+    async def publish_async(
+            self, subject: str, payload: bytes, stream: Optional[str] = None, headers: Optional[dict[str, str]] = None,
+    ) -> asyncio.Future[Any]:
+        """Records the message and returns a resolved publish ack."""
+        await self.publish(subject, payload, stream, headers)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+
+class FakeNats:
+
+    """Provides the maximum payload of the server."""
+
+    max_payload = 1024 * 1024
+
+
+@pytest.mark.asyncio()
+async def test_submit_mailing_publishes_frames_and_a_job_referencing_them() -> None:
+    """The payloads are framed into the submission stream and the job in the jobs stream carries only the frame count."""
+    settings = MailingServiceSettings(max_frame_size=64)
+    js = FakeJetStream()
+    client = MailingServiceClient(cast(Client, FakeNats()), settings, cast(JetStreamContext, js))
+    payloads = [{"id": index, "text": "x" * 20} for index in range(10)]
+
+    job_id = await client.submit_mailing(payloads)
+
+    *frames, (job_subject, job_payload, job_stream, job_headers) = js.published
+    assert len(frames) > 1
+    assert all(stream == settings.submission_stream_name and len(payload) <= 64 for _, payload, stream, _ in frames)
+    assert [item for _, payload, _, _ in frames for item in json.loads(payload)] == payloads
+    assert job_stream == settings.jobs_stream_name
+    assert job_subject.endswith(f".{settings.jobs_subject}")
+    assert job_headers[JOB_ID_HEADER] == job_id
+    assert json.loads(job_payload) == {"submission_id": job_id, "frames": len(frames)}
+    job = MailingJob.from_bytes(job_id, js.kv.entries[job_id])
+    assert job.state == MailingJobState.QUEUED
+    assert job.total == 10
@@ -0,0 +1,133 @@
+import asyncio
+import datetime
+from collections.abc import AsyncGenerator
+from typing import Optional, Union, cast
+
+import pytest
+from aiogram import Bot
+from aiogram.types import Chat, Document, InputFile, Message
+from aiogram_nats.core.exceptions.delivery import DeliveryError, TransientDeliveryError
+from aiogram_nats.infrastructure.database.object_store.media import ObjectStoreMediaStorage
+from aiogram_nats.infrastructure.delivery.media import MediaResolver, ObjectStoreInputFile
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.errors import DigestMismatchError
+
+
+class FailingStorage:
+
+    """Yields one chunk of a media and raises the given error."""
+
+    chunk_size = 4
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    @staticmethod
+    def object_name(media_address: str) -> str:
+        """Returns the object name."""
+        return media_address
+
+    async def iter_chunks(self, media_address: str) -> AsyncGenerator[bytes, None]:
+        """Yields a chunk and fails."""
+        yield b"data"
+        raise self.error
+
+
+class FakeCache:
+
+    """Keeps no file IDs."""
+
+    async def get(self, media_address: str) -> Optional[str]:
+        """Returns no file ID."""
+        return None
+
+    async def set(self, media_address: str, file_id: str) -> None:
+        """Forgets the file ID."""
+
+
+def sent(file_id: str) -> Message:
+    """Returns a sent message with the document of the given file ID."""
+    return Message(
+        message_id=1,
+        date=datetime.datetime.now(datetime.UTC),
+        chat=Chat(id=1, type="private"),
+        document=Document(file_id=file_id, file_unique_id=file_id),
+    )
+
+
+async def read_all(file: ObjectStoreInputFile) -> list[bytes]:
+    """Reads every chunk of the file."""
+    return [chunk async for chunk in file.read(cast(Bot, None))]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (NatsTimeoutError(), TransientDeliveryError),
+        (DigestMismatchError(), DeliveryError),
+    ],
+)
+async def test_object_store_errors_are_delivery_errors(error: Exception, expected: type[DeliveryError]) -> None:
+    """Timeouts are transient, corrupted media fail the delivery."""
+    file = ObjectStoreInputFile(cast(ObjectStoreMediaStorage, FailingStorage(error)), "nats-object://media")
+    with pytest.raises(expected) as info:
+        await read_all(file)
+    assert type(info.value) is expected
+
+
+@pytest.mark.asyncio()
+async def test_upload_lock_is_released_when_the_upload_fails() -> None:
+    """A failed upload does not leave its lock behind."""
+    resolver = MediaResolver(FakeCache())
+
+    async def upload(document: Union[InputFile, str]) -> Message:
+        raise TransientDeliveryError("network")
+
+    with pytest.raises(TransientDeliveryError):
+        await resolver.send("https://example.com/media.png", upload)
+    assert resolver._locks == {}  # noqa: SLF001
+
+
+@pytest.mark.asyncio()
+async def test_a_failed_upload_is_retried_by_one_waiter_at_a_time() -> None:
+    """Waiters of a failed upload and later senders share one lock, so a media is never uploaded twice at once."""
+    resolver = MediaResolver(FakeCache())
+    failed = asyncio.Event()
+    uploads: list[Union[InputFile, str]] = []
+    active, overlapping = 0, 0
+
+    async def upload(document: Union[InputFile, str]) -> Message:
+        nonlocal active, overlapping
+        uploads.append(document)
+        if isinstance(document, str):
+            return sent(document)
+        active += 1
+        overlapping = max(overlapping, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if not failed.is_set():
+            failed.set()
+            raise TransientDeliveryError("network")
+        return sent("file-id")
+
+    async def send_after_failure() -> Message:
+        await failed.wait()
+        return await resolver.send("https://example.com/media.png", upload)
+
+    results = await asyncio.gather(
+        *(resolver.send("https://example.com/media.png", upload) for _ in range(3)),
+        send_after_failure(),
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], TransientDeliveryError)
+    assert overlapping == 1
+    assert sum(isinstance(document, InputFile) for document in uploads) == 2
+    assert uploads.count("file-id") == 2
+    assert resolver._locks == {}  # noqa: SLF001
+
+
+def test_stored_media_requires_a_storage() -> None:
+    """Object Store media cannot be uploaded without a storage."""
+    with pytest.raises(DeliveryError, match="no storage"):
+        MediaResolver(FakeCache()).input_file("nats-object://media")
@@ -0,0 +1,76 @@
+import asyncio
+import datetime
+
+import pytest
+from aiogram_nats.core.entities.scheduled import ScheduledEntity
+from aiogram_nats.infrastructure.scheduler.impl import SchedulerImpl
+from aiogram_nats.infrastructure.scheduler.metrics import (
+    QUEUE_DEPTH,
+    SCHEDULE_LAG,
+    TASK_TYPE_LABEL,
+    TASKS_IN_FLIGHT,
+    InMemoryMetricsSink,
+    SchedulerMetricsMiddleware,
+)
+from aiogram_nats.infrastructure.scheduler.wheel import TimingWheelScheduler
+from taskiq import InMemoryBroker, TaskiqMessage, TaskiqResult
+
+from .test_scheduler import MemoryScheduleSource
+
+
+async def greet(entity: ScheduledEntity) -> None:
+    """Does nothing."""
+
+
+async def remind(entity: ScheduledEntity) -> None:
+    """Does nothing."""
+
+
+def in_seconds(seconds: float) -> ScheduledEntity:
+    """Returns an entity scheduled the given number of seconds from now."""
+    return ScheduledEntity(datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=seconds))
+
+
+def test_task_type_is_registered_per_task() -> None:
+    """The type of one task does not label the others, and cannot be set for the whole scheduler."""
+    scheduler = SchedulerImpl(InMemoryBroker(), MemoryScheduleSource())
+    scheduler.get_registered_task(greet, task_type="greeting")
+    assert scheduler.get_task_type(greet) == "greeting"
+    assert scheduler.get_task_type(remind) == scheduler.get_registered_task(remind).task_name
+    with pytest.raises(ValueError, match=TASK_TYPE_LABEL):
+        scheduler.add_labels({TASK_TYPE_LABEL: "greeting"})
+
+
+@pytest.mark.asyncio()
+async def test_wheel_and_worker_label_a_task_alike() -> None:
+    """A task executed by the wheel and by a worker is recorded under one task type."""
+    sink = InMemoryMetricsSink()
+    source = MemoryScheduleSource()
+    scheduler = SchedulerImpl(InMemoryBroker(), source)
+    scheduler.get_registered_task(greet, task_type="greeting")
+    wheel = TimingWheelScheduler(scheduler, horizon=10, tick=0.01, metrics=sink)
+    await wheel.schedule(in_seconds(0.02), greet)
+    schedule_id = await wheel.schedule(in_seconds(60), greet)
+    await asyncio.sleep(0.1)
+    await wheel.stop()
+
+    schedule = source.schedules[schedule_id]
+    middleware = SchedulerMetricsMiddleware(sink)
+    message = TaskiqMessage(task_id="1", task_name=schedule.task_name, labels=schedule.labels, args=[], kwargs={})
+    middleware.pre_execute(message)
+
+    assert sink.get_histogram(SCHEDULE_LAG, task="greeting", path="wheel") is not None
+    assert sink.get_histogram(SCHEDULE_LAG, task="greeting", path="worker") is not None
+
+
+def test_worker_reports_tasks_in_flight() -> None:
+    """The worker reports the tasks it is executing as in flight, not as a queue depth."""
+    sink = InMemoryMetricsSink()
+    middleware = SchedulerMetricsMiddleware(sink)
+    messages = [TaskiqMessage(task_id=str(i), task_name="task", labels={}, args=[], kwargs={}) for i in range(2)]
+    for message in messages:
+        middleware.pre_execute(message)
+    assert sink.gauges[(TASKS_IN_FLIGHT, frozenset({("path", "worker")}))] == 2
+    middleware.post_execute(messages[0], TaskiqResult(is_err=False, return_value=None, execution_time=0.1))
+    assert sink.gauges[(TASKS_IN_FLIGHT, frozenset({("path", "worker")}))] == 1
+    assert not any(name == QUEUE_DEPTH for name, _ in sink.gauges)
@@ -0,0 +1,74 @@
+import datetime
+import os
+from time import time
+from uuid import uuid4
+
+import pytest
+from aiogram_nats.infrastructure.scheduler.nats_source import BUCKET_SECONDS, NatsKVScheduleSource
+from aiogram_nats.infrastructure.scheduler.sources import SCHEDULE_KEYS_LABEL
+from nats.js.api import KeyValueConfig
+from taskiq import ScheduledTask
+from taskiq.compat import model_dump
+
+NATS_URL = os.environ.get("NATS_URL")
+
+requires_nats = pytest.mark.skipif(NATS_URL is None, reason="NATS_URL of a local nats-server with JetStream is not set")
+
+
+def one_off(schedule_id: str, seconds: float, key: str = "chat:1") -> ScheduledTask:
+    """Returns a one-off schedule due the given number of seconds from now."""
+    return ScheduledTask(
+        task_name="task",
+        labels={SCHEDULE_KEYS_LABEL: key},
+        args=[],
+        kwargs={},
+        schedule_id=schedule_id,
+        time=datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=seconds),
+    )
+
+
+def test_new_keys_are_never_behind_the_cursor() -> None:
+    """Past schedules go to the current minute, and to the cursor when the clock was stepped back behind it."""
+    source = NatsKVScheduleSource([], KeyValueConfig("schedules"))
+    current = int(time()) // BUCKET_SECONDS
+    assert source._key(one_off("past", -3600)) == f"at.{current}.past"  # noqa: SLF001
+    source._cursor = current + 5  # noqa: SLF001
+    assert source._key(one_off("past", -3600)) == f"at.{current + 5}.past"  # noqa: SLF001
+
+
+@requires_nats
+@pytest.mark.asyncio()
+async def test_schedules_are_read_by_bucket_and_purged_after_send() -> None:
+    """Due schedules are read from their buckets, late writes of a skewed clock are still read, executed ones are purged."""
+    bucket = f"test_schedules_{uuid4().hex}"
+    source = NatsKVScheduleSource([str(NATS_URL)], KeyValueConfig(bucket), lookahead=60, max_clock_skew=60)
+    await source.startup()
+    try:
+        due, soon, later = one_off("due", -3600), one_off("soon", 30), one_off("later", 3600, key="chat:2")
+        cron = ScheduledTask(task_name="task", labels={}, args=[], kwargs={}, schedule_id="cron", cron="* * * * *")
+        for schedule in (due, soon, later, cron):
+            await source.add_schedule(schedule)
+
+        before = int(time()) // BUCKET_SECONDS
+        assert {schedule.schedule_id for schedule in await source.get_schedules()} == {"due", "soon", "cron"}
+        cursor = source._cursor  # noqa: SLF001
+        assert cursor is not None
+        assert before <= cursor <= int(time()) // BUCKET_SECONDS
+        assert sorted(await source.get_schedule_ids("chat:1")) == ["due", "soon"]
+        assert await source.get_schedule_ids("chat:2") == ["later"]
+
+        await source.post_send(due)
+        await source.post_send(cron)
+        assert await source.get_schedule("due") is None
+        assert await source.get_schedule("cron") is not None
+        assert sorted(await source.get_schedule_ids("chat:1")) == ["soon"]
+
+        # A process whose clock is one minute behind writes into the bucket before the cursor.
+        skewed = one_off("skewed", -120)
+        kv = await source._get_kv()  # noqa: SLF001
+        await kv.put(f"at.{cursor - 1}.skewed", source.serializer.dumpb(model_dump(skewed)))
+        assert {schedule.schedule_id for schedule in await source.get_schedules()} == {"soon", "skewed", "cron"}
+    finally:
+        if source._nc is not None:  # noqa: SLF001
+            await source._nc.jetstream().delete_key_value(bucket)  # noqa: SLF001
+        await source.shutdown()
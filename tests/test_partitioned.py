@@ -0,0 +1,128 @@
+import asyncio
+import dataclasses
+from collections.abc import Iterable
+from typing import Any, Optional, cast
+from uuid import UUID, uuid4
+
+import pytest
+from aiogram_nats.common.settings.models.mailing_service import DeliverySettings
+from aiogram_nats.core.entities.audience import AllUsers, Partition
+from aiogram_nats.core.entities.mailing import Mailing, MailingMessage
+from aiogram_nats.core.entities.progress import MailingProgress, MailingState, PartitionReport
+from aiogram_nats.core.interfaces.interfaces.audience import AudienceResolver
+from aiogram_nats.core.interfaces.interfaces.progress import MailingProgressStore
+from aiogram_nats.core.interfaces.interfaces.sender import MessageSender
+from aiogram_nats.infrastructure.delivery.engine import DeliveryEngine, _Cursor
+from aiogram_nats.infrastructure.delivery.partitioned import PartitionedMailingStarter
+from taskiq import AsyncBroker
+from taskiq.kicker import AsyncKicker
+
+
+class FakeProgressStore:
+
+    """Keeps the state and the partition reports of one mailing in memory."""
+
+    def __init__(self, reports: list[PartitionReport], *, alive: bool = False) -> None:
+        self.state = MailingState.RUNNING
+        self.reports = reports
+        self.alive = alive
+        self.cursors: list[Optional[int]] = []
+
+    async def get(self, mailing_id: UUID, partition: Optional[Partition] = None) -> Optional[MailingProgress]:
+        """Returns the progress of the mailing."""
+        return MailingProgress(mailing_id, state=self.state)
+
+    async def get_reports(self, mailing_id: UUID) -> list[PartitionReport]:
+        """Returns copies of the partition reports, the unfinished ones report a checkpoint each time if the partitions are alive."""
+        if self.alive:
+            for report in self.reports:
+                report.heartbeat += not report.finished
+        return [dataclasses.replace(report) for report in self.reports]
+
+    async def save_report(self, mailing_id: UUID, report: PartitionReport) -> None:
+        """Stores a copy of the partition report."""
+        self.reports = [stored for stored in self.reports if stored.partition != report.partition] + [dataclasses.replace(report)]
+
+    async def save_cursor(self, mailing_id: UUID, cursor: Optional[int], completed: Iterable[int] = (), partition: Optional[Partition] = None) -> None:
+        """Records the saved cursor."""
+        self.cursors.append(cursor)
+
+    async def set_state(self, mailing_id: UUID, state: MailingState) -> None:
+        """Sets the state of the mailing."""
+        self.state = state
+
+
+class FakeKicker:
+
+    """Records the kicked partitions."""
+
+    def __init__(self) -> None:
+        self.kicked: list[int] = []
+
+    async def kiq(self, payload: dict[str, Any], partition_index: int, partition_count: int) -> None:
+        """Records the partition."""
+        self.kicked.append(partition_index)
+
+
+def test_partitions_cover_negative_chat_ids() -> None:
+    """Every chat ID, negative ones included, belongs to exactly one partition."""
+    partitions = Partition.split(3)
+    for chat_id in (-1001234567890, -7, -1, 0, 1, 5, 1234567890):
+        assert sum(chat_id in partition for partition in partitions) == 1
+
+
+@pytest.mark.asyncio()
+async def test_stalled_partitions_are_kicked_again_until_the_deadline() -> None:
+    """A partition without progress is started again, an unfinished mailing is paused once the coordination times out."""
+    store = FakeProgressStore([PartitionReport(Partition(0, 2), sent=10, finished=True)])
+    settings = DeliverySettings(checkpoint_interval=0.01, partition_stall_timeout=0.05, coordination_timeout=0.3)
+    starter = PartitionedMailingStarter(cast(AsyncBroker, None), cast(MailingProgressStore, store), settings)
+    kicker = FakeKicker()
+    mailing = Mailing(uuid4(), AllUsers(), MailingMessage("Hello", ""))
+    await starter._coordinate(mailing, 2, cast(AsyncKicker[Any, Any], kicker), {})  # noqa: SLF001
+    assert kicker.kicked
+    assert set(kicker.kicked) == {1}
+    assert store.state == MailingState.PAUSED
+
+
+@pytest.mark.asyncio()
+async def test_mailing_is_completed_once_every_partition_is_finished() -> None:
+    """The coordinator completes the mailing without kicking finished partitions."""
+    store = FakeProgressStore([PartitionReport(Partition(index, 2), finished=True) for index in range(2)])
+    starter = PartitionedMailingStarter(cast(AsyncBroker, None), cast(MailingProgressStore, store), DeliverySettings(checkpoint_interval=0.01))
+    kicker = FakeKicker()
+    mailing = Mailing(uuid4(), AllUsers(), MailingMessage("Hello", ""))
+    await starter._coordinate(mailing, 2, cast(AsyncKicker[Any, Any], kicker), {})  # noqa: SLF001
+    assert kicker.kicked == []
+    assert store.state == MailingState.COMPLETED
+
+
+@pytest.mark.asyncio()
+async def test_slow_partitions_which_keep_reporting_are_not_kicked_again() -> None:
+    """A partition sending nothing, for example during a flood-wait, is not started again while its task saves checkpoints."""
+    store = FakeProgressStore([PartitionReport(Partition(0, 2), finished=True), PartitionReport(Partition(1, 2))], alive=True)
+    settings = DeliverySettings(checkpoint_interval=0.01, partition_stall_timeout=0.05, coordination_timeout=0.3)
+    starter = PartitionedMailingStarter(cast(AsyncBroker, None), cast(MailingProgressStore, store), settings)
+    kicker = FakeKicker()
+    mailing = Mailing(uuid4(), AllUsers(), MailingMessage("Hello", ""))
+    await starter._coordinate(mailing, 2, cast(AsyncKicker[Any, Any], kicker), {})  # noqa: SLF001
+    assert kicker.kicked == []
+
+
+@pytest.mark.asyncio()
+async def test_partition_task_stops_once_taken_over() -> None:
+    """A task whose partition was taken over by a new task stops at its next checkpoint without saving its progress."""
+    store = FakeProgressStore([])
+    settings = DeliverySettings(checkpoint_interval=0.01)
+    engine = DeliveryEngine(cast(MessageSender, None), cast(AudienceResolver, None), settings, cast(MailingProgressStore, store))
+    mailing = Mailing(uuid4(), AllUsers(), MailingMessage("Hello", ""))
+    old = await engine._load_report(mailing, Partition(0, 1))  # noqa: SLF001
+    new = await engine._load_report(mailing, Partition(0, 1))  # noqa: SLF001
+    assert old is not None
+    assert new is not None
+    assert old.owner != new.owner
+    stopped = asyncio.Event()
+    await asyncio.wait_for(engine._checkpoint_loop(mailing, _Cursor(None), old, stopped), 1)  # noqa: SLF001
+    assert stopped.is_set()
+    assert store.cursors == []
+    assert [report.owner for report in store.reports] == [new.owner]
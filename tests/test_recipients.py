@@ -0,0 +1,46 @@
+import pytest
+from aiogram_nats.core.entities.recipients import RecipientSet
+
+
+def test_ids_are_sorted_and_deduplicated() -> None:
+    """Unsorted input with duplicates is normalized."""
+    recipients = RecipientSet([5, -3, 5, 1])
+    assert list(recipients) == [-3, 1, 5]
+    assert len(recipients) == 3
+    assert recipients[0] == -3
+
+
+def test_membership() -> None:
+    """Membership is checked by binary search and rejects non-integers."""
+    recipients = RecipientSet([10, 20, 30])
+    assert 20 in recipients
+    assert 25 not in recipients
+    assert 40 not in recipients
+    assert "20" not in recipients
+
+
+def test_bytes_round_trip() -> None:
+    """The binary representation restores an equal set of 8 bytes per ID."""
+    recipients = RecipientSet([-100123, 1, 7_000_000_000])
+    data = recipients.to_bytes()
+    assert len(data) == 24
+    assert RecipientSet.from_bytes(data) == recipients
+    assert hash(RecipientSet.from_bytes(data)) == hash(recipients)
+
+
+def test_chunks_resume_after_an_id() -> None:
+    """Chunks are sorted, bounded in size and start after the given ID."""
+    recipients = RecipientSet(range(10))
+    assert [list(chunk) for chunk in recipients.chunks(4)] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert [list(chunk) for chunk in recipients.chunks(4, after=5)] == [[6, 7, 8, 9]]
+    with pytest.raises(ValueError, match="size"):
+        list(recipients.chunks(0))
+
+
+def test_set_operations() -> None:
+    """Union, intersection and difference merge the sorted IDs."""
+    left, right = RecipientSet([1, 2, 3, 5]), RecipientSet([2, 4, 5, 6])
+    assert list(left | right) == [1, 2, 3, 4, 5, 6]
+    assert list(left & right) == [2, 5]
+    assert list(left - right) == [1, 3]
+    assert list(right - left) == [4, 6]
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Optional, cast
+
+import pytest
+from aiogram_nats.common.settings.models.mailing_service import DeliverySettings
+from aiogram_nats.core.entities.mailing import MailingMessage
+from aiogram_nats.core.exceptions.delivery import RetryAfterError
+from aiogram_nats.core.interfaces.interfaces.audience import AudienceResolver
+from aiogram_nats.infrastructure.delivery.engine import DeliveryEngine
+from aiogram_nats.infrastructure.delivery.rate_limit import FloodWaitDetector
+from aiogram_nats.infrastructure.delivery.retry import RetryQueue, retry_delay
+
+
+class ThrottledSender:
+
+    """Reports a flood-wait for every send."""
+
+    async def send(self, chat_id: int, message: MailingMessage, name: Optional[str] = None) -> None:
+        """Raises a flood-wait."""
+        raise RetryAfterError(30)
+
+
+@pytest.mark.asyncio()
+async def test_retry_queue_returns_items_by_due_time() -> None:
+    """Items are returned in the order of their due time, not of their push."""
+    queue: RetryQueue[str] = RetryQueue()
+    queue.push("late", 0.05)
+    queue.push("early", 0.01)
+    assert len(queue) == 2
+    assert await asyncio.wait_for(queue.get(), 1) == "early"
+    assert await asyncio.wait_for(queue.get(), 1) == "late"
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio()
+async def test_retry_queue_wakes_up_for_an_earlier_item() -> None:
+    """A waiting getter is woken up by an item due earlier than the current head."""
+    queue: RetryQueue[str] = RetryQueue()
+    queue.push("late", 10)
+    getter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+    queue.push("now", 0)
+    assert await asyncio.wait_for(getter, 1) == "now"
+
+
+@pytest.mark.asyncio()
+async def test_retry_queue_drained() -> None:
+    """`drained` returns once the last item is taken."""
+    queue: RetryQueue[int] = RetryQueue()
+    queue.push(1, 0)
+    drained = asyncio.create_task(queue.drained())
+    await asyncio.sleep(0)
+    assert not drained.done()
+    await queue.get()
+    await asyncio.wait_for(drained, 1)
+
+
+def test_retry_delay_backs_off_and_honours_flood_waits() -> None:
+    """The backoff doubles up to the maximum, a longer flood-wait is always honoured."""
+    assert [retry_delay(attempt, 1, 5) for attempt in range(1, 5)] == [1, 2, 4, 5]
+    assert retry_delay(1, 1, 5, retry_after=60) == 60
+
+
+def test_flood_wait_detector_counts_different_chats() -> None:
+    """Flood-waits of one chat are never global, flood-waits of enough chats within the window are."""
+    detector = FloodWaitDetector(window=10, threshold=3)
+    assert not any(detector.record(1) for _ in range(5))
+    assert not detector.record(2)
+    assert detector.record(3)
+
+
+@pytest.mark.asyncio()
+async def test_single_chat_flood_wait_does_not_pause_the_engine() -> None:
+    """A flood-wait of one chat delays only that chat, flood-waits of several chats pause the whole engine."""
+    settings = DeliverySettings(per_chat_interval=0, global_flood_window=10, global_flood_threshold=2)
+    engine = DeliveryEngine(ThrottledSender(), cast(AudienceResolver, None), settings)
+    message = MailingMessage("Hello", "")
+    assert not await engine.deliver(1, message, attempt=settings.max_attempts)
+    assert not engine._bucket.paused  # noqa: SLF001
+    assert not await engine.deliver(2, message, attempt=settings.max_attempts)
+    assert engine._bucket.paused  # noqa: SLF001
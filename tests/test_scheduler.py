@@ -0,0 +1,143 @@
+import datetime
+from typing import Optional
+
+import pytest
+from aiogram_nats.core.entities.scheduled import ScheduledEntity
+from aiogram_nats.infrastructure.scheduler.impl import SchedulerImpl
+from aiogram_nats.infrastructure.scheduler.sources import ensure_pending, get_schedule_keys
+from taskiq import InMemoryBroker, ScheduledTask, ScheduleSource, TaskiqScheduler
+from taskiq.compat import model_dump, model_validate
+
+
+class MemoryScheduleSource(ScheduleSource):
+
+    """Keeps the schedules in memory and records the sent and replaced ones."""
+
+    def __init__(self) -> None:
+        self.schedules: dict[str, ScheduledTask] = {}
+        self.replaced: list[str] = []
+        self.sent: list[str] = []
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        """Returns copies of the schedules, as read from a store."""
+        return [model_validate(ScheduledTask, model_dump(schedule)) for schedule in self.schedules.values()]
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        """Stores the schedule."""
+        self.schedules[schedule.schedule_id] = schedule
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        """Removes the schedule."""
+        self.schedules.pop(schedule_id, None)
+
+    async def replace_schedule(self, schedule: ScheduledTask) -> None:
+        """Replaces the schedule."""
+        self.replaced.append(schedule.schedule_id)
+        self.schedules[schedule.schedule_id] = schedule
+
+    async def get_schedule(self, schedule_id: str) -> Optional[ScheduledTask]:
+        """Returns the schedule."""
+        return self.schedules.get(schedule_id)
+
+    async def get_schedule_ids(self, key: str) -> list[str]:
+        """Returns the IDs of the schedules indexed by the key."""
+        return [schedule_id for schedule_id, schedule in self.schedules.items() if key in get_schedule_keys(schedule)]
+
+    async def pre_send(self, task: ScheduledTask) -> None:
+        """Drops the schedules which are no longer pending."""
+        await ensure_pending(self, task)
+
+    async def post_send(self, task: ScheduledTask) -> None:
+        """Records the sent schedule."""
+        self.sent.append(task.schedule_id)
+
+
+async def noop(entity: ScheduledEntity) -> None:
+    """Does nothing."""
+
+
+def in_seconds(seconds: float) -> datetime.datetime:
+    """Returns the time the given number of seconds from now."""
+    return datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=seconds)
+
+
+@pytest.mark.asyncio()
+async def test_reschedule_replaces_the_schedule_in_one_step() -> None:
+    """The moved schedule keeps its ID and is written by a single replace."""
+    source = MemoryScheduleSource()
+    scheduler = SchedulerImpl(InMemoryBroker(), source)
+    schedule_id = await scheduler.schedule(ScheduledEntity(in_seconds(30)), noop)
+    moved_time = in_seconds(3600)
+    assert await scheduler.reschedule(schedule_id, moved_time) == schedule_id
+    assert source.replaced == [schedule_id]
+    assert source.schedules[schedule_id].time == moved_time
+    assert await scheduler.reschedule("missing", moved_time) is None
+
+
+@pytest.mark.asyncio()
+async def test_schedules_changed_within_the_lookahead_are_not_sent() -> None:
+    """Schedules cancelled or moved after the scheduler read them are dropped, pending ones are sent."""
+    broker = InMemoryBroker()
+    source = MemoryScheduleSource()
+    scheduler = SchedulerImpl(broker, source)
+    kept, cancelled, moved = [await scheduler.schedule(ScheduledEntity(in_seconds(30)), noop) for _ in range(3)]
+    read = await source.get_schedules()
+
+    assert await scheduler.cancel(cancelled)
+    await scheduler.reschedule(moved, in_seconds(3600))
+    taskiq_scheduler = TaskiqScheduler(broker, [source])
+    for task in read:
+        await taskiq_scheduler.on_ready(source, task)
+
+    assert source.sent == [kept]
+
+
+class Greeter:
+
+    """Provides a task bound to an instance."""
+
+    async def greet(self, entity: ScheduledEntity) -> None:
+        """Does nothing."""
+
+
+def test_tasks_without_a_unique_name_need_an_explicit_one() -> None:
+    """Lambdas and a second bound method of the same class are rejected instead of overwriting another task."""
+    scheduler = SchedulerImpl(InMemoryBroker(), MemoryScheduleSource())
+    with pytest.raises(ValueError, match="no unique name"):
+        scheduler.get_registered_task(lambda entity: noop(entity))
+    first, second = Greeter(), Greeter()
+    assert scheduler.get_registered_task(first.greet) is scheduler.get_registered_task(first.greet)
+    with pytest.raises(ValueError, match="already registered"):
+        scheduler.get_registered_task(second.greet)
+    assert scheduler.get_registered_task(second.greet, name="second-greeter").task_name == "second-greeter"
+
+
+class UnindexedScheduleSource(ScheduleSource):
+
+    """Keeps the schedules in memory without looking them up by their ID."""
+
+    def __init__(self) -> None:
+        self.schedules: dict[str, ScheduledTask] = {}
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        """Returns the schedules."""
+        return list(self.schedules.values())
+
+    async def add_schedule(self, schedule: ScheduledTask) -> None:
+        """Stores the schedule."""
+        self.schedules[schedule.schedule_id] = schedule
+
+    async def delete_schedule(self, schedule_id: str) -> None:
+        """Removes the schedule."""
+        self.schedules.pop(schedule_id, None)
+
+
+@pytest.mark.asyncio()
+async def test_cancel_is_not_reported_when_the_source_cannot_tell() -> None:
+    """A source which does not index the schedules has them deleted, but the cancel is not reported as done."""
+    source = UnindexedScheduleSource()
+    scheduler = SchedulerImpl(InMemoryBroker(), source)
+    schedule_id = await scheduler.schedule(ScheduledEntity(in_seconds(30)), noop)
+    assert not await scheduler.cancel(schedule_id)
+    assert source.schedules == {}
+    assert not await scheduler.cancel("missing")
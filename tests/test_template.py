@@ -0,0 +1,34 @@
+import json
+
+from aiogram_nats.core.entities.mailing import MailingMessage
+from aiogram_nats.infrastructure.delivery.template import CompiledTemplate
+
+
+def test_text_message_without_placeholders() -> None:
+    """A message without placeholders renders the same body for every name."""
+    template = CompiledTemplate.compile(MailingMessage("Hello", ""))
+    assert template.method == "sendMessage"
+    assert not template.personalized
+    assert json.loads(template.render(42, "Ann")) == {"chat_id": 42, "text": "Hello"}
+
+
+def test_name_is_escaped_into_every_placeholder() -> None:
+    """Every placeholder is replaced with the JSON-escaped name."""
+    template = CompiledTemplate.compile(MailingMessage('Hi {name}, "{name}"!', ""))
+    assert template.personalized
+    body = json.loads(template.render(-100, 'Ann "A" \\ Ё'))
+    assert body == {"chat_id": -100, "text": 'Hi Ann "A" \\ Ё, "Ann "A" \\ Ё"!'}
+
+
+def test_default_name_is_used_without_a_name() -> None:
+    """Recipients without a name get the default name of the template."""
+    template = CompiledTemplate.compile(MailingMessage("Hi {name}", ""), default_name="friend")
+    assert json.loads(template.render(1)) == {"chat_id": 1, "text": "Hi friend"}
+    assert json.loads(template.render(1, "")) == {"chat_id": 1, "text": "Hi "}
+
+
+def test_document_is_sent_with_a_caption() -> None:
+    """A message with a document is sent with the text as its caption."""
+    template = CompiledTemplate.compile(MailingMessage("Hi {name}", "media/1"), document="FILE_ID")
+    assert template.method == "sendDocument"
+    assert json.loads(template.render(7, "Bob")) == {"chat_id": 7, "document": "FILE_ID", "caption": "Hi Bob"}
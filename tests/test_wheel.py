@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+from collections.abc import Sequence
+from typing import Optional
+
+import pytest
+from aiogram_nats.common.settings.models.broker import BrokerSettings, NatsSettings, SchedulerSettings
+from aiogram_nats.core.entities.scheduled import ScheduledEntity
+from aiogram_nats.core.interfaces.interfaces.scheduler import Task
+from aiogram_nats.infrastructure.scheduler.factory import create_scheduler
+from aiogram_nats.infrastructure.scheduler.sources import BufferScheduleSource
+from aiogram_nats.infrastructure.scheduler.wheel import TimingWheel, TimingWheelScheduler
+from taskiq import InMemoryBroker, TaskiqEvents
+
+
+class RecordingScheduler:
+
+    """Records the schedules delegated to it."""
+
+    def __init__(self) -> None:
+        self.scheduled: list[tuple[ScheduledEntity, Task]] = []
+
+    async def schedule(self, entity: ScheduledEntity, task: Task) -> str:
+        """Records the schedule."""
+        self.scheduled.append((entity, task))
+        return f"fallback:{len(self.scheduled)}"
+
+    async def schedule_many(self, entities: Sequence[ScheduledEntity], task: Task) -> list[str]:
+        """Records the schedules."""
+        return [await self.schedule(entity, task) for entity in entities]
+
+    async def cancel(self, schedule_id: str) -> bool:
+        """Cancels nothing."""
+        return False
+
+    async def reschedule(self, schedule_id: str, scheduled_time: datetime.datetime) -> Optional[str]:
+        """Moves nothing."""
+        return None
+
+    async def cancel_by_key(self, key: str) -> int:
+        """Cancels nothing."""
+        return 0
+
+
+async def noop(entity: ScheduledEntity) -> None:
+    """Does nothing."""
+
+
+def in_seconds(seconds: float) -> ScheduledEntity:
+    """Returns an entity scheduled the given number of seconds from now."""
+    return ScheduledEntity(datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=seconds))
+
+
+def test_items_are_due_at_their_tick() -> None:
+    """Items of the first level are returned once their tick is reached."""
+    wheel: TimingWheel[str] = TimingWheel(tick=1, slots=4, levels=2)
+    wheel.add(1, "a")
+    wheel.add(3, "b")
+    assert len(wheel) == 2
+    assert wheel.advance(0.5) == []
+    assert wheel.advance(1) == ["a"]
+    assert wheel.advance(2.9) == []
+    assert wheel.advance(3) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_items_cascade_down_from_upper_levels() -> None:
+    """Items beyond the first level are kept on the upper levels and are due at their exact tick."""
+    wheel: TimingWheel[int] = TimingWheel(tick=1, slots=4, levels=3)
+    for deadline in (5, 6, 17, 40):
+        wheel.add(deadline, deadline)
+    due = {}
+    for now in range(1, 64):
+        for item in wheel.advance(now):
+            due[item] = now
+    assert due == {5: 5, 6: 6, 17: 17, 40: 40}
+
+
+def test_overdue_items_are_returned_by_the_next_advance() -> None:
+    """An item whose deadline has passed is due immediately."""
+    wheel: TimingWheel[str] = TimingWheel(tick=1, slots=4, levels=2)
+    wheel.advance(10)
+    wheel.add(3, "late")
+    assert wheel.advance(10) == ["late"]
+
+
+def test_deadline_beyond_the_span_is_rejected() -> None:
+    """The wheel holds at most `slots ** levels - 1` ticks."""
+    wheel: TimingWheel[str] = TimingWheel(tick=1, slots=4, levels=2)
+    assert wheel.span == 15
+    wheel.add(15, "last")
+    with pytest.raises(ValueError, match="seconds away"):
+        wheel.add(16, "too late")
+
+
+@pytest.mark.asyncio()
+async def test_short_schedules_run_in_memory_and_long_ones_are_delegated() -> None:
+    """Entities within the horizon are executed by the wheel, the others and the durable tasks go to the fallback."""
+    fallback = RecordingScheduler()
+    executed: list[ScheduledEntity] = []
+
+    async def task(entity: ScheduledEntity) -> None:
+        executed.append(entity)
+
+    wheel = TimingWheelScheduler(fallback, horizon=10, tick=0.01, durable_tasks=[noop])
+    short, long = in_seconds(0.02), in_seconds(60)
+    assert (await wheel.schedule(short, task)).startswith("wheel:")
+    assert await wheel.schedule(long, task) == "fallback:1"
+    assert await wheel.schedule(in_seconds(0.02), noop) == "fallback:2"
+    await asyncio.sleep(0.1)
+    assert executed == [short]
+    await wheel.stop()
+
+
+@pytest.mark.asyncio()
+async def test_stop_hands_pending_schedules_over() -> None:
+    """Schedules still in memory are scheduled through the fallback when the wheel stops."""
+    fallback = RecordingScheduler()
+    wheel = TimingWheelScheduler(fallback, horizon=10, tick=0.01)
+    entity = in_seconds(5)
+    await wheel.schedule(entity, noop)
+    await wheel.stop()
+    assert fallback.scheduled == [(entity, noop)]
+    assert len(wheel) == 0
+
+
+@pytest.mark.asyncio()
+async def test_create_scheduler_stops_the_wheel_on_broker_shutdown() -> None:
+    """The wheel is disabled by default and, when enabled, stopped by the shutdown of the broker."""
+    broker = InMemoryBroker()
+    disabled = create_scheduler(broker, BufferScheduleSource(), BrokerSettings(NatsSettings()))
+    assert not isinstance(disabled, TimingWheelScheduler)
+    wheel = create_scheduler(broker, BufferScheduleSource(), BrokerSettings(NatsSettings(), SchedulerSettings(wheel_enabled=True)))
+    assert isinstance(wheel, TimingWheelScheduler)
+    fallback = wheel.fallback = RecordingScheduler()
+    await wheel.schedule(in_seconds(5), noop)
+    for handler in broker.event_handlers[TaskiqEvents.CLIENT_SHUTDOWN]:
+        shutdown = handler(broker.state)
+        assert shutdown is not None
+        await shutdown
+    assert len(wheel) == 0
+    assert len(fallback.scheduled) == 1